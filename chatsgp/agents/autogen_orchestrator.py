@@ -1,5 +1,7 @@
 from __future__ import annotations
 import json
+import threading
+from contextvars import ContextVar
 from typing import Optional
 try:
     import autogen
@@ -9,41 +11,132 @@ except Exception:
 from .coder_agent import CoderAgent
 from .optimizer_agent import OptimizerAgent
 from .interpreter_agent import InterpreterAgent
+from .orchestrator import Orchestrator
+from ..utils.debug import debug_data
 from ..utils.llm_backend import LLM
+from ..utils.tracing import span
+from ..utils.validation import validate_question, validate_optimization_result
 
-class AutoGenOrchestrator:
-    def __init__(self, coder: CoderAgent, optimizer: OptimizerAgent, interpreter: InterpreterAgent, llm: Optional[LLM]=None):
-        self.coder=coder; self.optimizer=optimizer; self.interpreter=interpreter; self.llm=llm
-    def run_question(self, question: str, solver: str='pulp'):
-        if not AUTOGEN_AVAILABLE:
-            ops=self.coder.propose_modifications(question)
-            data,res=self.optimizer.run(ops, solver=solver)
-            ans=self.interpreter.interpret(data,res,ops)
-            return {'ops':ops,'result':res,'answer':ans,'autogen_used':False}
-        llm_config={'model': getattr(self.llm,'model','gpt-4o-mini')} if self.llm else {}
-        coder_agent=autogen.AssistantAgent('coder', system_message='Coder agent', llm_config=llm_config)
-        optimizer_agent=autogen.AssistantAgent('optimizer', system_message='Optimizer agent', llm_config=llm_config)
-        interpreter_agent=autogen.AssistantAgent('interpreter', system_message='Interpreter agent', llm_config=llm_config)
-        user=autogen.UserProxyAgent('user', code_execution_config=False)
-        def propose(q:str): return json.dumps(self.coder.propose_modifications(q))
-        def optimize(ops_json:str, solver_name:str='pulp'):
-            try: ops=json.loads(ops_json)
-            except Exception: ops={'ops':[]}
-            data,res=self.optimizer.run(ops, solver=solver_name)
-            return json.dumps({'result':res})
-        def interpret(payload:str, ops_json:str=''):
-            try: r=json.loads(payload).get('result',{})
-            except Exception: r={}
-            try: ops=json.loads(ops_json) if ops_json else {'ops':[]}
-            except Exception: ops={'ops':[]}
-            return self.interpreter.interpret({}, r, ops)
-        coder_agent.register_for_llm(name='propose', description='Propose ops')(propose)
-        optimizer_agent.register_for_llm(name='optimize', description='Run MILP')(optimize)
-        interpreter_agent.register_for_llm(name='interpret', description='Explain')(interpret)
-        cr=user.initiate_chat(coder_agent, message=f'Question: {question}. Call propose().')
-        orr=user.initiate_chat(optimizer_agent, message='Call optimize() with coder output.')
-        ops_str=cr.chat_history[-1]['content'] if cr.chat_history else '{"ops":[]}'
-        ir=user.initiate_chat(interpreter_agent, message=f'Call interpret() with optimizer output and ops: {ops_str}.')
-        try: ops=json.loads(cr.chat_history[-1]['content'])
-        except Exception: ops={'ops':[]}
-        return {'ops':ops,'result_raw': orr.chat_history[-1]['content'] if orr.chat_history else '{}','answer': ir.chat_history[-1]['content'] if ir.chat_history else 'N/A','autogen_used':True}
+# Stage outputs of the question being answered by the AutoGen chats
+_stage: ContextVar = ContextVar('chatsgp_autogen_stage', default=None)
+
+# (stage, tool name, output key, system message, tool description, chat message), in chain order
+STAGES = (
+    ('coder', 'propose', 'ops',
+     'You translate energy questions into scenario operations. Call propose() once, then reply TERMINATE.',
+     'Parse the question into scenario operations', 'Question: {question}\nCall propose().'),
+    ('optimizer', 'optimize', 'result',
+     'You run the energy cost optimization. Call optimize() once, then reply TERMINATE.',
+     'Solve the MILP for the proposed operations', 'Operations: {ops}\nCall optimize().'),
+    ('interpreter', 'interpret', 'answer',
+     'You explain optimization results. Call interpret() once, then reply TERMINATE.',
+     'Explain the optimization result', 'Operations: {ops}\nResult: {result}\nCall interpret().'),
+)
+
+class AutoGenOrchestrator(Orchestrator):
+    def __init__(self, coder: CoderAgent, optimizer: OptimizerAgent, interpreter: InterpreterAgent,
+                 llm: Optional[LLM]=None, short_circuit: bool=True, trace: bool=False):
+        """
+        Initialize AutoGenOrchestrator
+
+        The tool chain (propose -> optimize -> interpret) is fixed, so by default
+        the tools are called directly in that order, exactly like Orchestrator,
+        and no LLM round-trip is spent on deciding which tool to call. With
+        short_circuit=False and pyautogen installed, each stage is an AutoGen
+        chat in which the stage's assistant calls its tool. The assistants and
+        the executing user proxy are built once and reused; tools take no
+        arguments and exchange the operations, data and result through the
+        question's stage state, so nothing is re-serialized by the LLM.
+
+        Args:
+            coder: CoderAgent
+            optimizer: OptimizerAgent
+            interpreter: InterpreterAgent
+            llm: LLM backend whose model (and endpoint) the AutoGen assistants use
+            short_circuit: If True, call the fixed tool chain directly
+            trace: If True, attach 'timings_ms' and 'trace' to results (chat
+                stages appear as 'autogen.<stage>' spans around the tool spans)
+        """
+        super().__init__(coder, optimizer, interpreter, trace=trace)
+        self.llm = llm
+        self.short_circuit = short_circuit
+        self._agents = None
+        self._tools = {'propose': self._tool_propose, 'optimize': self._tool_optimize,
+                       'interpret': self._tool_interpret}
+        # Reused agents keep chat state, so chats run one question at a time
+        self._chat_lock = threading.Lock()
+
+    def _run_question(self, q, solver):
+        if self.short_circuit or not AUTOGEN_AVAILABLE:
+            out = super()._run_question(q, solver)
+            out['autogen_used'] = False
+            return out
+        with self._chat_lock:
+            return self._run_chats(q, solver)
+
+    def _llm_config(self):
+        entry = {'model': getattr(self.llm, 'model', None) or 'gpt-4o-mini'}
+        client = getattr(self.llm, 'client', None)
+        if client is not None:
+            entry['api_key'] = client.api_key
+            entry['base_url'] = str(client.base_url)
+        return {'config_list': [entry], 'temperature': 0, 'cache_seed': None}
+
+    def _build_agents(self):
+        """Create the stage assistants and the tool-executing user proxy (once)"""
+        if self._agents is not None:
+            return self._agents
+        llm_config = self._llm_config()
+        user = autogen.UserProxyAgent('user', human_input_mode='NEVER', code_execution_config=False,
+                                      is_termination_msg=lambda m: 'TERMINATE' in (m.get('content') or ''))
+        assistants = {}
+        for stage, tool, _, system_message, description, _ in STAGES:
+            assistants[stage] = autogen.AssistantAgent(stage, system_message=system_message, llm_config=llm_config)
+            autogen.register_function(self._tools[tool], caller=assistants[stage], executor=user,
+                                      name=tool, description=description)
+        self._agents = (user, assistants)
+        return self._agents
+
+    def _tool_propose(self) -> str:
+        state = _stage.get()
+        state['ops'] = self._propose(state['question'])
+        return json.dumps(state['ops'])
+
+    def _tool_optimize(self) -> str:
+        state = _stage.get()
+        with span('optimizer'):
+            state['data'], state['result'] = self.optimizer.run(state['ops'], solver=state['solver'])
+        is_valid, error_msg = validate_optimization_result(state['result'])
+        if not is_valid:
+            raise RuntimeError(f"Invalid optimization result: {error_msg}")
+        return json.dumps(state['result'])
+
+    def _tool_interpret(self) -> str:
+        state = _stage.get()
+        with span('interpreter'):
+            state['answer'] = self.interpreter.interpret(state['data'], state['result'], state['ops'])
+        return state['answer']
+
+    def _run_chats(self, q, solver):
+        user, assistants = self._build_agents()
+        state = {'question': q, 'solver': solver}
+        with span('validate'):
+            is_valid, error_msg = validate_question(q)
+        if not is_valid:
+            raise ValueError(f"Invalid question: {error_msg}")
+        token = _stage.set(state)
+        try:
+            for stage, tool, key, _, _, message in STAGES:
+                with span(f'autogen.{stage}'):
+                    user.initiate_chat(assistants[stage], clear_history=True, silent=True, max_turns=2,
+                                       message=message.format(question=q, ops=json.dumps(state.get('ops')),
+                                                              result=json.dumps(state.get('result'))))
+                if key not in state:
+                    # The assistant did not call its tool (or it failed): run it directly
+                    debug_data("AutoGenOrchestrator", "TOOL NOT CALLED", tool)
+                    self._tools[tool]()
+        except Exception as e:
+            raise self._pipeline_error(e) from e
+        finally:
+            _stage.reset(token)
+        return {'ops': state['ops'], 'result': state['result'], 'answer': state['answer'], 'autogen_used': True}
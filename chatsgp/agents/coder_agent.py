@@ -3,15 +3,38 @@ import re
 from pathlib import Path
 from ..utils.debug import debug_prompt, debug_response, debug_data
 from ..utils.validation import validate_question, validate_operations
+from ..utils.llm_backend import llm_available
+from ..utils.tracing import span
+from ..config import Config, active_snapshot
 
 class CoderAgent:
-    def __init__(self, icl_examples, llm=None):
+    def __init__(self, icl_examples, llm=None, config=None):
+        """
+        Initialize CoderAgent
+        
+        Args:
+            icl_examples: ICL examples for the LLM prompt
+            llm: Optional LLM backend; without one, questions are parsed rule-based
+            config: Optional Config (or ConfigSnapshot) whose horizon bounds the
+                hours of proposed operations. If None, uses global config; the
+                Orchestrator sets it to its optimizer's config.
+        """
         self.icl = icl_examples
         self.llm = llm
+        self.config = config
         self._system_prompt = None
         self._user_template = None
         self._load_prompt_templates()
     
+    def _hours(self):
+        """Horizon of the configuration in effect (the request's, if one is scoped)"""
+        scoped = active_snapshot()
+        if scoped is not None:
+            return scoped.hours
+        if self.config is None:
+            return None
+        return (self.config.snapshot() if isinstance(self.config, Config) else self.config).hours
+    
     def _rule_based_parse(self, q):
         """Fallback rule-based parsing for when LLM is not available"""
         q = q.lower()
@@ -35,6 +58,10 @@ class CoderAgent:
         
         return {'ops': ops, 'explanation': 'rule-based'}
     
+    def uses_llm(self):
+        """Whether propose_modifications will attempt LLM-based parsing"""
+        return llm_available(self.llm) and len(self.icl) > 0
+    
     def _load_prompt_templates(self):
         """Load prompt templates from files, with fallback to hardcoded prompts"""
         try:
@@ -121,18 +148,19 @@ Example output format:
         debug_data("CoderAgent", "ICL EXAMPLES", self.icl)
         
         # Check if LLM is available
-        if self.llm and self.llm.client is not None:
+        if llm_available(self.llm):
             debug_data("CoderAgent", "LLM STATUS", "LLM client is available - will attempt LLM-based parsing")
         else:
             debug_data("CoderAgent", "LLM STATUS", f"LLM client is NOT available (no API key?) - falling back to rule-based parsing")
         
         # Try LLM-based parsing if LLM is available and ICL examples exist
-        if self.llm and self.llm.client is not None and len(self.icl) > 0:
+        if self.uses_llm():
             try:
                 prompt = self._build_icl_prompt(q)
                 debug_prompt("CoderAgent", prompt)
                 
-                response = self.llm.complete(prompt, temperature=0.0, max_tokens=300)
+                with span('coder.llm'):
+                    response = self.llm.complete(prompt, temperature=0.0, max_tokens=300)
                 debug_response("CoderAgent", response)
                 
                 # Try to extract JSON array from response
@@ -152,7 +180,7 @@ Example output format:
                         
                         if valid_ops:
                             # Validate operations
-                            is_valid, error_msg = validate_operations(valid_ops)
+                            is_valid, error_msg = validate_operations(valid_ops, hours=self._hours())
                             if not is_valid:
                                 debug_data("CoderAgent", "LLM VALIDATION ERROR", error_msg)
                                 # Fall through to rule-based
@@ -166,6 +194,7 @@ Example output format:
                 pass
         
         # Fallback to rule-based parsing
-        result = self._rule_based_parse(q)
+        with span('coder.rule_based'):
+            result = self._rule_based_parse(q)
         debug_data("CoderAgent", "OUTPUT OPERATIONS (rule-based)", result)
         return result
@@ -1,5 +1,7 @@
-from ..utils.llm_backend import LLM
+from ..utils.llm_backend import LLM, llm_available
 from ..utils.debug import debug_prompt, debug_response, debug_data
+from ..utils.prompt_budget import compact_profiles
+from ..utils.tracing import span
 import numpy as np
 
 import json
@@ -7,8 +9,22 @@ import os
 from pathlib import Path
 
 class InterpreterAgent:
-    def __init__(self, llm=None, icl_examples=None):
+    def __init__(self, llm=None, icl_examples=None, profile_token_budget=200, config=None):
+        """
+        Initialize InterpreterAgent
+        
+        Args:
+            llm: Optional LLM backend. If None, a default LLM is created.
+            icl_examples: Optional ICL examples. If None, loads the bundled examples.
+            profile_token_budget: Token budget for the PV and load profiles in the
+                prompt; longer horizons are summarized to stay within it.
+            config: Optional Config (or ConfigSnapshot) for the baseline scenario.
+                If None, uses global config; the Orchestrator sets it to its
+                optimizer's config.
+        """
         self.llm = llm if llm is not None else LLM()
+        self.profile_token_budget = profile_token_budget
+        self.config = config
         self.icl = icl_examples if icl_examples is not None else self._load_default_icl()
         self._system_prompt = None
         self._user_template = None
@@ -58,15 +74,15 @@ class InterpreterAgent:
     def _calculate_baseline(self):
         """Calculate baseline scenario for comparison"""
         from .optimizer_agent import OptimizerAgent
-        opt = OptimizerAgent()
+        opt = OptimizerAgent(config=self.config)
         debug_data("InterpreterAgent", "CALCULATING BASELINE", "Running baseline optimization...")
-        baseline_data, baseline_res = opt.run({'ops': []}, solver='pulp')
-        baseline_obj = baseline_res.get('objective', float('inf'))
+        with span('baseline'):
+            baseline_obj = opt.baseline_objective(solver='pulp')
         debug_data("InterpreterAgent", "BASELINE RESULT", {'objective': baseline_obj})
         return baseline_obj
     
-    def _interpret_with_llm(self, data, result, ops):
-        """Use LLM to generate human-readable interpretation"""
+    def _build_llm_prompt(self, data, result, ops):
+        """Build the interpretation prompt; returns (prompt, baseline_obj)"""
         status = result.get('status', 'unknown')
         objective = result.get('objective', 0)
         
@@ -117,15 +133,15 @@ class InterpreterAgent:
         # Prepare template variables
         baseline_info = f"Baseline Cost: EUR {baseline_obj:.2f}" if baseline_obj is not None else ""
         cost_change_info = f"Cost Change: EUR {change:.2f} ({change_pct:+.1f}%)" if change is not None else ""
+        robustness = self._describe_robustness(result)
+        if robustness:
+            cost_change_info = f"{cost_change_info}\nRobustness: {robustness}".lstrip()
         
-        # Get data values (handle numpy arrays)
-        pv_profile = data.get('PV', [])
-        if isinstance(pv_profile, np.ndarray):
-            pv_profile = pv_profile.tolist()
-        
-        load_profile = data.get('Load', [])
-        if isinstance(load_profile, np.ndarray):
-            load_profile = load_profile.tolist()
+        # Render profiles compactly so the prompt size doesn't grow with the horizon
+        pv_profile, load_profile = compact_profiles(
+            data.get('PV', []), data.get('Load', []), ops.get('ops', []),
+            budget=self.profile_token_budget, model=getattr(self.llm, 'model', None) or 'gpt-4o-mini'
+        )
         
         # Use template files if available, otherwise use hardcoded prompt
         if self._system_prompt and self._user_template:
@@ -170,8 +186,14 @@ Provide a clear, concise interpretation in 2-3 sentences explaining:
 
 Answer in plain language for a non-technical audience."""
         
+        return prompt, baseline_obj
+    
+    def _interpret_with_llm(self, data, result, ops):
+        """Use LLM to generate human-readable interpretation"""
+        prompt, baseline_obj = self._build_llm_prompt(data, result, ops)
         debug_prompt("InterpreterAgent", prompt)
-        interpretation = self.llm.complete(prompt, temperature=0.3, max_tokens=300)
+        with span('interpreter.llm'):
+            interpretation = self.llm.complete(prompt, temperature=0.3, max_tokens=300)
         debug_response("InterpreterAgent", interpretation)
         
         if interpretation and interpretation.strip():
@@ -180,6 +202,25 @@ Answer in plain language for a non-technical audience."""
             # Fallback to rule-based if LLM fails
             return self._interpret_rule_based(data, result, ops, baseline_obj)
     
+    def _interpret_stream_with_llm(self, data, result, ops):
+        """Stream the LLM interpretation chunk by chunk"""
+        prompt, baseline_obj = self._build_llm_prompt(data, result, ops)
+        debug_prompt("InterpreterAgent", prompt)
+        chunks = []
+        for chunk in self.llm.complete_stream(prompt, temperature=0.3, max_tokens=300):
+            # Leading whitespace is dropped to match the stripped blocking answer
+            if not chunks:
+                chunk = chunk.lstrip()
+                if not chunk:
+                    continue
+            chunks.append(chunk)
+            yield chunk
+        debug_response("InterpreterAgent", "".join(chunks))
+        
+        if not chunks:
+            # Fallback to rule-based if LLM returned nothing
+            yield self._interpret_rule_based(data, result, ops, baseline_obj)
+    
     def _interpret_rule_based(self, data, result, ops, baseline_obj=None):
         """Rule-based interpretation as fallback"""
         status = result.get('status', 'unknown')
@@ -224,7 +265,24 @@ Answer in plain language for a non-technical audience."""
         else:
             cost_impact = f"The optimized total energy cost is EUR {objective:.2f}."
         
-        return f"In the scenario where {modifications}, {cost_impact} The optimization found the most cost-effective way to manage energy storage, grid imports, and exports over the 24-hour period."
+        answer = f"In the scenario where {modifications}, {cost_impact} The optimization found the most cost-effective way to manage energy storage, grid imports, and exports over the 24-hour period."
+        robustness = self._describe_robustness(result)
+        return f"{answer} {robustness}" if robustness else answer
+    
+    @staticmethod
+    def _describe_robustness(result):
+        """Summarize a stochastic result's robustness statistics (empty for deterministic results)"""
+        info = result.get('robustness')
+        if not info:
+            return ""
+        det, sto = info['deterministic'], info['stochastic']
+        scenarios = result.get('scenarios', {})
+        return (f"Across {scenarios.get('samples', 0)} sampled PV and load scenarios "
+                f"({scenarios.get('cloudy_prob', 0) * 100:.0f}% chance of a cloudy day), the plan optimized for the forecast "
+                f"(EUR {info['forecast_objective']:.2f}) costs EUR {det['expected']:.2f} on average, EUR {det['p95']:.2f} "
+                f"in the worst 5% of days and up to EUR {det['worst']:.2f}. A battery schedule hedged across the scenarios "
+                f"costs EUR {sto['expected']:.2f} on average (EUR {sto['p95']:.2f} in the worst 5%), "
+                f"saving EUR {info['value_of_stochastic_solution']:.2f} per day in expectation.")
     
     def interpret(self, data, result, ops=None):
         """Interpret optimization results and return human-readable answer"""
@@ -232,12 +290,12 @@ Answer in plain language for a non-technical audience."""
             ops = {'ops': []}
         
         debug_data("InterpreterAgent", "ICL EXAMPLES", self.icl)
-        debug_data("InterpreterAgent", "INPUT DATA", {
+        debug_data("InterpreterAgent", "INPUT DATA", lambda: {
             'result': result,
             'ops': ops,
             'data_summary': {
-                'PV': data.get('PV', []).tolist() if isinstance(data.get('PV'), np.ndarray) else data.get('PV', []),
-                'Load': data.get('Load', []).tolist() if isinstance(data.get('Load'), np.ndarray) else data.get('Load', []),
+                'PV': np.asarray(data.get('PV', [])).tolist(),
+                'Load': np.asarray(data.get('Load', [])).tolist(),
                 'battery_capacity_kwh': data.get('battery_capacity_kwh', 0),
                 'price_import': data.get('price_import', 0),
                 'price_export': data.get('price_export', 0)
@@ -245,7 +303,7 @@ Answer in plain language for a non-technical audience."""
         })
         
         # Try LLM interpretation first if available
-        if self.llm.client is not None:
+        if llm_available(self.llm):
             try:
                 answer = self._interpret_with_llm(data, result, ops)
                 debug_data("InterpreterAgent", "OUTPUT ANSWER (LLM)", answer)
@@ -264,3 +322,39 @@ Answer in plain language for a non-technical audience."""
         answer = self._interpret_rule_based(data, result, ops, baseline_obj)
         debug_data("InterpreterAgent", "OUTPUT ANSWER (rule-based)", answer)
         return answer
+    
+    def interpret_stream(self, data, result, ops=None):
+        """
+        Interpret optimization results, yielding the answer incrementally
+        
+        Yields text chunks as the LLM produces them. When the LLM is unavailable
+        or fails before producing any output, the rule-based answer is yielded
+        as a single chunk. Joining all chunks gives the same kind of answer as
+        interpret().
+        """
+        if ops is None:
+            ops = {'ops': []}
+        
+        debug_data("InterpreterAgent", "INPUT DATA (stream)", {'result': result, 'ops': ops})
+        
+        if llm_available(self.llm) and hasattr(self.llm, 'complete_stream'):
+            started = False
+            try:
+                for chunk in self._interpret_stream_with_llm(data, result, ops):
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                debug_data("InterpreterAgent", "LLM ERROR", str(e))
+                if started:
+                    # Part of the answer is already out; don't append a second one
+                    return
+        
+        try:
+            baseline_obj = self._calculate_baseline()
+        except:
+            baseline_obj = None
+        
+        answer = self._interpret_rule_based(data, result, ops, baseline_obj)
+        debug_data("InterpreterAgent", "OUTPUT ANSWER (rule-based)", answer)
+        yield answer
@@ -1,18 +1,34 @@
+import threading
+from collections import OrderedDict
+
 from ..optimization.rec_baseline import build_and_solve
 from ..optimization.modifications import apply_modifications
+from ..optimization.shared_memory import ScenarioBlock, PARAM_KEYS, solve_rows
+from ..optimization.stochastic import robustness_analysis, uncertainty_settings
 from ..utils.debug import debug_data
-from ..config import get_config
+from ..utils.tracing import span
+from ..utils.validation import validate_operations_batch
+from ..config import Config, get_config, active_snapshot
 import numpy as np
 
+# Baseline objectives by (config content hash, solver), least recently used first.
+# Bounded: every per-request override set has its own content hash
+_BASELINE_CACHE: 'OrderedDict[tuple, float]' = OrderedDict()
+_BASELINE_CACHE_SIZE = 256
+_baseline_lock = threading.Lock()
+
 class OptimizerAgent:
-    def __init__(self, config=None):
+    def __init__(self, config=None, solver_pool=None):
         """
         Initialize OptimizerAgent
         
         Args:
-            config: Optional Config object. If None, uses global config.
+            config: Optional Config (or ConfigSnapshot). If None, uses global config.
+            solver_pool: Optional SolverPool; if given, models are solved by its
+                persistent worker processes instead of in this process.
         """
         self.config = config if config is not None else get_config()
+        self.solver_pool = solver_pool
     
     def run(self, ops_bundle, solver='pulp'):
         """
@@ -20,7 +36,7 @@ class OptimizerAgent:
         
         Args:
             ops_bundle: Dictionary with 'ops' key containing list of operations
-            solver: Solver to use ('pulp' or 'gurobi')
+            solver: Solver to use ('pulp', 'highs' or 'gurobi')
         
         Returns:
             Tuple of (data, result) where data is the optimization data and result is the optimization result
@@ -37,10 +53,11 @@ class OptimizerAgent:
         debug_data("OptimizerAgent", "INPUT OPERATIONS", ops_bundle)
         
         data = self._default()
-        debug_data("OptimizerAgent", "INITIAL DATA", {
+        # Payloads are built lazily, and only if debug logging is on
+        debug_data("OptimizerAgent", "INITIAL DATA", lambda: {
             'H': data['H'],
-            'Load': data['Load'].tolist() if isinstance(data['Load'], np.ndarray) else data['Load'],
-            'PV': data['PV'].tolist() if isinstance(data['PV'], np.ndarray) else data['PV'],
+            'Load': np.asarray(data['Load']).tolist(),
+            'PV': np.asarray(data['PV']).tolist(),
             'price_import': data['price_import'],
             'price_export': data['price_export'],
             'battery_capacity_kwh': data['battery_capacity_kwh'],
@@ -50,16 +67,22 @@ class OptimizerAgent:
         })
         
         try:
-            apply_modifications(data, ops_bundle.get('ops', []))
+            with span('apply_modifications'):
+                apply_modifications(data, ops_bundle.get('ops', []))
         except Exception as e:
             raise ValueError(f"Failed to apply modifications: {e}")
         
-        debug_data("OptimizerAgent", "MODIFIED DATA", {
-            'Load': data['Load'].tolist() if isinstance(data['Load'], np.ndarray) else data['Load'],
-            'PV': data['PV'].tolist() if isinstance(data['PV'], np.ndarray) else data['PV']
+        debug_data("OptimizerAgent", "MODIFIED DATA", lambda: {
+            'Load': np.asarray(data['Load']).tolist(),
+            'PV': np.asarray(data['PV']).tolist()
         })
         
-        res = build_and_solve(data, solver=solver)
+        with span('solver', solver=solver, pooled=self.solver_pool is not None) as s:
+            if self.solver_pool is not None:
+                res = self.solver_pool.solve(data, solver=solver)
+            else:
+                res = build_and_solve(data, solver=solver)
+            s.set_attribute('status', res.get('status', 'error'))
         debug_data("OptimizerAgent", "OPTIMIZATION RESULT", res)
         
         if res.get('status') == 'error':
@@ -67,41 +90,134 @@ class OptimizerAgent:
         
         return data, res
     
+    def run_stochastic(self, ops_bundle, solver='pulp', samples=None, scenarios=None, seed=None):
+        """
+        Run a two-stage stochastic optimization around the modified scenario
+        
+        The modified PV and load profiles are the forecast: scenarios are
+        sampled around them and reduced by k-medoids (settings from the
+        config's 'uncertainty' section), one battery schedule is optimized for
+        all of them, and it is compared with the perfect-foresight plan on
+        every sample (see `optimization.stochastic.robustness_analysis`).
+        
+        Args:
+            ops_bundle: Dictionary with 'ops' key containing list of operations
+            solver: Solver to use ('pulp' or 'highs')
+            samples: Sampled scenarios (overrides uncertainty.samples)
+            scenarios: Scenarios kept after reduction (overrides uncertainty.scenarios)
+            seed: Sampling seed (overrides uncertainty.seed)
+        
+        Returns:
+            Tuple of (data, result); result's 'objective' is the expected cost
+            and 'robustness' holds the cost statistics of both plans
+        
+        Raises:
+            ValueError: If ops_bundle is invalid
+            RuntimeError: If optimization fails
+        """
+        if not isinstance(ops_bundle, dict):
+            raise ValueError(f"ops_bundle must be a dict, got {type(ops_bundle)}")
+        data = self._default()
+        try:
+            with span('apply_modifications'):
+                apply_modifications(data, ops_bundle.get('ops', []))
+        except Exception as e:
+            raise ValueError(f"Failed to apply modifications: {e}")
+        
+        settings = uncertainty_settings(self.snapshot, samples=samples, scenarios=scenarios, seed=seed)
+        with span('solver', solver=solver, stochastic=True, pooled=self.solver_pool is not None) as s:
+            if self.solver_pool is not None:
+                res = self.solver_pool.solve_stochastic(data, settings, solver=solver)
+            else:
+                res = robustness_analysis(data, solver=solver, settings=settings)
+            s.set_attribute('status', res.get('status', 'error'))
+        debug_data("OptimizerAgent", "STOCHASTIC RESULT", lambda: {k: res.get(k) for k in ('status', 'objective', 'robustness')})
+        
+        if res.get('status') == 'error':
+            raise RuntimeError(f"Optimization error: {res.get('error', 'Unknown error')}")
+        
+        return data, res
+    
+    def run_many(self, ops_bundles, solver='pulp', chunk_size=64):
+        """
+        Run many scenarios and return their results as arrays
+        
+        Profiles are stacked into (S, H) matrices and, when a solver pool is
+        attached, handed to its workers through shared memory; dispatch
+        trajectories come back the same way, so nothing per-scenario is pickled.
+        
+        Args:
+            ops_bundles: List of dictionaries with 'ops' key
+            solver: Solver to use ('pulp', 'highs' or 'gurobi')
+            chunk_size: Scenarios per worker job
+        
+        Returns:
+            Dictionary with 'objective' (S,), 'status' (list of S strings), the
+            modified 'PV' and 'Load' profiles (S, H) and one (S, H) array per
+            dispatch flow (grid_import, grid_export, battery_charge,
+            battery_discharge, soc; NaN where not optimal)
+        
+        Raises:
+            ValueError: If an ops bundle is invalid
+        """
+        base = self._default()
+        # Reject bad operations before any profile is built
+        valid, errors = validate_operations_batch(ops_bundles, hours=base['H'])
+        if not valid.all():
+            i = int(np.flatnonzero(~valid)[0])
+            raise ValueError(f"Invalid operations for scenario {i}: {errors[i]}")
+        pv = np.empty((len(ops_bundles), base['H']))
+        load = np.empty_like(pv)
+        for i, bundle in enumerate(ops_bundles):
+            data = {**base, 'PV': base['PV'].copy(), 'Load': base['Load'].copy()}
+            try:
+                apply_modifications(data, bundle.get('ops', []))
+            except Exception as e:
+                raise ValueError(f"Failed to apply modifications for scenario {i}: {e}")
+            pv[i], load[i] = data['PV'], data['Load']
+        params = {k: base[k] for k in PARAM_KEYS}
+        
+        with ScenarioBlock.create(pv, load) as block:
+            if self.solver_pool is not None:
+                self.solver_pool.solve_block(block, params, solver=solver, chunk_size=chunk_size)
+            else:
+                solve_rows(block, 0, block.S, params, solver)
+            return block.to_results()
+    
+    @property
+    def snapshot(self):
+        """
+        Compiled configuration in effect: the request's (see `config.use_config`)
+        if one is scoped, else this agent's. Read on every run, so reloads apply.
+        """
+        scoped = active_snapshot()
+        if scoped is not None:
+            return scoped
+        return self.config.snapshot() if isinstance(self.config, Config) else self.config
+    
+    def baseline_objective(self, solver='pulp'):
+        """
+        Objective of the unmodified scenario, solved once per configuration
+        
+        Cached by the configuration's content hash, so a reloaded or
+        different configuration gets its own baseline; the cache keeps the
+        most recently used entries only.
+        """
+        key = (self.snapshot.content_hash, solver)
+        with _baseline_lock:
+            objective = _BASELINE_CACHE.get(key)
+            if objective is not None:
+                _BASELINE_CACHE.move_to_end(key)
+                return objective
+        _, res = self.run({'ops': []}, solver=solver)
+        objective = res.get('objective', float('inf'))
+        if res.get('status') == 'optimal':
+            with _baseline_lock:
+                _BASELINE_CACHE[key] = objective
+                while len(_BASELINE_CACHE) > _BASELINE_CACHE_SIZE:
+                    _BASELINE_CACHE.popitem(last=False)
+        return objective
+    
     def _default(self):
-        """Get default optimization data, using config if available"""
-        import numpy as np
-        
-        # Get config values or use defaults
-        battery_config = self.config.get_battery_config()
-        price_config = self.config.get_price_config()
-        opt_config = self.config.get_optimization_config()
-        
-        H = opt_config.get('hours', 24)
-        
-        # Get PV and Load profiles from config or use defaults
-        pv_profile = self.config.get('pv_profile')
-        load_profile = self.config.get('load_profile')
-        
-        if pv_profile is None:
-            pv_profile = np.array([0,0,0,0,0.2,0.5,1,1.5,2,2.2,2,1.5,1,0.8,0.5,0.2,0,0,0,0,0,0,0,0])
-        else:
-            pv_profile = np.array(pv_profile)
-        
-        if load_profile is None:
-            load_profile = np.array([2.0]*H)
-        else:
-            load_profile = np.array(load_profile)
-        
-        return {
-            'H': H,
-            'Load': load_profile,
-            'PV': pv_profile,
-            'price_import': price_config.get('import', 0.25),
-            'price_export': price_config.get('export', 0.10),
-            'battery_capacity_kwh': battery_config.get('capacity_kwh', 5.0),
-            'battery_eff': battery_config.get('efficiency', 0.95),
-            'battery_pmax': battery_config.get('max_power', 2.0),
-            'init_soc': battery_config.get('initial_soc', 0.5),
-            'Pimp': None,
-            'Pexp': None
-        }
+        """Get default optimization data from the compiled configuration"""
+        return self.snapshot.model_data()
@@ -2,49 +2,203 @@ from .coder_agent import CoderAgent
 from .optimizer_agent import OptimizerAgent
 from .interpreter_agent import InterpreterAgent
 from ..utils.validation import validate_question, validate_optimization_result
+from ..utils.debug import debug_data
+from ..utils.tracing import span, start_trace
+from ..optimization.stochastic import asks_robustness
+from ..config import use_config
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
 
 class Orchestrator:
-    def __init__(self, coder, optimizer, interpreter):
+    def __init__(self, coder, optimizer, interpreter, speculative=False, trace=False, stochastic=True):
+        """
+        Initialize Orchestrator
+        
+        Args:
+            coder: CoderAgent
+            optimizer: OptimizerAgent
+            interpreter: InterpreterAgent
+            speculative: If True, solve the rule-based parse in the background
+                while the coder LLM call is in flight, and reuse that solve
+                when the LLM proposes the same operations.
+            trace: If True, time each stage and attach 'timings_ms' (per-stage
+                milliseconds) and 'trace' (OTLP/JSON spans) to run_question results.
+            stochastic: If True, questions about robustness to uncertain PV or
+                load ("how robust is this plan to cloudy days?") are solved
+                with OptimizerAgent.run_stochastic.
+        """
         self.coder = coder
         self.optimizer = optimizer
         self.interpreter = interpreter
+        # The baseline and the coder's horizon must come from the same configuration as the scenario
+        if getattr(interpreter, 'config', None) is None and getattr(optimizer, 'config', None) is not None:
+            interpreter.config = optimizer.config
+        if getattr(coder, 'config', None) is None and getattr(optimizer, 'config', None) is not None:
+            coder.config = optimizer.config
+        self.speculative = speculative
+        self.trace = trace
+        self.stochastic = stochastic
+        self._speculation_pool = None
     
-    def run_question(self, q, solver='pulp'):
+    def run_question(self, q, solver='pulp', config=None):
         """
         Run the full pipeline for a question
         
         Args:
             q: Question string
-            solver: Solver to use ('pulp' or 'gurobi')
+            solver: Solver to use ('pulp', 'highs' or 'gurobi')
+            config: Optional Config or ConfigSnapshot for this question only
+                (e.g. from `ConfigRegistry.resolve`); every stage, including the
+                interpreter baseline, uses it
         
         Returns:
-            Dictionary with 'ops', 'result', and 'answer'
+            Dictionary with 'ops', 'result', and 'answer' (plus 'timings_ms'
+            and 'trace' when tracing)
+        
+        Raises:
+            ValueError: If question is invalid
+            RuntimeError: If optimization fails
+        """
+        with use_config(config):
+            if not self.trace:
+                return self._run_question(q, solver)
+            with start_trace('run_question', solver=solver) as tracer:
+                out = self._run_question(q, solver)
+        out['timings_ms'] = tracer.timings_ms()
+        out['trace'] = tracer.to_otel()
+        return out
+    
+    def _run_question(self, q, solver):
+        ops, data, res = self.solve_question(q, solver=solver)
+        try:
+            with span('interpreter'):
+                ans = self.interpreter.interpret(data, res, ops)
+        except Exception as e:
+            raise self._pipeline_error(e) from e
+        return {'ops': ops, 'result': res, 'answer': ans}
+    
+    def stream_question(self, q, solver='pulp', config=None):
+        """
+        Run the pipeline for a question, streaming the interpretation
+        
+        The coder and optimizer run eagerly so the cost figures are available
+        before the first answer token.
+        
+        Args:
+            q: Question string
+            solver: Solver to use ('pulp', 'highs' or 'gurobi')
+            config: Optional Config or ConfigSnapshot for this question only
+        
+        Returns:
+            Dictionary with 'ops', 'result', and 'answer_stream' (an iterator of text chunks)
+        
+        Raises:
+            ValueError: If question is invalid
+            RuntimeError: If optimization fails
+        """
+        with use_config(config) as snapshot:
+            ops, data, res = self.solve_question(q, solver=solver)
+        stream = self.interpreter.interpret_stream(data, res, ops)
+        if snapshot is not None:
+            stream = self._scoped_stream(snapshot, stream)
+        return {'ops': ops, 'result': res, 'answer_stream': stream}
+    
+    @staticmethod
+    def _scoped_stream(snapshot, stream):
+        # The stream is consumed after stream_question returns: scope each step
+        # separately so the configuration never leaks into the consumer
+        while True:
+            with use_config(snapshot):
+                try:
+                    chunk = next(stream)
+                except StopIteration:
+                    return
+            yield chunk
+    
+    def solve_question(self, q, solver='pulp'):
+        """
+        Run the coder and optimizer stages for a question
+        
+        Returns:
+            Tuple of (ops, data, result)
         
         Raises:
             ValueError: If question is invalid
             RuntimeError: If optimization fails
         """
         # Validate question
-        is_valid, error_msg = validate_question(q)
+        with span('validate'):
+            is_valid, error_msg = validate_question(q)
         if not is_valid:
             raise ValueError(f"Invalid question: {error_msg}")
         
         try:
-            ops = self.coder.propose_modifications(q)
-            data, res = self.optimizer.run(ops, solver=solver)
+            if self.stochastic and asks_robustness(q):
+                ops = self._propose(q)
+                with span('optimizer'):
+                    data, res = self.optimizer.run_stochastic(ops, solver=solver)
+            elif self.speculative and self.coder.uses_llm():
+                ops, data, res = self._speculative_solve(q, solver)
+            else:
+                ops = self._propose(q)
+                with span('optimizer'):
+                    data, res = self.optimizer.run(ops, solver=solver)
             
             # Validate optimization result
             is_valid, error_msg = validate_optimization_result(res)
             if not is_valid:
                 raise RuntimeError(f"Invalid optimization result: {error_msg}")
             
-            ans = self.interpreter.interpret(data, res, ops)
-            return {'ops': ops, 'result': res, 'answer': ans}
+            return ops, data, res
         except Exception as e:
-            # Provide helpful error message
-            error_msg = f"Pipeline failed: {str(e)}"
-            if "Invalid question" in str(e):
-                error_msg += "\nTip: Make sure your question includes a percentage and a valid keyword (import, export, PV, shift)."
-            elif "Optimization error" in str(e):
-                error_msg += "\nTip: Check if the scenario is feasible. Try adjusting the parameters."
-            raise RuntimeError(error_msg) from e
+            raise self._pipeline_error(e) from e
+    
+    def _speculative_solve(self, q, solver):
+        """
+        Overlap the coder LLM call with a solve of the rule-based parse
+        
+        The speculative result is used only when the LLM proposes exactly the
+        rule-based operations; otherwise it is cancelled (or, if already
+        running, discarded) and the LLM operations are solved as usual.
+        """
+        guess = self.coder._rule_based_parse(q)
+        if not guess['ops']:
+            ops = self._propose(q)
+            with span('optimizer'):
+                return (ops,) + tuple(self.optimizer.run(ops, solver=solver))
+        
+        if self._speculation_pool is None:
+            self._speculation_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='speculative-solve')
+        # Run in a copy of this context so the speculative solve joins the active trace
+        future = self._speculation_pool.submit(contextvars.copy_context().run, self._speculative_run, guess, solver)
+        
+        ops = self._propose(q)
+        if ops.get('ops') == guess['ops']:
+            debug_data("Orchestrator", "SPECULATION", "hit - reusing rule-based solve")
+            data, res = future.result()
+        else:
+            debug_data("Orchestrator", "SPECULATION", "miss - solving LLM operations")
+            future.cancel()
+            with span('optimizer'):
+                data, res = self.optimizer.run(ops, solver=solver)
+        return ops, data, res
+    
+    def _speculative_run(self, guess, solver):
+        with span('optimizer.speculative'):
+            return self.optimizer.run(guess, solver=solver)
+    
+    def _propose(self, q):
+        with span('coder') as s:
+            ops = self.coder.propose_modifications(q)
+            s.set_attribute('parse_method', ops.get('explanation', ''))
+        return ops
+    
+    @staticmethod
+    def _pipeline_error(e):
+        """Wrap a stage failure with a helpful error message"""
+        error_msg = f"Pipeline failed: {str(e)}"
+        if "Invalid question" in str(e):
+            error_msg += "\nTip: Make sure your question includes a percentage and a valid keyword (import, export, PV, shift)."
+        elif "Optimization error" in str(e):
+            error_msg += "\nTip: Check if the scenario is feasible. Try adjusting the parameters."
+        return RuntimeError(error_msg)
@@ -0,0 +1,135 @@
+from .orchestrator import Orchestrator
+from ..optimization.modifications import apply_modifications
+from ..optimization.rec_baseline import IncrementalModel, build_and_solve
+from ..utils.debug import debug_data
+from ..utils.tracing import span
+from ..utils.validation import validate_question, validate_operations, validate_optimization_result
+from ..config import use_config
+
+class ScenarioSession:
+    """
+    Conversational session over one evolving scenario
+
+    Each question's operations are applied on top of the current scenario, so
+    "now also raise PV by 10%" builds on earlier edits. Only the new operations
+    are applied; the model is built once per session and re-solved in place
+    (see IncrementalModel), and answers compare against the session's cached
+    baseline. The configuration is pinned when the session starts.
+    """
+
+    def __init__(self, orchestrator: Orchestrator, solver='pulp'):
+        """
+        Initialize ScenarioSession
+
+        Args:
+            orchestrator: Orchestrator whose coder, optimizer and interpreter to use
+            solver: Solver to use ('pulp', 'highs' or 'gurobi'; gurobi rebuilds
+                the model for every turn)
+        """
+        self.orchestrator = orchestrator
+        self.solver = solver
+        self.snapshot = orchestrator.optimizer.snapshot
+        self._model = None
+        self.reset()
+
+    def reset(self):
+        """Drop every edit and return to the unmodified scenario"""
+        self.data = self.snapshot.model_data()
+        self.ops = []
+        self.result = None
+        # (question, delta ops, data, result) per turn, for undo
+        self.turns = []
+
+    @property
+    def baseline_objective(self):
+        """Objective of the unmodified scenario (cached per configuration and solver)"""
+        with use_config(self.snapshot):
+            return self.orchestrator.optimizer.baseline_objective(self.solver)
+
+    def undo(self):
+        """
+        Revert the last turn
+
+        Returns:
+            True if a turn was reverted, False if there was nothing to undo
+        """
+        if not self.turns:
+            return False
+        self.turns.pop()
+        if self.turns:
+            _, _, self.data, self.result = self.turns[-1]
+        else:
+            self.data, self.result = self.snapshot.model_data(), None
+        self.ops = [op for _, delta, _, _ in self.turns for op in delta]
+        return True
+
+    def _solve(self, data):
+        if self.solver == 'gurobi':
+            return build_and_solve(data, solver=self.solver)
+        if self._model is None:
+            self._model = IncrementalModel(self.snapshot.model_data(), solver=self.solver)
+        return self._model.solve(data['PV'], data['Load'], return_dispatch=False)
+
+    def ask(self, question):
+        """
+        Apply a question's operations to the current scenario and answer it
+
+        Args:
+            question: Question string
+
+        Returns:
+            Dictionary with 'ops' (this question's parsed operations),
+            'scenario_ops' (every operation applied so far), 'result',
+            'answer', 'baseline_objective' and 'previous_objective' (None on
+            the first turn)
+
+        Raises:
+            ValueError: If the question or its operations are invalid
+            RuntimeError: If optimization fails
+        """
+        with use_config(self.snapshot):
+            with span('validate'):
+                is_valid, error_msg = validate_question(question)
+            if not is_valid:
+                raise ValueError(f"Invalid question: {error_msg}")
+
+            parsed = self.orchestrator._propose(question)
+            delta = parsed.get('ops', [])
+            is_valid, error_msg = validate_operations(delta, hours=self.snapshot.hours)
+            if not is_valid:
+                raise ValueError(f"Invalid operations: {error_msg}")
+
+            previous = self.result
+            if delta or previous is None:
+                data = dict(self.data, PV=self.data['PV'].copy(), Load=self.data['Load'].copy())
+                with span('apply_modifications'):
+                    apply_modifications(data, delta)
+                with span('optimizer', incremental=True):
+                    result = self._solve(data)
+                if result.get('status') == 'error':
+                    raise self.orchestrator._pipeline_error(
+                        RuntimeError(f"Optimization error: {result.get('error', 'Unknown error')}"))
+                is_valid, error_msg = validate_optimization_result(result)
+                if not is_valid:
+                    raise RuntimeError(f"Invalid optimization result: {error_msg}")
+            else:
+                # Nothing changed: the current solution still holds
+                data, result = self.data, previous
+            debug_data("ScenarioSession", "TURN", lambda: {'question': question, 'delta': delta,
+                                                           'objective': result.get('objective')})
+
+            if delta or previous is None:
+                self.data, self.result = data, result
+                self.ops = self.ops + list(delta)
+                self.turns.append((question, list(delta), data, result))
+            with span('interpreter'):
+                answer = self.orchestrator.interpreter.interpret(data, result, {'ops': self.ops})
+            baseline = self.baseline_objective
+        return {
+            'ops': parsed,
+            'scenario_ops': list(self.ops),
+            'result': result,
+            'answer': answer,
+            'baseline_objective': baseline,
+            'previous_objective': previous.get('objective') if previous is not None else None,
+        }
@@ -1,9 +1,122 @@
-"""Configuration management for Chat-SGP"""
+"""Configuration management for Chat-SGP
+
+`Config` loads the configuration file; `Config.snapshot()` returns it compiled
+into an immutable `ConfigSnapshot` with typed model parameters, read-only
+NumPy profiles, O(1) dotted-key lookups and a content hash that caches can key
+on. `Config.reload()` swaps in a new snapshot without restarting the process;
+readers holding the old snapshot keep a consistent view.
+
+`ConfigRegistry` holds one Config per site, and `use_config` scopes a
+(possibly overridden) snapshot to a request, so one process can serve several
+sites concurrently.
+"""
 import os
-import yaml
 import json
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Mapping
+
+import numpy as np
+
+DEFAULT_PV_PROFILE = (0, 0, 0, 0, 0.2, 0.5, 1, 1.5, 2, 2.2, 2, 1.5, 1, 0.8, 0.5, 0.2, 0, 0, 0, 0, 0, 0, 0, 0)
+
+
+def _freeze(value):
+    """Read-only deep copy: dicts become mappingproxies, lists tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _flatten(value, prefix: str, out: Dict[str, Any]):
+    """Index every dotted path of a frozen configuration"""
+    for k, v in value.items():
+        key = f"{prefix}{k}"
+        out[key] = v
+        if isinstance(v, Mapping):
+            _flatten(v, key + '.', out)
+    return out
+
+
+def _profile(values) -> np.ndarray:
+    arr = np.array(values, dtype=float)
+    arr.flags.writeable = False
+    return arr
+
+
+class ConfigSnapshot:
+    """
+    Immutable, compiled configuration
+
+    Model parameters are typed attributes and the PV/load profiles are
+    read-only float arrays built once, so agents read them without dictionary
+    walks or conversions. Snapshots compare and hash by `content_hash`, a
+    SHA-256 of the canonical JSON configuration.
+    """
+
+    __slots__ = ('hours', 'pv', 'load', 'price_import', 'price_export', 'battery_capacity_kwh',
+                 'battery_eff', 'battery_pmax', 'init_soc', 'default_solver', 'llm', 'content_hash', '_flat')
+
+    def __init__(self, config: Dict[str, Any]):
+        config = config or {}
+        canonical = json.dumps(config, sort_keys=True, separators=(',', ':'), default=str)
+        frozen = _freeze(config)
+        flat = _flatten(frozen, '', {})
+        set_ = object.__setattr__
+        set_(self, '_flat', MappingProxyType(flat))
+        set_(self, 'content_hash', hashlib.sha256(canonical.encode('utf-8')).hexdigest())
+        set_(self, 'hours', int(flat.get('optimization.hours', 24)))
+        set_(self, 'default_solver', flat.get('optimization.default_solver', 'pulp'))
+        set_(self, 'price_import', float(flat.get('prices.import', 0.25)))
+        set_(self, 'price_export', float(flat.get('prices.export', 0.10)))
+        set_(self, 'battery_capacity_kwh', float(flat.get('battery.capacity_kwh', 5.0)))
+        set_(self, 'battery_eff', float(flat.get('battery.efficiency', 0.95)))
+        set_(self, 'battery_pmax', float(flat.get('battery.max_power', 2.0)))
+        set_(self, 'init_soc', float(flat.get('battery.initial_soc', 0.5)))
+        set_(self, 'llm', flat.get('llm') or MappingProxyType({}))
+        pv, load = flat.get('pv_profile'), flat.get('load_profile')
+        set_(self, 'pv', _profile(DEFAULT_PV_PROFILE if pv is None else pv))
+        set_(self, 'load', _profile([2.0] * self.hours if load is None else load))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ConfigSnapshot is immutable")
+
+    def __eq__(self, other):
+        return isinstance(other, ConfigSnapshot) and other.content_hash == self.content_hash
+
+    def __hash__(self):
+        return hash(self.content_hash)
+
+    def __repr__(self):
+        return f"ConfigSnapshot({self.content_hash[:12]})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a (read-only) value by dotted key, e.g. 'battery.capacity_kwh'"""
+        return self._flat.get(key, default)
+
+    def model_data(self) -> Dict[str, Any]:
+        """Fresh optimization data dict (writable profile copies, since modifications edit them)"""
+        return {
+            'H': self.hours,
+            'Load': self.load.copy(),
+            'PV': self.pv.copy(),
+            'price_import': self.price_import,
+            'price_export': self.price_export,
+            'battery_capacity_kwh': self.battery_capacity_kwh,
+            'battery_eff': self.battery_eff,
+            'battery_pmax': self.battery_pmax,
+            'init_soc': self.init_soc,
+            'Pimp': None,
+            'Pexp': None
+        }
 
 
 class Config:
@@ -20,7 +133,12 @@ class Config:
                         If provided, config_path is ignored.
         """
         self.config_path = config_path
+        self._source: Optional[Path] = None
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
         self.config = config_dict if config_dict is not None else self._load_config()
+        self._snapshot = ConfigSnapshot(self.config)
         self._apply_config()
     
     def _find_config_file(self) -> Optional[Path]:
@@ -37,26 +155,38 @@ class Config:
                 return path
         return None
     
-    def _load_config(self) -> Dict[str, Any]:
-        """Load configuration from file"""
+    def _load_config(self, strict: bool = False) -> Dict[str, Any]:
+        """Load configuration from file (with strict, a missing or unreadable file raises instead of giving the defaults)"""
         if self.config_path:
             config_file = Path(self.config_path)
+        elif strict and self._source is not None:
+            # Reloading: the file found at startup, not whatever is discovered now
+            config_file = self._source
         else:
             config_file = self._find_config_file()
         
         if not config_file or not config_file.exists():
+            if strict:
+                raise FileNotFoundError(f"Configuration file not found: {config_file}")
             return self._default_config()
         
+        self._source = config_file
+        self._mtime = config_file.stat().st_mtime
         try:
             if config_file.suffix in ['.yaml', '.yml']:
+                import yaml
                 with open(config_file, 'r', encoding='utf-8') as f:
                     return yaml.safe_load(f) or {}
             elif config_file.suffix == '.json':
                 with open(config_file, 'r', encoding='utf-8') as f:
                     return json.load(f)
+            elif strict:
+                raise ValueError(f"Unsupported configuration file type: {config_file.suffix}")
             else:
                 return self._default_config()
         except Exception as e:
+            if strict:
+                raise
             print(f"Warning: Could not load config file: {e}")
             return self._default_config()
     
@@ -74,14 +204,30 @@ class Config:
                 'export': 0.10   # EUR/kWh
             },
             'llm': {
+                'backend': 'openai',  # openai, local or stub
                 'model': 'gpt-4o-mini',
                 'temperature': 0.0,
-                'max_tokens': 300
+                'max_tokens': 300,
+                'timeout': 60.0,
+                'max_retries': 3,
+                'requests_per_minute': None,
+                'tokens_per_minute': None,
+                'profile_token_budget': 200
             },
             'optimization': {
                 'default_solver': 'pulp',
                 'hours': 24
             },
+            'uncertainty': {
+                'samples': 200,
+                'scenarios': 20,
+                'pv_sigma': 0.2,
+                'load_sigma': 0.1,
+                'correlation': 0.8,
+                'cloudy_prob': 0.2,
+                'cloudy_factor': 0.35,
+                'seed': 42
+            },
             'pv_profile': None,  # None means use default
             'load_profile': None  # None means use default
         }
@@ -92,44 +238,253 @@ class Config:
         if 'llm' in self.config and 'model' in self.config['llm']:
             os.environ.setdefault('LLM_MODEL', self.config['llm']['model'])
     
-    def get(self, key: str, default: Any = None) -> Any:
-        """Get configuration value using dot notation (e.g., 'battery.capacity_kwh')"""
-        keys = key.split('.')
-        value = self.config
+    def snapshot(self) -> ConfigSnapshot:
+        """Current compiled, immutable configuration"""
+        return self._snapshot
+    
+    @property
+    def content_hash(self) -> str:
+        """Content hash of the current configuration"""
+        return self._snapshot.content_hash
+    
+    def reload(self) -> bool:
+        """
+        Re-read the configuration file and swap in a new snapshot
         
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
+        Configurations built from a dict are left unchanged, and so is the
+        current configuration if the file cannot be read or parsed (e.g. while
+        it is being rewritten).
         
-        return value
+        Returns:
+            True if the configuration content changed
+        """
+        if self._source is None and not self.config_path:
+            return False
+        with self._lock:
+            try:
+                config = self._load_config(strict=True)
+            except Exception as e:
+                print(f"Warning: Could not reload config file, keeping the current configuration: {e}")
+                return False
+            snapshot = ConfigSnapshot(config)
+            changed = snapshot != self._snapshot
+            self.config, self._snapshot = config, snapshot
+        return changed
+    
+    def reload_if_changed(self, min_interval: float = 0.0) -> bool:
+        """
+        Reload when the configuration file's modification time changed
+        
+        Args:
+            min_interval: Skip the check if the last one was less than this
+                many seconds ago (so it can run on every request)
+        
+        Returns:
+            True if the configuration content changed
+        """
+        if self._source is None:
+            return False
+        now = time.monotonic()
+        if now - self._checked_at < min_interval:
+            return False
+        self._checked_at = now
+        try:
+            mtime = self._source.stat().st_mtime
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        return self.reload()
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get configuration value using dot notation (e.g., 'battery.capacity_kwh')"""
+        return self._snapshot.get(key, default)
     
-    def get_battery_config(self) -> Dict[str, Any]:
+    def get_battery_config(self) -> Mapping[str, Any]:
         """Get battery configuration"""
-        return self.config.get('battery', {})
+        return self._snapshot.get('battery', MappingProxyType({}))
     
-    def get_price_config(self) -> Dict[str, Any]:
+    def get_price_config(self) -> Mapping[str, Any]:
         """Get price configuration"""
-        return self.config.get('prices', {})
+        return self._snapshot.get('prices', MappingProxyType({}))
     
-    def get_llm_config(self) -> Dict[str, Any]:
+    def get_llm_config(self) -> Mapping[str, Any]:
         """Get LLM configuration"""
-        return self.config.get('llm', {})
+        return self._snapshot.get('llm', MappingProxyType({}))
     
-    def get_optimization_config(self) -> Dict[str, Any]:
+    def get_optimization_config(self) -> Mapping[str, Any]:
         """Get optimization configuration"""
-        return self.config.get('optimization', {})
+        return self._snapshot.get('optimization', MappingProxyType({}))
 
 
-# Global config instance
-_config_instance: Optional[Config] = None
+# Shared Config instances by path (None = the project's default config file)
+_config_instances: Dict[Optional[str], Config] = {}
+_instances_lock = threading.Lock()
 
 
 def get_config(config_path: Optional[str] = None) -> Config:
-    """Get global configuration instance"""
-    global _config_instance
-    if _config_instance is None:
-        _config_instance = Config(config_path)
-    return _config_instance
+    """Get the shared configuration instance for a path (the default config file if None)"""
+    key = str(Path(config_path).resolve()) if config_path else None
+    config = _config_instances.get(key)
+    if config is None:
+        with _instances_lock:
+            config = _config_instances.get(key)
+            if config is None:
+                config = _config_instances[key] = Config(config_path)
+    return config
+
+
+# Configuration scoped to the current request (see `use_config`)
+_scoped: ContextVar = ContextVar('chatsgp_config', default=None)
+
+
+def active_snapshot() -> Optional[ConfigSnapshot]:
+    """Snapshot set by the innermost `use_config` block, or None"""
+    return _scoped.get()
+
+
+@contextmanager
+def use_config(config):
+    """
+    Scope a configuration to the current request
+    
+    Inside the block, every agent reads this configuration instead of its own,
+    including the interpreter's baseline. The scope is a ContextVar, so
+    concurrent requests on different threads don't see each other's
+    configuration. None leaves the current configuration in place.
+    
+    Args:
+        config: Config, ConfigSnapshot or None
+    """
+    if config is None:
+        yield active_snapshot()
+        return
+    snapshot = config.snapshot() if isinstance(config, Config) else config
+    token = _scoped.set(snapshot)
+    try:
+        yield snapshot
+    finally:
+        _scoped.reset(token)
+
+
+# Top-level sections a request may override (the LLM client is built once per process)
+OVERRIDABLE_SECTIONS = ('battery', 'prices', 'optimization', 'pv_profile', 'load_profile')
+
+
+def _merge(base: Dict[str, Any], overrides: Mapping[str, Any]) -> Dict[str, Any]:
+    out = dict(base)
+    for k, v in overrides.items():
+        if isinstance(v, Mapping) and isinstance(out.get(k), Mapping):
+            out[k] = _merge(dict(out[k]), v)
+        else:
+            out[k] = v
+    return out
+
+
+class ConfigRegistry:
+    """
+    Configurations by site (e.g. one energy community or tariff per site)
+    
+    `resolve(site, overrides)` returns the snapshot for one request: the site's
+    configuration with optional per-request overrides merged in. Override
+    snapshots are cached by the site's content hash and the overrides, so
+    repeated requests reuse them and a reloaded site gets fresh ones.
+    """
+    
+    def __init__(self, default: Optional[Config] = None, max_overrides: int = 256):
+        """
+        Initialize ConfigRegistry
+        
+        Args:
+            default: Configuration used when no site is given. If None, uses global config.
+            max_overrides: Override snapshots kept in the cache
+        """
+        self.default = default if default is not None else get_config()
+        self.max_overrides = max_overrides
+        self._sites: Dict[str, Config] = {}
+        self._overrides: 'OrderedDict[tuple, ConfigSnapshot]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def register(self, site: str, config) -> Config:
+        """
+        Add or replace a site
+        
+        Args:
+            site: Site name
+            config: Config, path to a config file, or configuration dict
+        """
+        if isinstance(config, dict):
+            config = Config(config_dict=config)
+        elif not isinstance(config, Config):
+            config = Config(str(config))
+        with self._lock:
+            self._sites[site] = config
+        return config
+    
+    def sites(self) -> Dict[str, str]:
+        """Registered sites and their configuration hashes"""
+        return {site: config.content_hash for site, config in self._sites.items()}
+    
+    def get(self, site: Optional[str] = None) -> Config:
+        """
+        Config of a site (the default configuration if None)
+        
+        Raises:
+            KeyError: If the site is not registered
+        """
+        if site is None:
+            return self.default
+        try:
+            return self._sites[site]
+        except KeyError:
+            raise KeyError(f"Unknown site: {site}") from None
+    
+    def resolve(self, site: Optional[str] = None, overrides: Optional[Mapping[str, Any]] = None) -> ConfigSnapshot:
+        """
+        Snapshot for a request
+        
+        Args:
+            site: Site name (None for the default configuration)
+            overrides: Optional nested values merged over the site's
+                configuration, e.g. {'prices': {'import': 0.3}}; only
+                OVERRIDABLE_SECTIONS may be given
+        
+        Raises:
+            KeyError: If the site is not registered
+            ValueError: If the overrides are invalid
+        """
+        config = self.get(site)
+        base = config.snapshot()
+        if not overrides:
+            return base
+        if not isinstance(overrides, Mapping):
+            raise ValueError("Config overrides must be an object")
+        unknown = sorted(set(overrides) - set(OVERRIDABLE_SECTIONS))
+        if unknown:
+            raise ValueError(f"Cannot override config sections: {', '.join(unknown)} "
+                             f"(allowed: {', '.join(OVERRIDABLE_SECTIONS)})")
+        key = (base.content_hash, json.dumps(overrides, sort_keys=True, default=str))
+        with self._lock:
+            snapshot = self._overrides.get(key)
+            if snapshot is not None:
+                self._overrides.move_to_end(key)
+                return snapshot
+        try:
+            snapshot = ConfigSnapshot(_merge(config.config, overrides))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid config overrides: {e}") from e
+        if len(snapshot.pv) < snapshot.hours or len(snapshot.load) < snapshot.hours:
+            raise ValueError(f"PV and load profiles need at least {snapshot.hours} values")
+        with self._lock:
+            self._overrides[key] = snapshot
+            while len(self._overrides) > self.max_overrides:
+                self._overrides.popitem(last=False)
+        return snapshot
+    
+    def reload_if_changed(self, min_interval: float = 0.0) -> bool:
+        """Reload every changed configuration file; True if any content changed"""
+        changed = self.default.reload_if_changed(min_interval)
+        for config in list(self._sites.values()):
+            changed = config.reload_if_changed(min_interval) or changed
+        return changed
 
@@ -1,7 +1,12 @@
 from __future__ import annotations
+from collections import OrderedDict
 from typing import Dict, Any
+import numpy as np
+from ..utils.tracing import span
 
-def build_and_solve(data: Dict[str, Any], solver='pulp') -> Dict[str, Any]:
+def build_and_solve(data: Dict[str, Any], solver='pulp', return_dispatch=False) -> Dict[str, Any]:
+    """Solve the REC dispatch LP; with return_dispatch, optimal results also carry the hourly
+    grid_import, grid_export, battery_charge, battery_discharge and soc trajectories."""
     H=data['H']; Load=data['Load']; PV=data['PV']
     cap=data['battery_capacity_kwh']; eff=data['battery_eff']; pmax=data['battery_pmax']
     price_i=data['price_import']; price_e=data['price_export']; init_soc=data['init_soc']*cap
@@ -15,8 +20,11 @@ def build_and_solve(data: Dict[str, Any], solver='pulp') -> Dict[str, Any]:
             for t in range(H): m.addConstr(Load[t]==PV[t]+D[t]+Pimp[t]-C[t]-Pexp[t], name=f'balance_{t}')
             for t in range(H): m.addConstr(SoC[t]==(init_soc + (eff*C[t]-D[t]/eff) if t==0 else SoC[t-1]+eff*C[t]-D[t]/eff), name=f'soc_{t}')
             m.setObjective(gp.quicksum(price_i*Pimp[t]-price_e*Pexp[t] for t in range(H)), gp.GRB.MINIMIZE)
-            m.optimize()
-            if m.Status==gp.GRB.OPTIMAL: return {'status':'optimal','objective': m.ObjVal}
+            with span('solve', backend='gurobi'): m.optimize()
+            if m.Status==gp.GRB.OPTIMAL:
+                res={'status':'optimal','objective': m.ObjVal}
+                if return_dispatch: res.update(_dispatch(lambda v: v.X, Pimp, Pexp, C, D, SoC, H))
+                return res
             if m.Status==gp.GRB.INFEASIBLE:
                 try:
                     m.computeIIS(); iis=[c.ConstrName for c in m.getConstrs() if c.IISConstr]
@@ -30,19 +38,81 @@ def build_and_solve(data: Dict[str, Any], solver='pulp') -> Dict[str, Any]:
     else:
         try:
             import pulp as pl
-            prob=pl.LpProblem('rec', pl.LpMinimize)
-            Pimp=pl.LpVariable.dicts('Pimp', range(H), lowBound=0)
-            Pexp=pl.LpVariable.dicts('Pexp', range(H), lowBound=0)
-            C=pl.LpVariable.dicts('C', range(H), lowBound=0, upBound=pmax)
-            D=pl.LpVariable.dicts('D', range(H), lowBound=0, upBound=pmax)
-            SoC=pl.LpVariable.dicts('SoC', range(H), lowBound=0, upBound=cap)
-            for t in range(H): prob += Load[t] == PV[t] + D[t] + Pimp[t] - C[t] - Pexp[t]
-            for t in range(H): prob += (SoC[t] == (init_soc + (eff*C[t] - D[t]/eff) if t==0 else SoC[t-1] + eff*C[t] - D[t]/eff))
-            prob += pl.lpSum(price_i*Pimp[t] - price_e*Pexp[t] for t in range(H))
-            prob.solve(pl.PULP_CBC_CMD(msg=False))
-            if pl.LpStatus[prob.status]=='Optimal': return {'status':'optimal','objective': pl.value(prob.objective)}
-            if pl.LpStatus[prob.status]=='Infeasible': return {'status':'infeasible','objective': float('inf')}
-            if pl.LpStatus[prob.status]=='Unbounded': return {'status':'unbounded','objective': float('inf')}
-            return {'status':'other','objective': float('inf'), 'status_str': pl.LpStatus[prob.status]}
+            with span('model_build', H=H): prob, variables = build_pulp_model(data)
+            return _solve_pulp(prob, variables, H, solver, return_dispatch)
         except Exception as e:
             return {'status':'error','objective': float('inf'), 'error': str(e)}
+
+def _solve_pulp(prob, variables, H, solver='pulp', return_dispatch=False, warm_start=False):
+    import pulp as pl
+    if solver=='highs':
+        # In-process HiGHS (needs highspy): no solver executable is launched
+        cmd=pl.HiGHS(msg=False, warmStart=warm_start)
+        if not cmd.available(): return {'status':'error','objective': float('inf'), 'error': 'HiGHS solver not available (pip install highspy)'}
+    else:
+        cmd=pl.PULP_CBC_CMD(msg=False, warmStart=warm_start)
+    with span('solve', backend=solver): prob.solve(cmd)
+    if pl.LpStatus[prob.status]=='Optimal':
+        res={'status':'optimal','objective': pl.value(prob.objective)}
+        if return_dispatch: res.update(_dispatch(lambda v: v.varValue or 0.0, *variables, H))
+        return res
+    if pl.LpStatus[prob.status]=='Infeasible': return {'status':'infeasible','objective': float('inf')}
+    if pl.LpStatus[prob.status]=='Unbounded': return {'status':'unbounded','objective': float('inf')}
+    return {'status':'other','objective': float('inf'), 'status_str': pl.LpStatus[prob.status]}
+
+def build_pulp_model(data: Dict[str, Any]):
+    """Build (without solving) the PuLP model; returns (prob, (Pimp, Pexp, C, D, SoC))."""
+    import pulp as pl
+    H=data['H']; Load=data['Load']; PV=data['PV']
+    cap=data['battery_capacity_kwh']; eff=data['battery_eff']; pmax=data['battery_pmax']
+    price_i=data['price_import']; price_e=data['price_export']; init_soc=data['init_soc']*cap
+    prob=pl.LpProblem('rec', pl.LpMinimize)
+    Pimp=pl.LpVariable.dicts('Pimp', range(H), lowBound=0)
+    Pexp=pl.LpVariable.dicts('Pexp', range(H), lowBound=0)
+    C=pl.LpVariable.dicts('C', range(H), lowBound=0, upBound=pmax)
+    D=pl.LpVariable.dicts('D', range(H), lowBound=0, upBound=pmax)
+    SoC=pl.LpVariable.dicts('SoC', range(H), lowBound=0, upBound=cap)
+    for t in range(H): prob += (Load[t] == PV[t] + D[t] + Pimp[t] - C[t] - Pexp[t], f'balance_{t}')
+    for t in range(H): prob += (SoC[t] == (init_soc + (eff*C[t] - D[t]/eff) if t==0 else SoC[t-1] + eff*C[t] - D[t]/eff))
+    prob += pl.lpSum(price_i*Pimp[t] - price_e*Pexp[t] for t in range(H))
+    return prob, (Pimp, Pexp, C, D, SoC)
+
+def _dispatch(value, Pimp, Pexp, C, D, SoC, H):
+    return {'grid_import':[value(Pimp[t]) for t in range(H)], 'grid_export':[value(Pexp[t]) for t in range(H)],
+            'battery_charge':[value(C[t]) for t in range(H)], 'battery_discharge':[value(D[t]) for t in range(H)],
+            'soc':[value(SoC[t]) for t in range(H)]}
+
+class IncrementalModel:
+    """PuLP model built once and re-solved as the PV/load profiles change.
+
+    Only the balance constraints depend on the profiles, so an update rewrites
+    their constants in place instead of rebuilding the model, and the solver is
+    warm-started from the previous solution. Results are memoized by profile
+    content, so returning to an earlier scenario (e.g. after an undo) costs
+    nothing. Battery and price parameters are fixed at construction."""
+    def __init__(self, data: Dict[str, Any], solver='pulp', cache_size=256):
+        self.H=data['H']; self.solver=solver; self.cache_size=cache_size
+        with span('model_build', H=self.H): self.prob, self.variables = build_pulp_model(data)
+        self.balance=[self.prob.constraints[f'balance_{t}'] for t in range(self.H)]
+        self.solves=0
+        self._memo=OrderedDict()
+        self._solved_once=False
+    def solve(self, PV, Load, return_dispatch=True) -> Dict[str, Any]:
+        """Solve for new profiles; same result format as build_and_solve"""
+        PV=np.asarray(PV, dtype=float); Load=np.asarray(Load, dtype=float)
+        key=(PV.tobytes(), Load.tobytes(), return_dispatch)
+        if key in self._memo:
+            self._memo.move_to_end(key)
+            return dict(self._memo[key])
+        # Load[t] == PV[t] + ... is stored as (... + PV[t] - Load[t]) == 0
+        for c, v in zip(self.balance, (PV-Load).tolist()): c.constant=v
+        try:
+            res=_solve_pulp(self.prob, self.variables, self.H, self.solver, return_dispatch, warm_start=self._solved_once)
+        except Exception as e:
+            return {'status':'error','objective': float('inf'), 'error': str(e)}
+        self.solves+=1
+        if res['status']=='optimal': self._solved_once=True
+        if res['status']!='error':
+            self._memo[key]=dict(res)
+            while len(self._memo)>self.cache_size: self._memo.popitem(last=False)
+        return res
@@ -0,0 +1,128 @@
+"""
+Zero-copy scenario transport over multiprocessing.shared_memory
+
+A ScenarioBlock lays out, in one shared-memory segment, the PV and load
+profiles of S scenarios (inputs) and their objectives, statuses and dispatch
+trajectories (outputs), all as NumPy views. Workers attach by name and solve a
+slice of rows in place, so only (name, S, H, start, stop) crosses the process
+boundary instead of pickled profile arrays and result dicts.
+"""
+from __future__ import annotations
+
+from multiprocessing import shared_memory
+from typing import Dict, Any, Tuple
+
+import numpy as np
+
+# Dispatch trajectories stored per scenario, in this order
+FLOWS = ('grid_import', 'grid_export', 'battery_charge', 'battery_discharge', 'soc')
+STATUSES = ('optimal', 'infeasible', 'unbounded', 'other', 'error')
+# Parameters shared by every scenario in a block
+PARAM_KEYS = ('price_import', 'price_export', 'battery_capacity_kwh', 'battery_eff', 'battery_pmax', 'init_soc')
+
+
+def _layout(S: int, H: int) -> Tuple[Dict[str, Tuple[int, tuple, np.dtype]], int]:
+    """Byte offsets of each array in the segment (all float64/int64, so 8-byte aligned)"""
+    shapes = {'pv': ((S, H), np.float64), 'load': ((S, H), np.float64),
+              'flows': ((S, len(FLOWS), H), np.float64), 'objective': ((S,), np.float64),
+              'status': ((S,), np.int64)}
+    layout, offset = {}, 0
+    for name, (shape, dtype) in shapes.items():
+        layout[name] = (offset, shape, np.dtype(dtype))
+        offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return layout, offset
+
+
+class ScenarioBlock:
+    """Profiles in, dispatch out, for S scenarios of H hours in one shared-memory segment"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, S: int, H: int, owner: bool):
+        self.shm = shm
+        self.S = S
+        self.H = H
+        self.owner = owner
+        layout, _ = _layout(S, H)
+        for name, (offset, shape, dtype) in layout.items():
+            setattr(self, name, np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset))
+
+    @classmethod
+    def create(cls, pv, load) -> 'ScenarioBlock':
+        """Allocate a block and copy in (S, H) PV and load matrices"""
+        pv = np.asarray(pv, dtype=np.float64)
+        load = np.asarray(load, dtype=np.float64)
+        if pv.ndim != 2 or pv.shape != load.shape:
+            raise ValueError(f"pv and load must be matching (S, H) matrices, got {pv.shape} and {load.shape}")
+        S, H = pv.shape
+        _, size = _layout(S, H)
+        block = cls(shared_memory.SharedMemory(create=True, size=max(size, 1)), S, H, owner=True)
+        block.pv[:] = pv
+        block.load[:] = load
+        block.flows.fill(np.nan)
+        block.objective.fill(np.inf)
+        block.status.fill(STATUSES.index('error'))
+        return block
+
+    @classmethod
+    def attach(cls, handle: Tuple[str, int, int]) -> 'ScenarioBlock':
+        """Attach to an existing block from its handle"""
+        name, S, H = handle
+        return cls(shared_memory.SharedMemory(name=name), S, H, owner=False)
+
+    @property
+    def handle(self) -> Tuple[str, int, int]:
+        """Picklable reference for workers: (segment name, S, H)"""
+        return (self.shm.name, self.S, self.H)
+
+    def to_results(self) -> Dict[str, Any]:
+        """Copy the outputs (and the PV/load inputs) out of shared memory as regular arrays"""
+        out = {'objective': self.objective.copy(),
+               'status': [STATUSES[c] for c in self.status],
+               'PV': self.pv.copy(), 'Load': self.load.copy()}
+        for i, name in enumerate(FLOWS):
+            out[name] = self.flows[:, i, :].copy()
+        return out
+
+    def close(self):
+        """Detach; the owner also frees the segment"""
+        # Drop views before closing, otherwise the buffer is still exported
+        for name in ('pv', 'load', 'flows', 'objective', 'status'):
+            self.__dict__.pop(name, None)
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def solve_rows(block: ScenarioBlock, start: int, stop: int, params: Dict[str, Any], solver: str = 'pulp') -> int:
+    """Solve rows [start, stop) of a block in place; returns the number of rows solved"""
+    from .rec_baseline import build_and_solve
+    for i in range(start, stop):
+        data = {'H': block.H, 'PV': block.pv[i].copy(), 'Load': block.load[i].copy(),
+                'Pimp': None, 'Pexp': None}
+        data.update({k: params[k] for k in PARAM_KEYS})
+        try:
+            res = build_and_solve(data, solver=solver, return_dispatch=True)
+        except Exception as e:
+            res = {'status': 'error', 'objective': float('inf'), 'error': str(e)}
+        status = res.get('status', 'error')
+        block.status[i] = STATUSES.index(status) if status in STATUSES else STATUSES.index('other')
+        block.objective[i] = res.get('objective', float('inf'))
+        if status == 'optimal':
+            for j, name in enumerate(FLOWS):
+                block.flows[i, j, :] = res[name]
+    return stop - start
+
+
+def solve_block_rows(handle: Tuple[str, int, int], start: int, stop: int, params: Dict[str, Any],
+                     solver: str = 'pulp') -> int:
+    """Worker entry point: attach to a block by handle and solve rows [start, stop)"""
+    block = ScenarioBlock.attach(handle)
+    try:
+        return solve_rows(block, start, stop, params, solver)
+    finally:
+        block.close()
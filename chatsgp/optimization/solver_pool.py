@@ -0,0 +1,276 @@
+"""
+Persistent solver worker pool
+
+Keeps long-lived worker processes that import PuLP once and solve models sent
+to them over pipes, instead of paying interpreter start-up and imports on every
+job. With solver='highs' (needs highspy) each solve also runs in-process, so no
+solver executable is launched per model; with 'pulp' the worker still launches
+CBC, but from a warm process.
+
+Each worker is driven by a dispatcher thread that pulls jobs from a shared
+queue, so work is balanced across workers. Workers are recycled after
+`max_jobs_per_worker` jobs, pinged when idle, and restarted (retrying the job
+once) if they die or stop responding.
+"""
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Any, List, Optional
+
+
+def _worker_main(conn):
+    """
+    Worker process loop
+
+    ('solve', data, solver) -> ('result', res)
+    ('block', handle, start, stop, params, solver) -> ('result', rows solved), writing into shared memory
+    ('stochastic', data, solver, settings) -> ('result', res) from stochastic.robustness_analysis
+    ('ping',) -> ('pong', pid)
+    """
+    import pulp  # noqa: F401  (warm import, shared by every job this worker runs)
+    from .rec_baseline import build_and_solve
+    from .shared_memory import solve_block_rows
+    from .stochastic import robustness_analysis
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            break
+        if msg[0] == 'stop':
+            break
+        if msg[0] == 'ping':
+            conn.send(('pong', os.getpid()))
+            continue
+        if msg[0] == 'block':
+            try:
+                conn.send(('result', solve_block_rows(*msg[1:])))
+            except Exception as e:
+                conn.send(('error', str(e)))
+            continue
+        if msg[0] == 'stochastic':
+            _, data, solver, settings = msg
+            try:
+                res = robustness_analysis(data, solver=solver, settings=settings)
+            except Exception as e:
+                res = {'status': 'error', 'objective': float('inf'), 'error': str(e)}
+            conn.send(('result', res))
+            continue
+        _, data, solver = msg
+        try:
+            res = build_and_solve(data, solver=solver)
+        except Exception as e:
+            res = {'status': 'error', 'objective': float('inf'), 'error': str(e)}
+        conn.send(('result', res))
+
+
+class WorkerLost(RuntimeError):
+    """Raised when a worker process dies or stops responding mid-job"""
+
+
+class _Worker:
+    """One worker process plus the dispatcher thread feeding it"""
+
+    def __init__(self, pool: 'SolverPool', index: int):
+        self.pool = pool
+        self.index = index
+        self.process = None
+        self.conn = None
+        self.jobs_done = 0
+        self.restarts = 0
+        self.last_ok = None
+        self._start_process()
+        self.thread = threading.Thread(target=self._run, name=f'solver-pool-{index}', daemon=True)
+        self.thread.start()
+
+    def _start_process(self):
+        parent, child = self.pool._ctx.Pipe()
+        self.process = self.pool._ctx.Process(target=_worker_main, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self.conn = parent
+        self.jobs_done = 0
+
+    def _stop_process(self, graceful=True):
+        if graceful and self.process.is_alive():
+            try:
+                self.conn.send(('stop',))
+                self.process.join(timeout=2)
+            except (OSError, BrokenPipeError):
+                pass
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=2)
+        self.conn.close()
+
+    def _restart(self, graceful=True):
+        self._stop_process(graceful=graceful)
+        self.restarts += 1
+        self._start_process()
+
+    def _request(self, msg, timeout):
+        """Send one message and wait for the reply; raises WorkerLost on death or timeout"""
+        try:
+            self.conn.send(msg)
+            if not self.conn.poll(timeout):
+                raise WorkerLost(f"worker {self.index} timed out after {timeout}s")
+            return self.conn.recv()
+        except (EOFError, OSError, BrokenPipeError) as e:
+            raise WorkerLost(f"worker {self.index} died: {e}") from e
+
+    def ping(self, timeout=5.0) -> bool:
+        try:
+            return self._request(('ping',), timeout)[0] == 'pong'
+        except WorkerLost:
+            return False
+
+    def _run(self):
+        pool = self.pool
+        while True:
+            try:
+                job = pool._jobs.get(timeout=pool.health_interval)
+            except queue.Empty:
+                # Idle: use the gap for a health check
+                if not self.ping(pool.job_timeout):
+                    self._restart(graceful=False)
+                continue
+            if job is None:
+                self._stop_process()
+                return
+            future, msg = job
+            if not future.set_running_or_notify_cancel():
+                pool._done()
+                continue
+            error = None
+            try:
+                for attempt in range(2):
+                    try:
+                        kind, res = self._request(msg, pool.job_timeout)
+                        break
+                    except WorkerLost:
+                        self._restart(graceful=False)
+                        if attempt == 1:
+                            raise
+                self.jobs_done += 1
+                self.last_ok = time.time()
+                if kind == 'error':
+                    raise RuntimeError(res)
+            except Exception as e:
+                error = e
+            # Count the job finished before waking the caller, so it never sees it pending
+            pool._done()
+            if error is None:
+                future.set_result(res)
+            else:
+                future.set_exception(error)
+            if pool.max_jobs_per_worker and self.jobs_done >= pool.max_jobs_per_worker:
+                self._restart()
+
+    def health(self) -> Dict[str, Any]:
+        return {'index': self.index, 'pid': self.process.pid, 'alive': self.process.is_alive(),
+                'jobs_done': self.jobs_done, 'restarts': self.restarts, 'last_ok': self.last_ok}
+
+
+class SolverPool:
+    """Pool of persistent solver worker processes"""
+
+    def __init__(self, workers: Optional[int] = None, solver: str = 'pulp', max_jobs_per_worker: int = 500,
+                 job_timeout: float = 60.0, health_interval: float = 5.0, start_method: Optional[str] = 'spawn'):
+        """
+        Initialize SolverPool
+
+        Args:
+            workers: Number of worker processes (default: CPU count)
+            solver: Default solver for jobs ('pulp', 'highs' or 'gurobi')
+            max_jobs_per_worker: Recycle a worker after this many jobs (0 disables)
+            job_timeout: Seconds to wait for a solve or ping before the worker is restarted
+            health_interval: Idle seconds between health-check pings
+            start_method: multiprocessing start method ('spawn' is safe alongside threads)
+        """
+        self.solver = solver
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.job_timeout = job_timeout
+        self.health_interval = health_interval
+        self._ctx = mp.get_context(start_method)
+        self._jobs = queue.Queue()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self._workers = [_Worker(self, i) for i in range(workers or os.cpu_count() or 1)]
+
+    def _done(self):
+        with self._lock:
+            self._pending -= 1
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs submitted but not yet finished (queued plus running)"""
+        return self._pending
+
+    def _submit_msg(self, msg) -> Future:
+        if self._closed:
+            raise RuntimeError("SolverPool is closed")
+        future = Future()
+        with self._lock:
+            self._pending += 1
+        self._jobs.put((future, msg))
+        return future
+
+    def submit(self, data: Dict[str, Any], solver: Optional[str] = None) -> Future:
+        """Queue a model for solving; returns a Future resolving to the build_and_solve result"""
+        return self._submit_msg(('solve', data, solver or self.solver))
+
+    def solve_block(self, block, params: Dict[str, Any], solver: Optional[str] = None, chunk_size: int = 64) -> int:
+        """
+        Solve every row of a ScenarioBlock in place, in chunks spread over the workers
+
+        Only the block handle and row ranges are sent to workers; profiles and
+        dispatch trajectories stay in shared memory.
+
+        Returns:
+            Number of rows solved
+        """
+        futures = [self._submit_msg(('block', block.handle, start, min(start + chunk_size, block.S), params,
+                                     solver or self.solver))
+                   for start in range(0, block.S, chunk_size)]
+        return sum(f.result() for f in futures)
+
+    def solve(self, data: Dict[str, Any], solver: Optional[str] = None) -> Dict[str, Any]:
+        """Solve one model and wait for the result"""
+        return self.submit(data, solver).result()
+
+    def solve_stochastic(self, data: Dict[str, Any], settings: Dict[str, Any], solver: Optional[str] = None) -> Dict[str, Any]:
+        """Run a two-stage robustness analysis (see stochastic.robustness_analysis) on a worker and wait for it"""
+        return self._submit_msg(('stochastic', data, solver or self.solver, settings)).result()
+
+    def map(self, datas: List[Dict[str, Any]], solver: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Solve many models in parallel, preserving order"""
+        return [f.result() for f in [self.submit(d, solver) for d in datas]]
+
+    def health(self) -> List[Dict[str, Any]]:
+        """Per-worker status: pid, liveness, jobs since last recycle, restarts, last success time"""
+        return [w.health() for w in self._workers]
+
+    def stats(self) -> Dict[str, Any]:
+        return {'workers': len(self._workers), 'queue_depth': self.queue_depth,
+                'restarts': sum(w.restarts for w in self._workers)}
+
+    def close(self):
+        """Stop all workers after the queued jobs finish"""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            self._jobs.put(None)
+        for w in self._workers:
+            w.thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,320 @@
+"""
+Two-stage stochastic dispatch over uncertain PV and load
+
+`build_and_solve` assumes the PV and load profiles are known exactly. Here the
+battery schedule (charge, discharge, state of charge) is decided once, before
+the day, and grid import/export are recourse decisions taken per scenario:
+
+    min  sum_s p_s * sum_t (price_import * Pimp[s,t] - price_export * Pexp[s,t])
+    s.t. Load[s,t] == PV[s,t] + D[t] + Pimp[s,t] - C[t] - Pexp[s,t]
+
+Scenarios are sampled around the forecast profiles (correlated hourly errors,
+plus whole cloudy days for PV) and reduced to a few representative ones by
+k-medoids, all as (S, H) array operations, so hundreds of samples cost one
+distance matrix rather than hundreds of LP blocks. With a fixed battery
+schedule the recourse has a closed form, so any plan is scored against every
+sample (not just the medoids) in one vectorized pass; that is how the
+stochastic plan is compared with the perfect-foresight plan.
+"""
+from __future__ import annotations
+
+import re
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from .rec_baseline import _solve_pulp, build_and_solve
+from ..utils.tracing import span
+
+# Scenario generation and reduction settings (config section 'uncertainty')
+DEFAULT_UNCERTAINTY = {
+    'samples': 200,         # sampled scenarios
+    'scenarios': 20,        # representative scenarios kept by k-medoids
+    'pv_sigma': 0.2,        # relative std of hourly PV forecast errors
+    'load_sigma': 0.1,      # relative std of hourly load forecast errors
+    'correlation': 0.8,     # hour-to-hour correlation of the errors
+    'cloudy_prob': 0.2,     # probability that a sampled day is cloudy
+    'cloudy_factor': 0.35,  # mean share of forecast PV left on a cloudy day
+    'seed': 42,
+}
+
+# Explicit robustness/uncertainty phrasing only: a false positive costs a multi-scenario solve
+_ROBUSTNESS = re.compile(r'\b(robust(ness)?|uncertain(ty|ties)?|cloudy|overcast|forecast errors?|worst[- ]case|'
+                         r'stochastic)\b', re.IGNORECASE)
+
+
+def asks_robustness(question: str) -> bool:
+    """Whether a question asks how a plan holds up under uncertain PV or load"""
+    return bool(_ROBUSTNESS.search(question or ''))
+
+
+def uncertainty_settings(snapshot=None, **overrides) -> Dict[str, Any]:
+    """DEFAULT_UNCERTAINTY updated from a snapshot's 'uncertainty' section and non-None overrides"""
+    settings = dict(DEFAULT_UNCERTAINTY)
+    if snapshot is not None:
+        for key in settings:
+            value = snapshot.get(f'uncertainty.{key}')
+            if value is not None:
+                settings[key] = value
+    settings.update({k: v for k, v in overrides.items() if v is not None})
+    return settings
+
+
+def _ar1(rng: np.random.Generator, S: int, H: int, rho: float) -> np.ndarray:
+    """(S, H) standard-normal errors with lag-1 correlation rho along each row"""
+    z = rng.standard_normal((S, H))
+    innovation = np.sqrt(1.0 - rho * rho)
+    for t in range(1, H):
+        z[:, t] = rho * z[:, t - 1] + innovation * z[:, t]
+    return z
+
+
+def sample_scenarios(PV, Load, samples: int = 200, pv_sigma: float = 0.2, load_sigma: float = 0.1,
+                     correlation: float = 0.8, cloudy_prob: float = 0.2, cloudy_factor: float = 0.35,
+                     seed: Optional[int] = 42, **_) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sample PV and load scenarios around forecast profiles
+
+    Hourly errors are multiplicative and AR(1)-correlated; a cloudy day scales
+    the whole PV profile by a factor drawn around `cloudy_factor`. Profiles
+    never go negative.
+
+    Args:
+        PV: Forecast PV profile (H,)
+        Load: Forecast load profile (H,)
+        samples: Number of scenarios S
+        pv_sigma: Relative std of PV errors
+        load_sigma: Relative std of load errors
+        correlation: Hour-to-hour error correlation in [0, 1)
+        cloudy_prob: Probability of a cloudy day
+        cloudy_factor: Mean share of PV left on a cloudy day
+        seed: Random seed
+
+    Returns:
+        (PV, Load) scenario matrices of shape (S, H)
+    """
+    PV = np.asarray(PV, dtype=float)
+    Load = np.asarray(Load, dtype=float)
+    rng = np.random.default_rng(seed)
+    S, H = int(samples), PV.shape[0]
+    pv = PV * np.maximum(1.0 + pv_sigma * _ar1(rng, S, H, correlation), 0.0)
+    load = Load * np.maximum(1.0 + load_sigma * _ar1(rng, S, H, correlation), 0.0)
+    cloudy = rng.random(S) < cloudy_prob
+    factor = np.clip(cloudy_factor * rng.uniform(0.5, 1.5, S), 0.0, 1.0)
+    pv[cloudy] *= factor[cloudy, None]
+    return pv, load
+
+
+def kmedoids(X, k: int, probs=None, max_iter: int = 50, seed: Optional[int] = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Weighted k-medoids (alternating assignment and medoid update)
+
+    The pairwise distance matrix is computed once; each iteration is one
+    argmin over the medoid columns and one (S, S) x (S, k) product giving
+    every point's total distance to every cluster, so no Python loop runs
+    over points or clusters.
+
+    Args:
+        X: Points (S, F)
+        k: Number of medoids (capped at S)
+        probs: Optional point weights (S,); uniform if omitted
+        max_iter: Maximum iterations
+        seed: Seed for the k-medoids++ initialization
+
+    Returns:
+        (medoids, labels): medoid row indices (k,) and each point's cluster (S,)
+    """
+    X = np.asarray(X, dtype=float)
+    S = X.shape[0]
+    k = max(1, min(int(k), S))
+    w = np.full(S, 1.0 / S) if probs is None else np.asarray(probs, dtype=float)
+    sq = np.einsum('ij,ij->i', X, X)
+    dist = np.sqrt(np.maximum(sq[:, None] + sq[None, :] - 2.0 * X @ X.T, 0.0))
+
+    # k-medoids++: each new medoid is drawn proportionally to weight * distance to the nearest one
+    rng = np.random.default_rng(seed)
+    medoids = [int(np.argmax(w))]
+    nearest = dist[medoids[0]].copy()
+    for _ in range(1, k):
+        p = w * nearest
+        medoids.append(int(rng.choice(S, p=p / p.sum())) if p.sum() > 0 else int(np.argmax(nearest)))
+        nearest = np.minimum(nearest, dist[medoids[-1]])
+    medoids = np.array(medoids)
+
+    for _ in range(max_iter):
+        labels = np.argmin(dist[:, medoids], axis=1)
+        members = np.zeros((S, k))
+        members[np.arange(S), labels] = w
+        # cost[i, c]: weighted distance from point i to the members of cluster c, over members only
+        cost = dist @ members
+        cost[members == 0] = np.inf
+        # A cluster left empty (duplicate points) keeps its medoid
+        updated = np.where(np.isfinite(cost.min(axis=0)), np.argmin(cost, axis=0), medoids)
+        if np.array_equal(updated, medoids):
+            break
+        medoids = updated
+    return medoids, np.argmin(dist[:, medoids], axis=1)
+
+
+def reduce_scenarios(PV, Load, k: int, probs=None, seed: Optional[int] = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Reduce (S, H) PV/load scenarios to k representatives by k-medoids
+
+    Profiles are concatenated per scenario and scaled by their overall means,
+    so PV and load errors weigh alike.
+
+    Returns:
+        (PV, Load, probabilities) of the k medoid scenarios; each probability is
+        the total weight of its cluster
+    """
+    PV = np.asarray(PV, dtype=float)
+    Load = np.asarray(Load, dtype=float)
+    S = PV.shape[0]
+    w = np.full(S, 1.0 / S) if probs is None else np.asarray(probs, dtype=float) / np.sum(probs)
+    features = np.hstack([PV / max(PV.mean(), 1e-9), Load / max(Load.mean(), 1e-9)])
+    medoids, labels = kmedoids(features, k, w, seed=seed)
+    return PV[medoids], Load[medoids], np.bincount(labels, weights=w, minlength=len(medoids))
+
+
+def recourse_costs(data: Dict[str, Any], charge, discharge, PV, Load) -> np.ndarray:
+    """
+    Cost of a fixed battery schedule in each scenario (the optimal grid recourse)
+
+    With the battery fixed, each hour's net demand is imported if positive and
+    exported otherwise, which is optimal whenever the import price is at least
+    the export price (otherwise the LP is unbounded anyway).
+
+    Args:
+        data: Model data (prices)
+        charge: Battery charge schedule (H,)
+        discharge: Battery discharge schedule (H,)
+        PV: Scenario PV profiles (S, H)
+        Load: Scenario load profiles (S, H)
+
+    Returns:
+        Cost per scenario (S,)
+    """
+    net = np.asarray(Load, dtype=float) - np.asarray(PV, dtype=float) - np.asarray(discharge) + np.asarray(charge)
+    return (data['price_import'] * np.maximum(net, 0.0) - data['price_export'] * np.maximum(-net, 0.0)).sum(axis=1)
+
+
+def cost_stats(costs) -> Dict[str, float]:
+    """Expected cost, spread and tail (95th percentile, CVaR 95%, worst case) of equally likely costs"""
+    costs = np.sort(np.asarray(costs, dtype=float))
+    tail = costs[int(np.floor(0.95 * len(costs))):]
+    return {'expected': float(costs.mean()), 'std': float(costs.std()),
+            'p95': float(np.percentile(costs, 95)), 'cvar95': float(tail.mean()), 'worst': float(costs[-1])}
+
+
+def build_stochastic_model(data: Dict[str, Any], PV, Load, probs):
+    """Build (without solving) the two-stage PuLP model; returns (prob, (Pimp, Pexp, C, D, SoC))"""
+    import pulp as pl
+    H = data['H']
+    S = len(probs)
+    cap = data['battery_capacity_kwh']; eff = data['battery_eff']; pmax = data['battery_pmax']
+    price_i = data['price_import']; price_e = data['price_export']; init_soc = data['init_soc'] * cap
+    prob = pl.LpProblem('rec_stochastic', pl.LpMinimize)
+    # First stage: one battery schedule for every scenario
+    C = pl.LpVariable.dicts('C', range(H), lowBound=0, upBound=pmax)
+    D = pl.LpVariable.dicts('D', range(H), lowBound=0, upBound=pmax)
+    SoC = pl.LpVariable.dicts('SoC', range(H), lowBound=0, upBound=cap)
+    # Second stage: grid flows per scenario
+    Pimp = pl.LpVariable.dicts('Pimp', (range(S), range(H)), lowBound=0)
+    Pexp = pl.LpVariable.dicts('Pexp', (range(S), range(H)), lowBound=0)
+    for t in range(H):
+        prob += (SoC[t] == (init_soc if t == 0 else SoC[t - 1]) + eff * C[t] - D[t] / eff, f'soc_{t}')
+    net = (np.asarray(Load, dtype=float) - np.asarray(PV, dtype=float)).tolist()
+    for s in range(S):
+        for t in range(H):
+            prob += (D[t] + Pimp[s][t] - C[t] - Pexp[s][t] == net[s][t], f'balance_{s}_{t}')
+    prob += pl.lpSum(float(p) * (price_i * Pimp[s][t] - price_e * Pexp[s][t])
+                     for s, p in enumerate(probs) for t in range(H))
+    return prob, (Pimp, Pexp, C, D, SoC)
+
+
+def solve_stochastic(data: Dict[str, Any], PV, Load, probs, solver='pulp', return_dispatch=False) -> Dict[str, Any]:
+    """
+    Solve the two-stage model over given scenarios
+
+    Args:
+        data: Model data (battery and prices; the profiles are ignored)
+        PV: Scenario PV profiles (S, H)
+        Load: Scenario load profiles (S, H)
+        probs: Scenario probabilities (S,)
+        solver: 'pulp' or 'highs'
+        return_dispatch: If True, optimal results also carry the shared
+            battery_charge, battery_discharge and soc schedules and the
+            per-scenario grid_import and grid_export (S lists of H)
+
+    Returns:
+        Result dictionary as from build_and_solve; 'objective' is the expected
+        cost and 'scenario_objectives' the cost of each scenario
+    """
+    if solver == 'gurobi':
+        return {'status': 'error', 'objective': float('inf'), 'error': "Stochastic mode supports the 'pulp' and 'highs' solvers"}
+    try:
+        H = data['H']
+        with span('model_build', H=H, scenarios=len(probs)):
+            prob, (Pimp, Pexp, C, D, SoC) = build_stochastic_model(data, PV, Load, probs)
+        res = _solve_pulp(prob, None, H, solver)
+    except Exception as e:
+        return {'status': 'error', 'objective': float('inf'), 'error': str(e)}
+    if res['status'] == 'optimal':
+        value = lambda v: v.varValue or 0.0
+        charge = [value(C[t]) for t in range(H)]
+        discharge = [value(D[t]) for t in range(H)]
+        res['scenario_objectives'] = recourse_costs(data, charge, discharge, PV, Load).tolist()
+        if return_dispatch:
+            res.update({'battery_charge': charge, 'battery_discharge': discharge, 'soc': [value(SoC[t]) for t in range(H)],
+                        'grid_import': [[value(Pimp[s][t]) for t in range(H)] for s in range(len(probs))],
+                        'grid_export': [[value(Pexp[s][t]) for t in range(H)] for s in range(len(probs))]})
+    return res
+
+
+def robustness_analysis(data: Dict[str, Any], solver='pulp', settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Compare the perfect-foresight plan with a stochastic plan under sampled uncertainty
+
+    Samples `settings['samples']` scenarios around data's profiles, reduces them
+    to `settings['scenarios']` medoids, solves the two-stage model on the
+    medoids and scores both battery schedules on every sample.
+
+    Args:
+        data: Model data; its PV and Load are the forecast
+        solver: 'pulp' or 'highs'
+        settings: Uncertainty settings (see DEFAULT_UNCERTAINTY)
+
+    Returns:
+        The two-stage result with 'objective' (the stochastic plan's expected
+        cost over all samples), 'reduced_objective' (the model's expected cost
+        over the medoids), the shared battery schedule, 'scenarios' (sample count, cloudy share and
+        medoid probabilities) and 'robustness': cost statistics of the
+        'deterministic' and 'stochastic' plans over all samples and their
+        'value_of_stochastic_solution' (expected saving of the stochastic plan)
+    """
+    settings = settings or uncertainty_settings()
+    with span('scenario_generation', samples=settings['samples']):
+        pv, load = sample_scenarios(data['PV'], data['Load'], **settings)
+    with span('scenario_reduction', scenarios=settings['scenarios']):
+        pv_r, load_r, probs = reduce_scenarios(pv, load, settings['scenarios'], seed=settings['seed'])
+    res = solve_stochastic(data, pv_r, load_r, probs, solver=solver, return_dispatch=True)
+    if res['status'] != 'optimal':
+        return res
+
+    forecast = build_and_solve(data, solver=solver, return_dispatch=True)
+    if forecast['status'] != 'optimal':
+        return {'status': forecast['status'], 'objective': float('inf'),
+                'error': forecast.get('error', 'perfect-foresight plan could not be solved')}
+    deterministic = cost_stats(recourse_costs(data, forecast['battery_charge'], forecast['battery_discharge'], pv, load))
+    stochastic = cost_stats(recourse_costs(data, res['battery_charge'], res['battery_discharge'], pv, load))
+    res['scenarios'] = {'samples': int(settings['samples']), 'count': len(probs),
+                        'cloudy_prob': float(settings['cloudy_prob']), 'probabilities': probs.tolist()}
+    res['reduced_objective'] = res['objective']
+    res['objective'] = stochastic['expected']
+    res['robustness'] = {
+        'forecast_objective': forecast['objective'],
+        'deterministic': deterministic,
+        'stochastic': stochastic,
+        'value_of_stochastic_solution': deterministic['expected'] - stochastic['expected'],
+    }
+    return res
@@ -0,0 +1,338 @@
+"""
+HTTP/JSON server for Chat-SGP
+
+Keeps the agents, LLM client and result cache warm across requests, so each
+request pays only for parsing, solving and interpreting. Requests run on a
+bounded worker pool; when more than `max_pending` questions are queued or
+running, new requests are rejected with 503 and a Retry-After header; a
+batch larger than `max_pending` could never be admitted and gets 413.
+
+Endpoints:
+    POST /run_question  {"question": str, "solver": "pulp"}
+    POST /sweep         {"target": "PV", "values": [-20, 0, 20], "ops": [...], "solver": "pulp"}
+    POST /batch         {"questions": [str, ...], "solver": "pulp"}
+    POST /reload        re-read the configuration files
+    GET  /health
+    GET  /stats
+
+The POST endpoints also take "site" (a configuration registered with
+`sites=` / `--site`) and "overrides" (e.g. {"prices": {"import": 0.3}}), so
+one server answers for several communities or tariffs at once.
+"""
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from .agents.coder_agent import CoderAgent
+from .agents.optimizer_agent import OptimizerAgent
+from .agents.interpreter_agent import InterpreterAgent
+from .agents.orchestrator import Orchestrator
+from .config import Config, ConfigRegistry, ConfigSnapshot, get_config, use_config
+from .optimization.solver_pool import SolverPool
+from .utils.llm_backend import create_llm
+from .utils.validation import validate_operations_batch
+
+
+class ServerBusy(Exception):
+    """Raised when the request queue is full"""
+
+
+class RequestTooLarge(Exception):
+    """Raised when a request needs more queue slots than the server ever admits"""
+
+
+def _is_client_error(e: BaseException) -> bool:
+    """Whether a pipeline failure was caused by the request (an invalid question or operations)"""
+    # The orchestrator wraps stage failures in RuntimeError("Pipeline failed: ...");
+    # the pipeline raises ValueError only for input that fails validation
+    return isinstance(e, RuntimeError) and isinstance(e.__cause__, ValueError)
+
+
+def load_icl(path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Load coder ICL examples (defaults to the bundled examples)"""
+    p = Path(path) if path else Path(__file__).parent / 'icl' / 'examples.jsonl'
+    ex = []
+    if p.exists():
+        for line in p.read_text(encoding='utf-8').splitlines():
+            if line.strip():
+                ex.append(json.loads(line))
+    return ex
+
+
+class LRUCache:
+    """Small thread-safe LRU cache"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class PipelineService:
+    """Warm pipeline shared by all server requests"""
+
+    def __init__(self, config: Optional[Config] = None, llm=None, workers: int = 4,
+                 max_pending: int = 64, cache_size: int = 1024, speculative: bool = False,
+                 solver_workers: int = 0, config_check_interval: Optional[float] = None,
+                 sites: Optional[Dict[str, Any]] = None):
+        """
+        Initialize PipelineService
+
+        Args:
+            config: Optional Config object. If None, uses global config.
+            llm: Optional LLM backend. If None, built from config.llm.
+            workers: Number of worker threads running pipeline jobs
+            max_pending: Maximum queued plus running jobs before requests get 503;
+                batches of more questions get 413
+            cache_size: Number of question results kept in the LRU cache (0 disables)
+            speculative: Enable speculative rule-based solves in the orchestrator
+            solver_workers: If > 0, solve models in a SolverPool of this many processes
+            config_check_interval: If set, reload the configuration file when it
+                changes, checking at most once per this many seconds. Reloads
+                apply to model data (profiles, prices, battery); the LLM client
+                is built once
+            sites: Optional site name -> Config, config file path or dict,
+                selectable per request with "site"
+        """
+        self.config = config if config is not None else get_config()
+        self.registry = ConfigRegistry(self.config)
+        for site, site_config in (sites or {}).items():
+            self.registry.register(site, site_config)
+        self.llm = llm if llm is not None else create_llm(self.config.get_llm_config())
+        self.solver_pool = SolverPool(workers=solver_workers) if solver_workers > 0 else None
+        self.optimizer = OptimizerAgent(config=self.config, solver_pool=self.solver_pool)
+        self.orchestrator = Orchestrator(
+            CoderAgent(load_icl(), llm=self.llm),
+            self.optimizer,
+            InterpreterAgent(llm=self.llm, profile_token_budget=self.config.get('llm.profile_token_budget', 200)),
+            speculative=speculative
+        )
+        self.max_pending = max_pending
+        self.config_check_interval = config_check_interval
+        self.cache = LRUCache(cache_size)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pipeline')
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _reserve(self, n: int):
+        if n > self.max_pending:
+            raise RequestTooLarge(f"Request needs {n} queue slots, limit {self.max_pending}; split it up")
+        with self._lock:
+            if self._pending + n > self.max_pending:
+                raise ServerBusy(f"Queue full ({self._pending} pending, limit {self.max_pending})")
+            self._pending += n
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._pending -= 1
+
+    def _submit_all(self, calls):
+        """Run (fn, args) pairs on the pool, all-or-nothing admission; returns futures"""
+        self._reserve(len(calls))
+        futures = []
+        for fn, args in calls:
+            future = self._pool.submit(fn, *args)
+            future.add_done_callback(self._release)
+            futures.append(future)
+        return futures
+
+    def reload_config(self) -> Dict[str, Any]:
+        """Re-read the configuration files; cached results of old configurations stop matching"""
+        reloaded = self.config.reload()
+        for site in self.registry.sites():
+            reloaded = self.registry.get(site).reload() or reloaded
+        return {'reloaded': reloaded, 'config_hash': self.config.content_hash, 'sites': self.registry.sites()}
+
+    def resolve_config(self, site: Optional[str] = None,
+                       overrides: Optional[Dict[str, Any]] = None) -> ConfigSnapshot:
+        """
+        Configuration snapshot for a request
+
+        Raises:
+            ValueError: If the site is unknown or the overrides are invalid
+        """
+        if self.config_check_interval is not None:
+            self.registry.reload_if_changed(self.config_check_interval)
+        try:
+            return self.registry.resolve(site, overrides)
+        except KeyError as e:
+            raise ValueError(e.args[0]) from None
+
+    def _answer(self, question: str, solver: str, config: ConfigSnapshot) -> Dict[str, Any]:
+        key = (question, solver, config.content_hash)
+        cached = self.cache.get(key)
+        if cached is None:
+            cached = self.orchestrator.run_question(question, solver=solver, config=config)
+            self.cache.put(key, cached)
+        return {'question': question, **cached}
+
+    def run_question(self, question: str, solver: str = 'pulp', site: Optional[str] = None,
+                     overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Run one question through the pipeline, for a site and with overrides if given"""
+        config = self.resolve_config(site, overrides)
+        return self._submit_all([(self._answer, (question, solver, config))])[0].result()
+
+    def batch(self, questions: List[str], solver: str = 'pulp', site: Optional[str] = None,
+              overrides: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Run questions in parallel; per-question failures are reported, not raised"""
+        config = self.resolve_config(site, overrides)
+        futures = self._submit_all([(self._answer, (q, solver, config)) for q in questions])
+        results = []
+        for question, future in zip(questions, futures):
+            try:
+                results.append({'question': question, 'result': future.result(), 'status': 'success'})
+            except Exception as e:
+                results.append({'question': question, 'error': str(e), 'status': 'error'})
+        return results
+
+    def _solve_many(self, bundles: List[List[Dict[str, Any]]], solver: str,
+                    config: ConfigSnapshot) -> Dict[str, Any]:
+        with use_config(config):
+            return self.optimizer.run_many([{'ops': ops} for ops in bundles], solver=solver)
+
+    def sweep(self, target: str, values: List[float], ops: Optional[List[Dict[str, Any]]] = None,
+              solver: str = 'pulp', site: Optional[str] = None,
+              overrides: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Solve one scenario per value of a scale_series sweep (no LLM involved)
+
+        The scenarios are solved together with `OptimizerAgent.run_many`, as
+        one job, so a sweep takes a single queue slot whatever its length.
+
+        Args:
+            target: Series to scale ('PV', 'Load', 'Pimp', 'Pexp')
+            values: Percentages to apply
+            ops: Optional operations applied before the swept one
+            solver: Solver to use
+            site: Optional registered site
+            overrides: Optional per-request configuration overrides
+
+        Raises:
+            ValueError: If the swept or base operations, the site or the overrides are invalid
+        """
+        base = list(ops or [])
+        bundles = [base + [{'op': 'scale_series', 'target': target, 'scale_pct': v}] for v in values]
+        config = self.resolve_config(site, overrides)
+        valid, errors = validate_operations_batch(bundles, hours=config.hours)
+        if not valid.all():
+            raise ValueError(next(e for e in errors if e))
+        out = self._submit_all([(self._solve_many, (bundles, solver, config))])[0].result()
+        return [{'scale_pct': v, 'status': status, 'objective': float(objective)}
+                for v, status, objective in zip(values, out['status'], out['objective'])]
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, cache and LLM metrics"""
+        metrics = getattr(self.llm, 'metrics', None)
+        return {
+            'pending': self._pending,
+            'config_hash': self.config.content_hash,
+            'sites': self.registry.sites(),
+            'max_pending': self.max_pending,
+            'cache': {'size': len(self.cache), 'hits': self.cache.hits, 'misses': self.cache.misses},
+            'llm': metrics.summary() if metrics is not None else None,
+            'solver_pool': self.solver_pool.stats() if self.solver_pool is not None else None,
+        }
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        if self.solver_pool is not None:
+            self.solver_pool.close()
+
+
+class PipelineRequestHandler(BaseHTTPRequestHandler):
+    """JSON request handler dispatching to the server's PipelineService"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def _send(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == '/health':
+            self._send(200, {'status': 'ok'})
+        elif self.path == '/stats':
+            self._send(200, service.stats())
+        else:
+            self._send(404, {'error': f'Unknown endpoint {self.path}'})
+
+    def do_POST(self):
+        service = self.server.service
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(body, dict):
+                raise ValueError("Request body must be a JSON object")
+            solver = body.get('solver', 'pulp')
+            scope = {'site': body.get('site'), 'overrides': body.get('overrides')}
+            if self.path == '/run_question':
+                if 'question' not in body:
+                    raise ValueError("Missing 'question'")
+                self._send(200, service.run_question(body['question'], solver=solver, **scope))
+            elif self.path == '/batch':
+                questions = body.get('questions')
+                if not isinstance(questions, list):
+                    raise ValueError("'questions' must be a list")
+                self._send(200, {'results': service.batch(questions, solver=solver, **scope)})
+            elif self.path == '/reload':
+                self._send(200, service.reload_config())
+            elif self.path == '/sweep':
+                if 'target' not in body or not isinstance(body.get('values'), list):
+                    raise ValueError("Sweep needs 'target' and a list of 'values'")
+                self._send(200, {'results': service.sweep(body['target'], body['values'],
+                                                          ops=body.get('ops'), solver=solver, **scope)})
+            else:
+                self._send(404, {'error': f'Unknown endpoint {self.path}'})
+        except ServerBusy as e:
+            self._send(503, {'error': str(e)}, headers={'Retry-After': '1'})
+        except RequestTooLarge as e:
+            self._send(413, {'error': str(e)})
+        except (ValueError, json.JSONDecodeError) as e:
+            self._send(400, {'error': str(e)})
+        except Exception as e:
+            self._send(400 if _is_client_error(e) else 500, {'error': str(e)})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(service: PipelineService, host: str = '127.0.0.1', port: int = 8000) -> ThreadingHTTPServer:
+    """Create (but don't start) an HTTP server bound to `service`"""
+    server = ThreadingHTTPServer((host, port), PipelineRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
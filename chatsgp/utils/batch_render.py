@@ -0,0 +1,174 @@
+"""
+Headless batch rendering of scenario plots
+
+Renders energy-flow thumbnails for many scenarios without pyplot: each
+process builds one `FlowsTemplate` per horizon on the Agg canvas and, for
+every scenario, only updates line data, bar heights, limits and the title
+before saving a small PNG or SVG. `render_many` spreads scenarios over worker
+processes in chunks, so evaluation runs with thousands of scenarios can be
+plotted quickly. matplotlib is imported on first use.
+"""
+
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+FLOW_KEYS = ('battery_charge', 'battery_discharge', 'grid_import', 'grid_export')
+
+
+class FlowsTemplate:
+    """
+    Reusable energy-flow figure for one horizon
+
+    Top panel: PV and load lines with battery charge/discharge bars; bottom
+    panel: grid import/export bars. Artists are created once and updated per
+    scenario.
+    """
+
+    def __init__(self, hours: int, figsize: Tuple[float, float] = (4.0, 2.5), dpi: int = 72):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        self.hours = hours
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(self.fig)
+        self.ax_flows, self.ax_grid = self.fig.subplots(2, 1, sharex=True)
+        x = np.arange(hours)
+        zeros = np.zeros(hours)
+
+        self.pv, = self.ax_flows.plot(x, zeros, color='green', linewidth=1.2, label='PV')
+        self.load, = self.ax_flows.plot(x, zeros, color='red', linewidth=1.2, label='Load')
+        self.bars = {
+            'battery_charge': self.ax_flows.bar(x - 0.2, zeros, width=0.4, color='blue', alpha=0.6),
+            'battery_discharge': self.ax_flows.bar(x + 0.2, zeros, width=0.4, color='orange', alpha=0.6),
+            'grid_import': self.ax_grid.bar(x - 0.2, zeros, width=0.4, color='red', alpha=0.7, label='Import'),
+            'grid_export': self.ax_grid.bar(x + 0.2, zeros, width=0.4, color='green', alpha=0.7, label='Export'),
+        }
+        self.title = self.ax_flows.set_title('', fontsize=7)
+
+        for ax in (self.ax_flows, self.ax_grid):
+            ax.tick_params(labelsize=5, length=2)
+            ax.set_xlim(-0.5, hours - 0.5)
+            ax.axhline(0, color='k', linewidth=0.4)
+        self.ax_flows.legend(loc='upper left', fontsize=5, frameon=False, ncol=2)
+        self.ax_grid.legend(loc='upper left', fontsize=5, frameon=False, ncol=2)
+        self.fig.subplots_adjust(left=0.08, right=0.98, top=0.9, bottom=0.08, hspace=0.15)
+
+    @staticmethod
+    def _limits(*arrays: np.ndarray) -> Tuple[float, float]:
+        lo = min(0.0, *(float(a.min()) for a in arrays))
+        hi = max(0.0, *(float(a.max()) for a in arrays))
+        pad = (hi - lo) * 0.08 or 1.0
+        return lo - pad, hi + pad
+
+    def update(self, scenario: Dict[str, Any]):
+        """Point the figure at a scenario ('PV', 'Load', flow arrays, optional 'title')"""
+        H = self.hours
+        pv = np.nan_to_num(np.asarray(scenario.get('PV', np.zeros(H)), dtype=float)[:H])
+        load = np.nan_to_num(np.asarray(scenario.get('Load', np.zeros(H)), dtype=float)[:H])
+        flows = {k: np.nan_to_num(np.asarray(scenario.get(k, np.zeros(H)), dtype=float)[:H]) for k in FLOW_KEYS}
+        flows['battery_discharge'] = -flows['battery_discharge']
+
+        self.pv.set_ydata(pv)
+        self.load.set_ydata(load)
+        for key, container in self.bars.items():
+            for rect, h in zip(container.patches, flows[key]):
+                rect.set_height(h)
+        self.ax_flows.set_ylim(*self._limits(pv, load, flows['battery_charge'], flows['battery_discharge']))
+        self.ax_grid.set_ylim(*self._limits(flows['grid_import'], flows['grid_export']))
+        self.title.set_text(scenario.get('title', ''))
+
+    def save(self, path, fmt: Optional[str] = None):
+        """Save the current figure ('png' or 'svg'; default from the suffix)"""
+        self.fig.savefig(path, format=fmt)
+
+
+# Templates of this process by (hours, figsize, dpi)
+_TEMPLATES: Dict[tuple, FlowsTemplate] = {}
+
+
+def _template(hours: int, figsize: Tuple[float, float], dpi: int) -> FlowsTemplate:
+    key = (hours, tuple(figsize), dpi)
+    template = _TEMPLATES.get(key)
+    if template is None:
+        template = _TEMPLATES[key] = FlowsTemplate(hours, figsize, dpi)
+    return template
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', str(name))[:80] or 'scenario'
+
+
+def _render_chunk(jobs: List[Tuple[str, Dict[str, Any]]], fmt: str, figsize, dpi) -> List[str]:
+    paths = []
+    for path, scenario in jobs:
+        hours = len(scenario['PV']) if 'PV' in scenario else len(scenario['grid_import'])
+        template = _template(hours, figsize, dpi)
+        template.update(scenario)
+        template.save(path, fmt)
+        paths.append(path)
+    return paths
+
+
+def render_many(
+    scenarios: Iterable[Dict[str, Any]],
+    out_dir,
+    fmt: str = 'png',
+    workers: int = 0,
+    chunk_size: int = 64,
+    figsize: Tuple[float, float] = (4.0, 2.5),
+    dpi: int = 72
+) -> List[str]:
+    """
+    Render an energy-flow thumbnail per scenario
+
+    Args:
+        scenarios: Dicts with 'PV', 'Load' and the dispatch flows
+            (battery_charge, battery_discharge, grid_import, grid_export),
+            plus optional 'name' (file name) and 'title'
+        out_dir: Directory for the images (created if missing)
+        fmt: 'png' or 'svg'
+        workers: Worker processes (0 renders in this process)
+        chunk_size: Scenarios per worker job
+        figsize: Figure size in inches
+        dpi: Resolution of PNG thumbnails
+
+    Returns:
+        Paths of the rendered images, in scenario order
+    """
+    if fmt not in ('png', 'svg'):
+        raise ValueError(f"Unsupported format: {fmt}")
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    jobs = [(str(out_dir / f"{_safe_name(s.get('name', f'scenario_{i:05d}'))}.{fmt}"), s)
+            for i, s in enumerate(scenarios)]
+    chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), max(1, chunk_size))]
+    if workers <= 0 or len(chunks) <= 1:
+        return [p for chunk in chunks for p in _render_chunk(chunk, fmt, figsize, dpi)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        futures = [pool.submit(_render_chunk, chunk, fmt, figsize, dpi) for chunk in chunks]
+        return [p for f in futures for p in f.result()]
+
+
+def scenarios_from_results(results: Dict[str, Any], names: Optional[Sequence[str]] = None,
+                           titles: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Per-scenario dicts from `OptimizerAgent.run_many` output
+
+    Args:
+        results: run_many result arrays (with 'PV' and 'Load')
+        names: Optional file names per scenario
+        titles: Optional titles per scenario (default: the objective)
+    """
+    for i in range(len(results['objective'])):
+        objective = results['objective'][i]
+        title = titles[i] if titles is not None else (
+            f"EUR {objective:.2f}" if np.isfinite(objective) else results['status'][i])
+        scenario = {'PV': results['PV'][i], 'Load': results['Load'][i], 'title': title}
+        scenario.update({k: results[k][i] for k in FLOW_KEYS})
+        if names is not None:
+            scenario['name'] = names[i]
+        yield scenario
@@ -1,22 +1,127 @@
-"""Debug utility for logging agent prompts and outputs"""
-import os
+"""Debug utility for logging agent prompts and outputs
+
+Debug events are `(agent, section, payload)` triples. When debugging is off,
+`debug_print` returns after one module-level flag check, and payloads may be
+given as zero-argument callables so costly ones (profile lists, summaries) are
+never built. When it is on, events are pretty-printed to stdout or, with a
+file sink, appended as JSON lines (`ts`, `agent`, `section`, `data`) through a
+buffered, thread-safe writer. A sample rate keeps a fraction of events under load.
+
+The state is read from the environment (`DEBUG`, `DEBUG_FILE`,
+`DEBUG_SAMPLE`) on first use; `configure_debug` changes it at runtime.
+"""
+import atexit
 import json
+import os
+import random
+import threading
+import time
+
+_enabled = None  # None until the environment is first read
+_sink = None
+_sink_path = None
+_sample_rate = 1.0
+_lock = threading.Lock()
+
+
+def _jsonable(value):
+    """json.dumps fallback for NumPy arrays and scalars and other objects"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+
+def configure_debug(enabled=None, file=None, sample_rate=None):
+    """
+    Configure debug logging, overriding the environment
+
+    Args:
+        enabled: Turn debug logging on or off (None re-reads `DEBUG`)
+        file: Append JSON-lines events to this file instead of printing them
+            ('' goes back to stdout; None keeps the current sink or `DEBUG_FILE`).
+            `.gz`/`.zst` suffixes compress the log
+        sample_rate: Fraction of events to keep, 0-1 (None keeps the current
+            rate or `DEBUG_SAMPLE`)
+    """
+    global _enabled, _sample_rate
+    if enabled is None:
+        enabled = os.getenv('DEBUG', 'false').lower() in ('true', '1', 'yes')
+    if file is None and _sink_path is None:
+        file = os.getenv('DEBUG_FILE') or None
+    if sample_rate is None and _enabled is None:
+        sample_rate = float(os.getenv('DEBUG_SAMPLE', '1'))
+    if sample_rate is not None:
+        if not 0 <= sample_rate <= 1:
+            raise ValueError(f"sample_rate must be between 0 and 1, got {sample_rate}")
+        _sample_rate = sample_rate
+    if file is not None:
+        _set_sink(file or None)
+    _enabled = bool(enabled)
+
+
+def _set_sink(path):
+    global _sink, _sink_path
+    from .jsonl import open_jsonl
+    with _lock:
+        if _sink is not None:
+            _sink.close()
+        _sink = open_jsonl(path, 'a') if path else None
+        _sink_path = path
+
+
+def flush_debug():
+    """Flush buffered file-sink events"""
+    with _lock:
+        if _sink is not None:
+            _sink.flush()
+
+
+def close_debug():
+    """Close the file sink (events go to stdout again)"""
+    _set_sink(None)
+
+
+atexit.register(close_debug)
+
 
 def _is_debug_enabled():
-    """Check if debug is enabled (dynamically checks environment variable)"""
-    return os.getenv('DEBUG', 'false').lower() in ('true', '1', 'yes')
+    """Check if debug is enabled (the environment is read once, then cached)"""
+    if _enabled is None:
+        configure_debug()
+    return _enabled
+
 
 def debug_print(agent_name, section, content):
-    """Print debug information with formatting"""
-    if not _is_debug_enabled():
+    """
+    Log a debug event
+
+    Args:
+        agent_name: Agent emitting the event
+        section: Event name
+        content: Payload (dict, string or other value), or a zero-argument
+            callable returning it, called only if the event is logged
+    """
+    if not (_enabled or (_enabled is None and _is_debug_enabled())):
         return
-    
+    if _sample_rate < 1 and random.random() >= _sample_rate:
+        return
+    if callable(content):
+        content = content()
+
+    if _sink is not None:
+        line = json.dumps({'ts': time.time(), 'agent': agent_name, 'section': section, 'data': content},
+                          ensure_ascii=False, default=_jsonable)
+        with _lock:
+            if _sink is not None:
+                _sink.write(line + '\n')
+        return
+
     print(f"\n{'='*80}")
     print(f"[DEBUG] {agent_name} - {section}")
     print(f"{'='*80}")
-    
+
     if isinstance(content, dict):
-        print(json.dumps(content, indent=2, ensure_ascii=False))
+        print(json.dumps(content, indent=2, ensure_ascii=False, default=_jsonable))
     elif isinstance(content, str):
         # Print long strings with word wrapping
         if len(content) > 200:
@@ -25,7 +130,7 @@ def debug_print(agent_name, section, content):
             print(content)
     else:
         print(str(content))
-    
+
     print(f"{'='*80}\n")
 
 def debug_prompt(agent_name, prompt):
@@ -37,6 +142,5 @@ def debug_response(agent_name, response):
     debug_print(agent_name, "RESPONSE", response)
 
 def debug_data(agent_name, data_name, data):
-    """Debug print for data"""
+    """Debug print for data (pass a callable to build costly payloads lazily)"""
     debug_print(agent_name, f"DATA: {data_name}", data)
-
@@ -0,0 +1,235 @@
+"""
+Streaming JSONL reading and writing
+
+Files ending in .gz are gzip-compressed and files ending in .zst/.zstd are
+zstd-compressed (requires the optional `zstandard` package); anything else is
+plain text. Readers are generators and writers flush as they go, so batch runs
+use constant memory and a crashed run loses at most the unflushed tail.
+Appending to a compressed file adds a new gzip member / zstd frame, which the
+readers handle transparently.
+"""
+import gzip
+import io
+import json
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, Union
+
+PathLike = Union[str, Path]
+
+
+def _compression(path: PathLike) -> str:
+    suffix = Path(path).suffix.lower()
+    if suffix == '.gz':
+        return 'gzip'
+    if suffix in ('.zst', '.zstd'):
+        return 'zstd'
+    return 'none'
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("Reading or writing .zst files requires the 'zstandard' package") from e
+    return zstandard
+
+
+def open_jsonl(path: PathLike, mode: str = 'r'):
+    """
+    Open a (possibly compressed) JSONL file as text
+
+    Args:
+        path: File path; compression is picked from the suffix
+        mode: 'r', 'w' or 'a'
+
+    Returns:
+        Text file object
+    """
+    if mode not in ('r', 'w', 'a'):
+        raise ValueError(f"Unsupported mode: {mode}")
+    kind = _compression(path)
+    if kind == 'gzip':
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    if kind == 'zstd':
+        zstandard = _zstandard()
+        raw = open(path, mode + 'b')
+        if mode == 'r':
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+        else:
+            stream = zstandard.ZstdCompressor().stream_writer(raw)
+        return io.TextIOWrapper(stream, encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def iter_jsonl(path: PathLike, skip_invalid: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Yield records from a JSONL file one at a time
+
+    A truncated final line or compressed stream (e.g. after a crash) ends the
+    iteration instead of raising.
+
+    Args:
+        path: File path
+        skip_invalid: Skip lines that are not valid JSON instead of raising
+
+    Yields:
+        Parsed records
+    """
+    with open_jsonl(path) as f:
+        try:
+            for line in f:
+                if not line.strip():
+                    continue
+                if not line.endswith('\n'):
+                    # Partially written last record
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        return
+                    yield record
+                    return
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    if not skip_invalid:
+                        raise
+        except EOFError:
+            return
+        except Exception as e:
+            # zstandard reports a truncated frame as its own ZstdError
+            if type(e).__name__ == 'ZstdError':
+                return
+            raise
+
+
+def completed_counts(path: PathLike, key: str = 'question') -> Counter:
+    """
+    Count the records already in an output file by `key`, for resuming
+
+    Returns an empty Counter if the file does not exist.
+    """
+    counts = Counter()
+    if Path(path).exists():
+        for record in iter_jsonl(path, skip_invalid=True):
+            counts[record.get(key)] += 1
+    return counts
+
+
+def skip_completed(records: Iterable[Dict[str, Any]], done: Counter, key: str = 'question') -> Iterator[Dict[str, Any]]:
+    """
+    Yield the records not yet present in an output file
+
+    `done` is consumed as records are skipped, so a question asked twice in the
+    input is only skipped as many times as it appears in the output.
+    """
+    for record in records:
+        k = record.get(key)
+        if done.get(k, 0) > 0:
+            done[k] -= 1
+            continue
+        yield record
+
+
+def _tail_start(f, size: int, block: int = 1 << 16) -> int:
+    """Offset just past the last newline of a binary file, reading backwards in blocks"""
+    pos = size
+    while pos > 0:
+        step = min(block, pos)
+        pos -= step
+        f.seek(pos)
+        i = f.read(step).rfind(b'\n')
+        if i >= 0:
+            return pos + i + 1
+    return 0
+
+
+def _repair(path: Path):
+    """
+    Drop a partially written tail so appended records start on a clean line
+
+    Only the final record may be torn; an invalid record earlier in a
+    compressed file raises json.JSONDecodeError and leaves the file as is.
+    """
+    if _compression(path) == 'none':
+        with open(path, 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            end = _tail_start(f, size)
+            if end < size:
+                f.seek(end)
+                try:
+                    # Complete record that only lost its newline: keep it
+                    json.loads(f.read())
+                    f.write(b'\n')
+                except ValueError:
+                    f.truncate(end)
+        return
+    # A compressed stream can't be truncated in place; rewrite the readable records
+    # (iter_jsonl stops at a torn last record and raises on any other invalid one)
+    tmp = path.with_name(path.stem + '.tmp' + path.suffix)
+    try:
+        with open_jsonl(tmp, 'w') as out:
+            for record in iter_jsonl(path):
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    os.replace(tmp, path)
+
+
+class JsonlWriter:
+    """Incremental JSONL writer with periodic flushing and append-on-resume"""
+
+    def __init__(self, path: PathLike, resume: bool = False, flush_every: int = 1):
+        """
+        Initialize JsonlWriter
+
+        Args:
+            path: Output path; .gz/.zst suffixes enable compression
+            resume: Append to an existing file (after dropping a torn last record) instead of overwriting
+            flush_every: Flush after this many records
+        """
+        self.path = Path(path)
+        self.flush_every = max(1, flush_every)
+        self.count = 0
+        if resume and self.path.exists():
+            if _compression(self.path) == 'none' or self._truncated():
+                _repair(self.path)
+            mode = 'a'
+        else:
+            if self.path.parent and not self.path.parent.exists():
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+            mode = 'w'
+        self._f = open_jsonl(self.path, mode)
+
+    def _truncated(self) -> bool:
+        """Whether a compressed file ends in an incomplete stream"""
+        try:
+            with open_jsonl(self.path) as f:
+                for _ in f:
+                    pass
+            return False
+        except EOFError:
+            return True
+        except Exception as e:
+            if type(e).__name__ == 'ZstdError':
+                return True
+            raise
+
+    def write(self, record: Dict[str, Any]):
+        """Append one record"""
+        self._f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self._f.flush()
+
+    def close(self):
+        if not self._f.closed:
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
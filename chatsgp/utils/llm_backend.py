@@ -1,5 +1,9 @@
 import os
-from openai import OpenAI
+import random
+import threading
+import time
+from collections import deque
+from functools import lru_cache
 
 def _load_env_file():
     """Load environment variables from .env file if it exists"""
@@ -18,14 +22,288 @@ def _load_env_file():
 # Load .env file when module is imported
 _load_env_file()
 
-class LLM:
-    def __init__(self, model='gpt-4o-mini'):
+@lru_cache(maxsize=None)
+def retryable_errors():
+    """Errors worth retrying: rate limits, timeouts, dropped connections and 5xx"""
+    # openai is imported on first use; it dominates package import time
+    import openai
+    return (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError)
+
+
+class TokenBucket:
+    """Thread-safe token bucket holding up to `capacity` tokens, refilled at `rate` tokens per second"""
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    def acquire(self, amount=1.0):
+        """Block until `amount` tokens are available, then take them"""
+        amount = min(float(amount), self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits; either may be None (unlimited)"""
+    def __init__(self, rpm=None, tpm=None):
+        self.requests = TokenBucket(rpm / 60.0, rpm) if rpm else None
+        self.tokens = TokenBucket(tpm / 60.0, tpm) if tpm else None
+    def acquire(self, tokens=0):
+        if self.requests is not None: self.requests.acquire(1)
+        if self.tokens is not None and tokens: self.tokens.acquire(tokens)
+
+
+# Process-wide pools so every LLM instance talking to the same endpoint shares
+# one client (and its keep-alive connections) and one rate limiter
+_pool_lock = threading.Lock()
+_clients = {}
+_limiters = {}
+
+def get_shared_client(api_key, base_url=None):
+    """Return the pooled OpenAI client for (api_key, base_url), creating it on first use"""
+    key = (api_key, base_url)
+    with _pool_lock:
+        if key not in _clients:
+            from openai import OpenAI
+            # Retries are handled by LLM so they share the rate limiter
+            _clients[key] = OpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+        return _clients[key]
+
+def get_shared_limiter(api_key, base_url, model, rpm=None, tpm=None):
+    """Return the pooled RateLimiter for an endpoint/model pair, or None when unlimited"""
+    if not rpm and not tpm: return None
+    key = (api_key, base_url, model, rpm, tpm)
+    with _pool_lock:
+        if key not in _limiters:
+            _limiters[key] = RateLimiter(rpm, tpm)
+        return _limiters[key]
+
+def reset_pools():
+    """Drop all pooled clients and limiters (mainly for tests)"""
+    with _pool_lock:
+        _clients.clear(); _limiters.clear()
+
+
+class BackendMetrics:
+    """Thread-safe call, token and latency counters for one backend"""
+    def __init__(self, backend, window=10000):
+        self.backend = backend
+        self.calls = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+    def record(self, latency, prompt_tokens=0, completion_tokens=0, error=False):
+        with self._lock:
+            self.calls += 1
+            self.errors += int(error)
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.latencies.append(latency)
+    def summary(self):
+        """Return counters plus mean/p50/p95 latency (seconds) over the recent window"""
+        with self._lock:
+            lat = sorted(self.latencies)
+            out = {'backend': self.backend, 'calls': self.calls, 'errors': self.errors,
+                   'prompt_tokens': self.prompt_tokens, 'completion_tokens': self.completion_tokens}
+        pct = lambda q: lat[min(len(lat) - 1, int(q * len(lat)))] if lat else 0.0
+        out.update({'latency_mean_s': sum(lat) / len(lat) if lat else 0.0,
+                    'latency_p50_s': pct(0.50), 'latency_p95_s': pct(0.95)})
+        return out
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token), enough for budgeting and metrics"""
+    return len(text) // 4
+
+
+class LLMBackend:
+    """
+    Interface for chat-completion backends used by the agents
+
+    Subclasses implement _complete (and optionally _complete_stream); complete()
+    and complete_stream() wrap them with latency and token metrics.
+    """
+    name = 'base'
+    model = None
+    client = None
+    def __init__(self):
+        self.metrics = BackendMetrics(self.name)
+    @property
+    def available(self):
+        """Whether this backend can serve completions"""
+        return self.client is not None
+    def _complete(self, prompt, temperature, max_tokens):
+        """Return (text, prompt_tokens, completion_tokens)"""
+        raise NotImplementedError
+    def _complete_stream(self, prompt, temperature, max_tokens):
+        text, _, _ = self._complete(prompt, temperature, max_tokens)
+        if text: yield text
+    def complete(self, prompt, temperature=0.0, max_tokens=256):
+        if not self.available: return ''
+        start = time.perf_counter()
+        try:
+            text, prompt_tokens, completion_tokens = self._complete(prompt, temperature, max_tokens)
+        except Exception:
+            self.metrics.record(time.perf_counter() - start, error=True)
+            raise
+        self.metrics.record(time.perf_counter() - start, prompt_tokens, completion_tokens)
+        return text
+    def complete_stream(self, prompt, temperature=0.0, max_tokens=256):
+        """Yield completion text chunks as they arrive"""
+        if not self.available: return
+        start = time.perf_counter()
+        chunks = []
+        try:
+            for chunk in self._complete_stream(prompt, temperature, max_tokens):
+                chunks.append(chunk)
+                yield chunk
+        except Exception:
+            self.metrics.record(time.perf_counter() - start, error=True)
+            raise
+        self.metrics.record(time.perf_counter() - start, estimate_tokens(prompt), estimate_tokens(''.join(chunks)))
+
+
+def llm_available(llm):
+    """Whether `llm` can serve completions; also accepts bare objects exposing only `client`"""
+    if llm is None: return False
+    available = getattr(llm, 'available', None)
+    if available is not None: return bool(available)
+    return getattr(llm, 'client', None) is not None
+
+
+class LLM(LLMBackend):
+    """OpenAI chat completions backend"""
+    name = 'openai'
+    def __init__(self, model='gpt-4o-mini', api_key=None, base_url=None, timeout=60.0, max_retries=3,
+                 backoff_base=0.5, backoff_max=20.0, rpm=None, tpm=None):
+        """
+        Chat completion client with pooled connections, retries and rate limiting
+
+        Args:
+            model: Model name
+            api_key: API key; defaults to OPENAI_API_KEY
+            base_url: Optional API base URL (e.g. a local mock or proxy)
+            timeout: Per-call timeout in seconds
+            max_retries: Retries after the first attempt for retryable errors
+            backoff_base: Base delay in seconds for exponential backoff with full jitter
+            backoff_max: Upper bound on a single backoff delay in seconds
+            rpm: Requests-per-minute limit shared by all clients of this endpoint and model
+            tpm: Tokens-per-minute limit (prompt estimate + max_tokens per call)
+        """
+        super().__init__()
         # Make sure .env is loaded
         _load_env_file()
-        api_key = os.getenv('OPENAI_API_KEY')
+        api_key = api_key or os.getenv('OPENAI_API_KEY')
         self.model = model
-        self.client = OpenAI(api_key=api_key) if api_key else None
-    def complete(self, prompt, temperature=0.0, max_tokens=256):
-        if self.client is None: return ''
-        r=self.client.chat.completions.create(model=self.model, messages=[{'role':'user','content':prompt}], temperature=temperature, max_tokens=max_tokens)
-        return r.choices[0].message.content or ''
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.client = get_shared_client(api_key, base_url) if api_key else None
+        self.limiter = get_shared_limiter(api_key, base_url, model, rpm, tpm) if api_key else None
+    def _backoff(self, attempt, error):
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('retry-after') if response is not None else None
+        if retry_after is not None:
+            try: return min(float(retry_after), self.backoff_max)
+            except ValueError: pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+    def _create(self, prompt, temperature, max_tokens, **kwargs):
+        """Issue a chat completion request with rate limiting and bounded, jittered retries"""
+        for attempt in range(self.max_retries + 1):
+            if self.limiter is not None: self.limiter.acquire(estimate_tokens(prompt) + max_tokens)
+            try:
+                return self.client.chat.completions.create(model=self.model, messages=[{'role':'user','content':prompt}], temperature=temperature, max_tokens=max_tokens, timeout=self.timeout, **kwargs)
+            except retryable_errors() as e:
+                if attempt >= self.max_retries: raise
+                time.sleep(self._backoff(attempt, e))
+    def _complete(self, prompt, temperature, max_tokens):
+        r=self._create(prompt, temperature, max_tokens)
+        usage=getattr(r, 'usage', None)
+        text=r.choices[0].message.content or ''
+        if usage is not None: return text, usage.prompt_tokens or 0, usage.completion_tokens or 0
+        return text, estimate_tokens(prompt), estimate_tokens(text)
+    def _complete_stream(self, prompt, temperature, max_tokens):
+        stream=self._create(prompt, temperature, max_tokens, stream=True)
+        for chunk in stream:
+            if not chunk.choices: continue
+            delta=chunk.choices[0].delta.content
+            if delta: yield delta
+
+
+class LocalLLM(LLM):
+    """
+    Backend for a local OpenAI-compatible server (llama.cpp server, vLLM, Ollama, ...)
+
+    Uses the same pooled client, retry and rate-limit machinery as LLM; such
+    servers usually ignore the API key, so a placeholder is sent by default.
+    """
+    name = 'local'
+    def __init__(self, model='local-model', base_url='http://localhost:8080/v1', api_key=None, **kwargs):
+        super().__init__(model=model, api_key=api_key or os.getenv('LOCAL_LLM_API_KEY') or 'sk-no-key-required',
+                         base_url=base_url, **kwargs)
+
+
+class StubLLM(LLMBackend):
+    """
+    Deterministic in-process backend for offline runs, tests and benchmarks
+
+    Returns the response of the first `responses` key that occurs in the prompt,
+    else `default`. An empty response makes the agents use their rule-based
+    fallbacks. `latency` adds a fixed delay per call to emulate a model.
+    """
+    name = 'stub'
+    def __init__(self, model='stub', responses=None, default='', latency=0.0):
+        super().__init__()
+        self.model = model
+        self.responses = dict(responses or {})
+        self.default = default
+        self.latency = latency
+    @property
+    def available(self):
+        return True
+    def _complete(self, prompt, temperature, max_tokens):
+        if self.latency: time.sleep(self.latency)
+        text = next((r for k, r in self.responses.items() if k in prompt), self.default)
+        return text, estimate_tokens(prompt), estimate_tokens(text)
+
+
+BACKENDS = {'openai': LLM, 'local': LocalLLM, 'stub': StubLLM}
+
+def create_llm(llm_config=None):
+    """
+    Build an LLM backend from the 'llm' section of the configuration
+
+    `backend` selects 'openai' (default), 'local' or 'stub'. The OpenAI and
+    local backends recognise model, base_url, api_key, timeout, max_retries,
+    requests_per_minute and tokens_per_minute; the stub recognises model,
+    responses, default and latency. Missing keys fall back to backend defaults.
+    """
+    llm_config = llm_config or {}
+    backend = llm_config.get('backend', 'openai')
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend '{backend}'. Must be one of {list(BACKENDS)}")
+    if backend == 'stub':
+        keys = (('model', 'model'), ('responses', 'responses'), ('default', 'default'), ('latency', 'latency'))
+        kwargs = {}
+    else:
+        keys = (('base_url', 'base_url'), ('api_key', 'api_key'), ('timeout', 'timeout'), ('max_retries', 'max_retries'),
+                ('requests_per_minute', 'rpm'), ('tokens_per_minute', 'tpm'))
+        default_model = 'gpt-4o-mini' if backend == 'openai' else 'local-model'
+        kwargs = {'model': llm_config.get('model') or os.getenv('LLM_MODEL', default_model)}
+    for key, arg in keys:
+        if llm_config.get(key) is not None:
+            kwargs[arg] = llm_config[key]
+    return BACKENDS[backend](**kwargs)
@@ -0,0 +1,130 @@
+"""Token counting and compact profile rendering for LLM prompts"""
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    """tiktoken encoding for a model, or None when tiktoken isn't installed (imported on first use)"""
+    try:
+        import tiktoken
+    except Exception:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception:
+        return tiktoken.get_encoding('o200k_base')
+
+
+def count_tokens(text: str, model: str = 'gpt-4o-mini') -> int:
+    """
+    Count prompt tokens for a model
+
+    Uses tiktoken when installed, otherwise a ~4 characters per token estimate.
+
+    Args:
+        text: Text to count
+        model: Model name used to pick the tokenizer
+
+    Returns:
+        Number of tokens
+    """
+    encoding = _encoding(model)
+    if encoding is not None:
+        try:
+            return len(encoding.encode(text))
+        except Exception:
+            pass
+    return (len(text) + 3) // 4
+
+
+def key_hours(pv: np.ndarray, load: np.ndarray, ops: Optional[List[Dict[str, Any]]] = None, k: int = 4) -> List[int]:
+    """
+    Pick the hours that matter most to the dispatch
+
+    These are the largest net-import hours (load above PV), the largest surplus
+    hours (PV above load, when the battery charges or the grid absorbs exports)
+    and any hour touched by a shift_load operation.
+
+    Args:
+        pv: PV profile
+        load: Load profile
+        ops: Optional list of operations
+        k: Number of deficit and of surplus hours to keep
+
+    Returns:
+        Sorted list of hour indices
+    """
+    net = load - pv
+    hours = set()
+    if k > 0 and len(net):
+        order = np.argsort(net)
+        hours.update(int(h) for h in order[::-1][:k] if net[h] > 0)
+        hours.update(int(h) for h in order[:k] if net[h] < 0)
+    for op in ops or []:
+        if op.get('op') == 'shift_load':
+            hours.update(int(op[f]) for f in ('from_hour', 'to_hour') if isinstance(op.get(f), int) and 0 <= op[f] < len(net))
+    return sorted(hours)
+
+
+def summarize_series(values: np.ndarray, hours: Sequence[int] = ()) -> str:
+    """
+    Render a profile as a one-line summary
+
+    Example: "24 h, total 15.60 kWh, peak 2.20 at h9, min 0.00 at h0, non-zero h4-h15; h9=2.20, h13=0.80"
+    """
+    n = len(values)
+    if n == 0:
+        return "empty"
+    parts = [f"{n} h", f"total {values.sum():.2f} kWh",
+             f"peak {values.max():.2f} at h{int(values.argmax())}",
+             f"min {values.min():.2f} at h{int(values.argmin())}"]
+    nonzero = np.flatnonzero(values > 1e-9)
+    if 0 < len(nonzero) < n:
+        parts.append(f"non-zero h{int(nonzero[0])}-h{int(nonzero[-1])}")
+    text = ", ".join(parts)
+    if len(hours):
+        text += "; " + ", ".join(f"h{h}={values[h]:.2f}" for h in hours)
+    return text
+
+
+def compact_profiles(pv, load, ops: Optional[List[Dict[str, Any]]] = None, budget: int = 200,
+                     model: str = 'gpt-4o-mini') -> Tuple[str, str]:
+    """
+    Render the PV and load profiles for a prompt within a token budget
+
+    Tries, in order, until both strings together fit in `budget` tokens: the
+    full series rounded to 2 decimals, summaries with progressively fewer key
+    hours, and plain summaries. The result therefore stays roughly constant in
+    size however long the horizon is.
+
+    Args:
+        pv: PV profile (list or array)
+        load: Load profile (list or array)
+        ops: Optional operations, whose shifted hours are always kept
+        budget: Token budget for both profiles together
+        model: Model name used to pick the tokenizer
+
+    Returns:
+        Tuple of (pv_text, load_text)
+    """
+    pv = np.asarray(pv if pv is not None else [], dtype=float)
+    load = np.asarray(load if load is not None else [], dtype=float)
+
+    def fits(a, b):
+        return count_tokens(a, model) + count_tokens(b, model) <= budget
+
+    full_pv = "[" + ", ".join(f"{v:.2f}".rstrip('0').rstrip('.') for v in pv) + "]"
+    full_load = "[" + ", ".join(f"{v:.2f}".rstrip('0').rstrip('.') for v in load) + "]"
+    if fits(full_pv, full_load):
+        return full_pv, full_load
+
+    if len(pv) == len(load):
+        for k in (4, 2, 1):
+            hours = key_hours(pv, load, ops, k=k)
+            pv_text, load_text = summarize_series(pv, hours), summarize_series(load, hours)
+            if fits(pv_text, load_text):
+                return pv_text, load_text
+    return summarize_series(pv), summarize_series(load)
@@ -0,0 +1,169 @@
+"""
+Lightweight pipeline tracing
+
+Code marks stages with `with span('solver', solver=solver):`. Spans are only
+recorded inside an active trace (`with start_trace('run_question') as tracer:`);
+otherwise `span` returns a shared no-op object, so instrumentation costs one
+context-variable lookup. The active trace lives in a ContextVar, so concurrent
+requests on different threads each get their own trace. Traces export as
+OTLP/JSON (OpenTelemetry's JSON encoding), which collectors and viewers such as
+Jaeger can ingest.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional
+
+# (tracer, current span) of the active trace, or None
+_current: ContextVar = ContextVar('chatsgp_trace', default=None)
+
+
+class Span:
+    """One timed stage of a trace"""
+
+    __slots__ = ('name', 'span_id', 'parent_id', 'start_ns', 'end_ns', 'attributes', 'error')
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes
+        self.error = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+
+class _NoopSpan:
+    """Returned by `span` when no trace is active"""
+
+    __slots__ = ()
+
+    def set_attribute(self, key, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _SpanContext:
+    __slots__ = ('tracer', 'parent', 'span', 'token')
+
+    def __init__(self, tracer: 'Tracer', parent: Optional[Span], name: str, attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.parent = parent
+        self.span = Span(name, parent.span_id if parent is not None else None, attributes)
+
+    def set_attribute(self, key, value):
+        self.span.set_attribute(key, value)
+
+    def __enter__(self):
+        self.span.start_ns = time.time_ns()
+        self.token = _current.set((self.tracer, self.span))
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        self.span.end_ns = time.time_ns()
+        if exc is not None:
+            self.span.error = f"{exc_type.__name__}: {exc}"
+        _current.reset(self.token)
+        self.tracer._add(self.span)
+        return False
+
+
+def span(name: str, **attributes):
+    """Context manager timing a stage of the active trace (a no-op when none is active)"""
+    state = _current.get()
+    if state is None:
+        return NOOP_SPAN
+    return _SpanContext(state[0], state[1], name, attributes)
+
+
+def tracing_active() -> bool:
+    """Whether a trace is active in this context (to skip computing costly span attributes)"""
+    return _current.get() is not None
+
+
+class Tracer:
+    """Spans of one trace"""
+
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def _add(self, s: Span):
+        with self._lock:
+            self.spans.append(s)
+
+    def timings_ms(self) -> Dict[str, float]:
+        """Total milliseconds per span name (a stage run twice, e.g. the solver, is summed)"""
+        out = {}
+        for s in self.spans:
+            out[s.name] = out.get(s.name, 0.0) + s.duration_ms
+        return out
+
+    def to_otel(self, service_name: str = 'chatsgp') -> Dict[str, Any]:
+        """Export as an OTLP/JSON ExportTraceServiceRequest"""
+        def attr(key, value):
+            if isinstance(value, bool):
+                v = {'boolValue': value}
+            elif isinstance(value, int):
+                v = {'intValue': str(value)}
+            elif isinstance(value, float):
+                v = {'doubleValue': value}
+            else:
+                v = {'stringValue': str(value)}
+            return {'key': key, 'value': v}
+
+        spans = []
+        for s in sorted(self.spans, key=lambda s: s.start_ns):
+            item = {'traceId': self.trace_id, 'spanId': s.span_id, 'name': s.name, 'kind': 1,
+                    'startTimeUnixNano': str(s.start_ns), 'endTimeUnixNano': str(s.end_ns or s.start_ns),
+                    'attributes': [attr(k, v) for k, v in s.attributes.items()],
+                    'status': {'code': 2, 'message': s.error} if s.error else {'code': 1}}
+            if s.parent_id:
+                item['parentSpanId'] = s.parent_id
+            spans.append(item)
+        return {'resourceSpans': [{
+            'resource': {'attributes': [attr('service.name', service_name)]},
+            'scopeSpans': [{'scope': {'name': 'chatsgp'}, 'spans': spans}]
+        }]}
+
+
+@contextmanager
+def start_trace(name: str, **attributes):
+    """
+    Activate a new trace with a root span for the duration of the block
+
+    Yields:
+        The Tracer collecting the spans
+    """
+    tracer = Tracer()
+    token = _current.set((tracer, None))
+    try:
+        with _SpanContext(tracer, None, name, attributes):
+            yield tracer
+    finally:
+        _current.reset(token)
+
+
+def export_otel(tracer: Tracer, path: str, service_name: str = 'chatsgp'):
+    """Append a trace to a file as one OTLP/JSON line (the OpenTelemetry file exporter format)"""
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(tracer.to_otel(service_name)) + '\n')
@@ -1,5 +1,10 @@
 """Validation utilities for Chat-SGP"""
-from typing import Dict, Any, List, Optional
+import math
+from array import array
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
 
 
 def validate_question(question: str) -> tuple[bool, Optional[str]]:
@@ -24,53 +29,181 @@ def validate_question(question: str) -> tuple[bool, Optional[str]]:
     return True, None
 
 
-def validate_operations(ops: List[Dict[str, Any]]) -> tuple[bool, Optional[str]]:
+TARGETS = ('PV', 'Load', 'Pimp', 'Pexp')
+STATUSES = frozenset(('optimal', 'infeasible', 'unbounded', 'other', 'error'))
+
+# Fields of each operation type: (name, kind, choices)
+OP_FIELDS = {
+    'scale_series': (('target', 'enum', TARGETS), ('scale_pct', 'number', None)),
+    'shift_load': (('percentage', 'number', None), ('from_hour', 'hour', None), ('to_hour', 'hour', None)),
+}
+
+
+_NUMBER_TYPES = frozenset((int, float))
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+class OpsSchema:
+    """
+    Operation-list validator compiled for one horizon
+    
+    Each operation type compiles to a tuple of (field, check) pairs, so
+    validating an operation is one dict lookup plus one call per field. Errors
+    carry the path of the offending value, e.g. "ops[1].to_hour". Hours must
+    lie in [0, hours).
+    """
+    
+    def __init__(self, hours: int = 24):
+        self.hours = int(hours)
+        self._ops = {name: tuple((field, self._compile(kind, choices)) for field, kind, choices in fields)
+                     for name, fields in OP_FIELDS.items()}
+    
+    def _compile(self, kind: str, choices):
+        if kind == 'enum':
+            allowed = frozenset(choices)
+            return lambda v: None if isinstance(v, str) and v in allowed else f"must be one of {list(choices)}, got {v!r}"
+        if kind == 'number':
+            return lambda v: None if _is_number(v) else f"must be a finite number, got {v!r}"
+        last = self.hours - 1
+        return lambda v: (None if isinstance(v, int) and not isinstance(v, bool) and 0 <= v <= last
+                          else f"must be an integer hour between 0 and {last}, got {v!r}")
+    
+    def op_error(self, op, path: str = 'op') -> Optional[str]:
+        """First error of one operation, or None"""
+        if not isinstance(op, dict):
+            return f"{path}: must be an object, got {type(op).__name__}"
+        checks = self._ops.get(op.get('op'))
+        if checks is None:
+            return f"{path}.op: must be one of {list(OP_FIELDS)}, got {op.get('op')!r}"
+        for field, check in checks:
+            if field not in op:
+                return f"{path}: missing '{field}'"
+            error = check(op[field])
+            if error:
+                return f"{path}.{field}: {error}"
+        return None
+    
+    def errors(self, ops, path: str = 'ops') -> List[str]:
+        """Every error in an operation list (empty if valid)"""
+        if not isinstance(ops, list):
+            return [f"{path}: must be a list, got {type(ops).__name__}"]
+        return [e for e in (self.op_error(op, f"{path}[{i}]") for i, op in enumerate(ops)) if e]
+    
+    def validate(self, ops) -> tuple[bool, Optional[str]]:
+        """Validate one operation list; returns (is_valid, first error)"""
+        if not isinstance(ops, list):
+            return False, f"ops: must be a list, got {type(ops).__name__}"
+        for i, op in enumerate(ops):
+            error = self.op_error(op, f"ops[{i}]")
+            if error:
+                return False, error
+        return True, None
+    
+    def validate_batch(self, bundles: Sequence[Any]) -> tuple[np.ndarray, List[Optional[str]]]:
+        """
+        Validate many operation lists at once
+        
+        One pass checks structure and types, collecting every number into flat
+        arrays; hour bounds and finiteness are then checked with array
+        operations over the whole batch. Error messages are built only for the
+        invalid bundles.
+        
+        Args:
+            bundles: Operation lists, or dicts with an 'ops' key
+        
+        Returns:
+            Tuple of (valid, errors): a boolean array with one entry per bundle
+            and each bundle's first error ("ops[i].field: ...") or None
+        """
+        n = len(bundles)
+        op_lists = [b.get('ops') if isinstance(b, dict) else b for b in bundles]
+        suspect = np.zeros(n, dtype=bool)
+        owner, values, is_hour = array('q'), array('d'), array('b')
+        targets = frozenset(TARGETS)
+        
+        # Fast pass with exact type tests; anything unusual is only marked as
+        # suspect and left to the full check below
+        for b, ops in enumerate(op_lists):
+            if type(ops) is not list:
+                suspect[b] = True
+                continue
+            for op in ops:
+                kind = op.get('op') if type(op) is dict else None
+                if kind == 'scale_series':
+                    target, pct = op.get('target'), op.get('scale_pct')
+                    if type(target) is not str or target not in targets or type(pct) not in _NUMBER_TYPES:
+                        suspect[b] = True
+                        break
+                    owner.append(b); values.append(pct); is_hour.append(False)
+                elif kind == 'shift_load':
+                    pct, a, c = op.get('percentage'), op.get('from_hour'), op.get('to_hour')
+                    if type(pct) not in _NUMBER_TYPES or type(a) is not int or type(c) is not int:
+                        suspect[b] = True
+                        break
+                    owner.extend((b, b, b)); values.extend((pct, a, c)); is_hour.extend((False, True, True))
+                else:
+                    suspect[b] = True
+                    break
+        
+        if len(values):
+            vals = np.frombuffer(values, dtype=np.float64)
+            hour = np.frombuffer(is_hour, dtype=np.int8).astype(bool)
+            bad = ~np.isfinite(vals) | (hour & ((vals < 0) | (vals >= self.hours)))
+            suspect[np.frombuffer(owner, dtype=np.int64)[bad]] = True
+        
+        valid = ~suspect
+        errors: List[Optional[str]] = [None] * n
+        for b in np.flatnonzero(suspect):
+            ok, errors[b] = self.validate(op_lists[b])
+            valid[b] = ok
+        return valid, errors
+
+
+@lru_cache(maxsize=32)
+def ops_schema(hours: int = 24) -> OpsSchema:
+    """Compiled (and cached) operation schema for a horizon"""
+    return OpsSchema(hours)
+
+
+def _horizon() -> int:
+    from ..config import active_snapshot, get_config
+    snapshot = active_snapshot()
+    return (snapshot if snapshot is not None else get_config().snapshot()).hours
+
+
+def validate_operations(ops: List[Dict[str, Any]], hours: Optional[int] = None) -> tuple[bool, Optional[str]]:
     """
     Validate operations list
     
     Args:
         ops: List of operation dictionaries
+        hours: Horizon the hours must fall in; if None, that of the
+            configuration in effect
     
     Returns:
-        Tuple of (is_valid, error_message)
+        Tuple of (is_valid, error_message); messages start with the path of the
+        offending value, e.g. "ops[0].to_hour: ..."
     """
-    if not isinstance(ops, list):
-        return False, f"Operations must be a list, got {type(ops)}"
-    
-    valid_ops = ['scale_series', 'shift_load']
-    valid_targets = ['PV', 'Load', 'Pimp', 'Pexp']
+    return ops_schema(hours if hours is not None else _horizon()).validate(ops)
+
+
+def validate_operations_batch(bundles: Sequence[Any], hours: Optional[int] = None) -> tuple[np.ndarray, List[Optional[str]]]:
+    """
+    Validate many operation lists (or ops bundles) at once
     
-    for i, op in enumerate(ops):
-        if not isinstance(op, dict):
-            return False, f"Operation {i} must be a dictionary"
-        
-        op_type = op.get('op')
-        if op_type not in valid_ops:
-            return False, f"Invalid operation type '{op_type}' at index {i}. Must be one of {valid_ops}"
-        
-        if op_type == 'scale_series':
-            if 'target' not in op:
-                return False, f"Operation {i} missing 'target' field"
-            if op['target'] not in valid_targets:
-                return False, f"Invalid target '{op['target']}' at index {i}. Must be one of {valid_targets}"
-            if 'scale_pct' not in op:
-                return False, f"Operation {i} missing 'scale_pct' field"
-            if not isinstance(op['scale_pct'], (int, float)):
-                return False, f"scale_pct must be a number at index {i}"
-        
-        elif op_type == 'shift_load':
-            required_fields = ['percentage', 'from_hour', 'to_hour']
-            for field in required_fields:
-                if field not in op:
-                    return False, f"Operation {i} missing '{field}' field"
-            if not isinstance(op['percentage'], (int, float)):
-                return False, f"percentage must be a number at index {i}"
-            if not isinstance(op['from_hour'], int) or not (0 <= op['from_hour'] < 24):
-                return False, f"from_hour must be an integer between 0 and 23 at index {i}"
-            if not isinstance(op['to_hour'], int) or not (0 <= op['to_hour'] < 24):
-                return False, f"to_hour must be an integer between 0 and 23 at index {i}"
+    Args:
+        bundles: Operation lists, or dicts with an 'ops' key
+        hours: Horizon the hours must fall in; if None, that of the
+            configuration in effect
     
-    return True, None
+    Returns:
+        Tuple of (valid, errors): boolean array per bundle and the first error
+        of each bundle (None when valid)
+    """
+    return ops_schema(hours if hours is not None else _horizon()).validate_batch(bundles)
 
 
 def validate_optimization_result(result: Dict[str, Any]) -> tuple[bool, Optional[str]]:
@@ -84,20 +217,20 @@ def validate_optimization_result(result: Dict[str, Any]) -> tuple[bool, Optional
         Tuple of (is_valid, error_message)
     """
     if not isinstance(result, dict):
-        return False, f"Result must be a dictionary, got {type(result)}"
-    
-    if 'status' not in result:
-        return False, "Result missing 'status' field"
+        return False, f"result: must be a dictionary, got {type(result).__name__}"
     
-    valid_statuses = ['optimal', 'infeasible', 'unbounded', 'other', 'error']
-    if result['status'] not in valid_statuses:
-        return False, f"Invalid status '{result['status']}'. Must be one of {valid_statuses}"
+    status = result.get('status')
+    if status is None:
+        return False, "result: missing 'status'"
+    if status not in STATUSES:
+        return False, f"result.status: must be one of {sorted(STATUSES)}, got {status!r}"
     
     if 'objective' not in result:
-        return False, "Result missing 'objective' field"
-    
-    if not isinstance(result['objective'], (int, float)):
-        return False, "objective must be a number"
+        return False, "result: missing 'objective'"
+    objective = result['objective']
+    if not isinstance(objective, (int, float)) or isinstance(objective, bool):
+        return False, f"result.objective: must be a number, got {objective!r}"
+    if status == 'optimal' and not math.isfinite(objective):
+        return False, f"result.objective: must be finite for an optimal result, got {objective!r}"
     
     return True, None
-
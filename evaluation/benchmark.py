@@ -5,9 +5,26 @@ Provides functions to run benchmarks and evaluate performance.
 """
 
 import json
+import time
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-from .metrics import generate_evaluation_report
+from typing import Dict, List, Any, Iterator, Optional
+
+from .metrics import MetricsAccumulator
+from .results_store import flatten_result
+
+
+def iter_benchmark_questions(file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream benchmark questions from a (possibly .gz/.zst compressed) JSONL file.
+    
+    Args:
+        file_path: Path to JSONL file with questions
+    
+    Yields:
+        Question dictionaries
+    """
+    from chatsgp.utils.jsonl import iter_jsonl
+    return iter_jsonl(file_path)
 
 
 def load_benchmark_questions(file_path: str) -> List[Dict[str, Any]]:
@@ -20,31 +37,37 @@ def load_benchmark_questions(file_path: str) -> List[Dict[str, Any]]:
     Returns:
         List of question dictionaries
     """
-    questions = []
-    with open(file_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            if line.strip():
-                questions.append(json.loads(line))
-    return questions
+    return list(iter_benchmark_questions(file_path))
 
 
 def run_benchmark(
     questions_file: str,
     output_file: Optional[str] = None,
     config_file: Optional[str] = None,
-    solver: str = 'pulp'
+    solver: str = 'pulp',
+    resume: bool = False,
+    keep_results: bool = True,
+    columnar_file: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Run a benchmark on a set of questions.
     
+    Questions are streamed from `questions_file` and each result is written to
+    `output_file` as soon as it is ready.
+    
     Args:
         questions_file: Path to JSONL file with questions
-        output_file: Optional path to save results
+        output_file: Optional path to save results (.gz/.zst for compression)
         config_file: Optional configuration file path
-        solver: Solver to use ('pulp' or 'gurobi')
+        solver: Solver to use ('pulp', 'highs' or 'gurobi')
+        resume: Skip questions already in `output_file` and append to it
+        keep_results: Return the full results; set to False for very large runs
+        columnar_file: Optional Parquet/Arrow path for flat result columns (needs pyarrow);
+            with `resume`, it is rebuilt from `output_file` so it covers the whole run
     
     Returns:
-        Dictionary with benchmark results and evaluation metrics
+        Dictionary with benchmark results (empty if keep_results is False) and
+        evaluation metrics for the questions processed in this run
     """
     import sys
     from pathlib import Path
@@ -57,7 +80,7 @@ def run_benchmark(
     from chatsgp.agents.optimizer_agent import OptimizerAgent
     from chatsgp.agents.interpreter_agent import InterpreterAgent
     from chatsgp.agents.orchestrator import Orchestrator
-    from chatsgp.utils.llm_backend import LLM
+    from chatsgp.utils.llm_backend import create_llm
     from chatsgp.config import get_config
     
     def load_icl(path='chatsgp/icl/examples.jsonl'):
@@ -75,46 +98,73 @@ def run_benchmark(
     
     # Initialize agents
     icl_examples = load_icl()
-    llm = LLM()
+    llm = create_llm(config.get_llm_config())
     coder = CoderAgent(icl_examples, llm=llm)
     optimizer = OptimizerAgent(config=config)
-    interpreter = InterpreterAgent()
+    interpreter = InterpreterAgent(llm=llm, profile_token_budget=config.get('llm.profile_token_budget', 200))
     orchestrator = Orchestrator(coder, optimizer, interpreter)
     
-    # Load questions
-    questions = load_benchmark_questions(questions_file)
+    # Stream questions, skipping those already in the output when resuming
+    from chatsgp.utils.jsonl import JsonlWriter, completed_counts, skip_completed
     
-    # Process questions
+    questions = iter_benchmark_questions(questions_file)
+    if resume and output_file:
+        questions = skip_completed(questions, completed_counts(output_file))
+    writer = JsonlWriter(output_file, resume=resume) if output_file else None
+    # When resuming, the columnar file is rebuilt from the full JSONL output at
+    # the end rather than written row by row (that would drop earlier rows)
+    rebuild_columnar = bool(columnar_file and resume and output_file)
+    columnar = None
+    if columnar_file and not rebuild_columnar:
+        from .results_store import ColumnarWriter
+        columnar = ColumnarWriter(columnar_file)
+    
+    # Process questions, aggregating metrics as results arrive
     results = []
-    for i, item in enumerate(questions, 1):
-        question = item.get('question', '')
-        print(f"[{i}/{len(questions)}] Processing: {question}")
-        
-        try:
-            result = orchestrator.run_question(question, solver=solver)
-            results.append({
-                'question': question,
-                'result': result,
-                'status': 'success'
-            })
-        except Exception as e:
-            results.append({
-                'question': question,
-                'error': str(e),
-                'status': 'error'
-            })
+    metrics = MetricsAccumulator()
+    try:
+        for i, item in enumerate(questions, 1):
+            question = item.get('question', '')
+            print(f"[{i}] Processing: {question}")
+            
+            start = time.perf_counter()
+            try:
+                result = orchestrator.run_question(question, solver=solver)
+                record = {
+                    'question': question,
+                    'result': result,
+                    'status': 'success'
+                }
+            except Exception as e:
+                record = {
+                    'question': question,
+                    'error': str(e),
+                    'status': 'error'
+                }
+            record['elapsed_s'] = time.perf_counter() - start
+            if 'category' in item:
+                record['category'] = item['category']
+            if writer is not None:
+                writer.write(record)
+            if keep_results:
+                results.append(record)
+            row = flatten_result(record)
+            if columnar is not None:
+                columnar.write_row(row)
+            metrics.update_row(row)
+    finally:
+        if writer is not None:
+            writer.close()
+        if columnar is not None:
+            columnar.close()
+        if rebuild_columnar:
+            from .results_store import jsonl_to_columnar
+            jsonl_to_columnar(output_file, columnar_file)
     
     # Generate evaluation report
-    evaluation_report = generate_evaluation_report(results)
-    
-    # Save results if output file specified
-    if output_file:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            for result in results:
-                f.write(json.dumps(result) + '\n')
+    evaluation_report = metrics.report()
     
     return {
         'results': results,
         'evaluation': evaluation_report
     }
-
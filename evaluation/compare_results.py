@@ -4,10 +4,26 @@ Result comparison tool for Chat-SGP
 Compares results from different runs or configurations.
 """
 
-import json
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-import pandas as pd
+from typing import Dict, List, Any, Iterator, Optional
+
+import numpy as np
+
+from .results_store import columns_from_records, read_columnar
+
+
+def iter_results(file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream results from a (possibly .gz/.zst compressed) JSONL file.
+    
+    Args:
+        file_path: Path to JSONL file with results
+    
+    Yields:
+        Result dictionaries
+    """
+    from chatsgp.utils.jsonl import iter_jsonl
+    return iter_jsonl(file_path)
 
 
 def load_results(file_path: str) -> List[Dict[str, Any]]:
@@ -20,12 +36,52 @@ def load_results(file_path: str) -> List[Dict[str, Any]]:
     Returns:
         List of result dictionaries
     """
-    results = []
-    with open(file_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            if line.strip():
-                results.append(json.loads(line))
-    return results
+    return list(iter_results(file_path))
+
+
+def _column_stats(columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Average cost and success rate of one run, as vectorized reductions"""
+    total = len(columns['solve_status'])
+    optimal = columns['solve_status'] == 'optimal'
+    successful = int(np.count_nonzero(optimal))
+    return {
+        'average_cost': float(columns['objective'][optimal].mean()) if successful else 0.0,
+        'success_rate': successful / total * 100 if total else 0.0,
+        'total_questions': total,
+        'successful': successful
+    }
+
+
+def compare_columns(
+    columns1: Dict[str, np.ndarray],
+    columns2: Dict[str, np.ndarray],
+    label1: str = "Run 1",
+    label2: str = "Run 2"
+) -> Dict[str, Any]:
+    """
+    Compare two runs given as result columns.
+    
+    Args:
+        columns1: Columns of the first run (see `results_store.read_columnar`)
+        columns2: Columns of the second run
+        label1: Label for first run
+        label2: Label for second run
+    
+    Returns:
+        Dictionary with comparison metrics
+    """
+    stats1 = _column_stats(columns1)
+    stats2 = _column_stats(columns2)
+    avg_cost1, avg_cost2 = stats1['average_cost'], stats2['average_cost']
+    return {
+        label1: stats1,
+        label2: stats2,
+        'difference': {
+            'cost_difference': avg_cost2 - avg_cost1,
+            'cost_difference_pct': ((avg_cost2 - avg_cost1) / avg_cost1 * 100) if avg_cost1 > 0 else 0.0,
+            'success_rate_difference': stats2['success_rate'] - stats1['success_rate']
+        }
+    }
 
 
 def compare_results(
@@ -46,51 +102,19 @@ def compare_results(
     Returns:
         Dictionary with comparison metrics
     """
-    # Extract costs
-    costs1 = [
-        r.get('result', {}).get('objective', 0)
-        for r in results1
-        if r.get('result', {}).get('status') == 'optimal'
-    ]
-    costs2 = [
-        r.get('result', {}).get('objective', 0)
-        for r in results2
-        if r.get('result', {}).get('status') == 'optimal'
-    ]
-    
-    # Calculate statistics
-    avg_cost1 = sum(costs1) / len(costs1) if costs1 else 0.0
-    avg_cost2 = sum(costs2) / len(costs2) if costs2 else 0.0
-    
-    success_rate1 = sum(
-        1 for r in results1 
-        if r.get('result', {}).get('status') == 'optimal'
-    ) / len(results1) * 100 if results1 else 0.0
-    
-    success_rate2 = sum(
-        1 for r in results2 
-        if r.get('result', {}).get('status') == 'optimal'
-    ) / len(results2) * 100 if results2 else 0.0
+    return compare_columns(columns_from_records(results1), columns_from_records(results2), label1, label2)
+
+
+def load_columns(file_path: str) -> Dict[str, np.ndarray]:
+    """
+    Load the comparison columns of a run from a Parquet/Arrow or JSONL results file.
     
-    return {
-        label1: {
-            'average_cost': avg_cost1,
-            'success_rate': success_rate1,
-            'total_questions': len(results1),
-            'successful': len(costs1)
-        },
-        label2: {
-            'average_cost': avg_cost2,
-            'success_rate': success_rate2,
-            'total_questions': len(results2),
-            'successful': len(costs2)
-        },
-        'difference': {
-            'cost_difference': avg_cost2 - avg_cost1,
-            'cost_difference_pct': ((avg_cost2 - avg_cost1) / avg_cost1 * 100) if avg_cost1 > 0 else 0.0,
-            'success_rate_difference': success_rate2 - success_rate1
-        }
-    }
+    JSONL files are streamed and flattened without keeping the records.
+    """
+    columns = ['solve_status', 'objective', 'parse_method']
+    if Path(file_path).suffix.lower() in ('.parquet', '.arrow', '.feather', '.ipc'):
+        return read_columnar(file_path, columns=columns)
+    return columns_from_records(iter_results(file_path), columns=columns)
 
 
 def compare_result_files(
@@ -100,7 +124,7 @@ def compare_result_files(
     label2: Optional[str] = None
 ) -> Dict[str, Any]:
     """
-    Compare results from two JSONL files.
+    Compare results from two files (JSONL, or Parquet/Arrow from the columnar store).
     
     Args:
         file1: Path to first results file
@@ -111,11 +135,8 @@ def compare_result_files(
     Returns:
         Dictionary with comparison metrics
     """
-    results1 = load_results(file1)
-    results2 = load_results(file2)
-    
     label1 = label1 or Path(file1).stem
     label2 = label2 or Path(file2).stem
     
-    return compare_results(results1, results2, label1, label2)
+    return compare_columns(load_columns(file1), load_columns(file2), label1, label2)
 
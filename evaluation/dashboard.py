@@ -0,0 +1,342 @@
+"""
+Static HTML dashboard for Chat-SGP batch and sweep results
+
+Writes one self-contained HTML page: the chart script in `static/charts.js`
+and the report data are inlined, so the page opens offline and can be shared
+as a single file. Data is aggregated before it is embedded (histogram bins,
+quantile samples, scenario buckets), so a page for 100k scenarios is about as
+large as one for 100:
+
+- cost distribution (histogram and quantile curve)
+- success rate per category
+- latency histogram
+- objective over a sweep
+- dispatch heatmaps (hour x scenario bucket, ordered by cost) per flow
+
+Run with: python -m evaluation.dashboard --input results.jsonl --output report.html --dispatch
+"""
+
+import argparse
+import html
+import json
+import math
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .metrics import evaluation_report_from_columns
+from .results_store import columns_from_records, read_columnar
+
+DASHBOARD_COLUMNS = ['category', 'solve_status', 'objective', 'elapsed_s', 'parse_method']
+HEATMAP_FLOWS = ('PV', 'Load', 'grid_import', 'grid_export', 'battery_charge', 'battery_discharge', 'soc')
+CHARTS_JS = Path(__file__).parent / 'static' / 'charts.js'
+COLUMNAR_SUFFIXES = ('.parquet', '.arrow', '.feather', '.ipc')
+
+
+def _clean(values: np.ndarray, digits: int = 4) -> List[Optional[float]]:
+    """Rounded floats with NaN/inf as None (valid JSON)"""
+    rounded = np.round(np.asarray(values, dtype=np.float64), digits)
+    return [float(v) if math.isfinite(v) else None for v in rounded.ravel()]
+
+
+def histogram(values: np.ndarray, bins: int = 40) -> Dict[str, Any]:
+    """Histogram of the finite values: bin 'edges' (bins + 1), 'counts' and 'n'"""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return {'edges': [0.0, 1.0], 'counts': [0], 'n': 0}
+    counts, edges = np.histogram(values, bins=bins)
+    return {'edges': _clean(edges), 'counts': counts.tolist(), 'n': int(len(values))}
+
+
+def quantiles(values: np.ndarray, points: int = 200) -> Dict[str, Any]:
+    """Evenly spaced quantiles of the finite values ('q' in [0, 1] and 'values')"""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    q = np.linspace(0.0, 1.0, points if len(values) else 0)
+    return {'q': _clean(q), 'values': _clean(np.quantile(values, q)) if len(values) else []}
+
+
+def bucket_rows(matrix: np.ndarray, max_rows: int = 200, order: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """
+    Reduce an (S, H) matrix to at most `max_rows` rows of bucket means
+
+    Args:
+        matrix: One row per scenario
+        max_rows: Maximum number of rows kept
+        order: Optional row order applied before bucketing (e.g. by cost)
+
+    Returns:
+        Dictionary with 'values' (rows x H, NaN as None), 'starts' (first
+        position of each bucket in the ordered rows) and 'sizes'
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if order is not None:
+        matrix = matrix[order]
+    starts = np.linspace(0, len(matrix), min(max_rows, len(matrix)) + 1).astype(int)[:-1]
+    if not len(starts):
+        return {'values': [], 'starts': [], 'sizes': []}
+    sizes = np.diff(np.append(starts, len(matrix)))
+    finite = np.isfinite(matrix)
+    sums = np.add.reduceat(np.where(finite, matrix, 0.0), starts, axis=0)
+    counts = np.add.reduceat(finite, starts, axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+    hours = matrix.shape[1]
+    cleaned = _clean(means, 3)
+    return {'values': [cleaned[i * hours:(i + 1) * hours] for i in range(len(starts))],
+            'starts': starts.tolist(), 'sizes': sizes.tolist()}
+
+
+def dashboard_data(
+    columns: Optional[Dict[str, np.ndarray]] = None,
+    dispatch: Optional[Dict[str, Any]] = None,
+    sweep: Optional[Dict[str, Any]] = None,
+    title: str = 'Chat-SGP results',
+    bins: int = 40,
+    max_rows: int = 200
+) -> Dict[str, Any]:
+    """
+    Aggregate results into the data embedded in a dashboard
+
+    Args:
+        columns: Result columns (see `results_store.read_columnar`; needs
+            'solve_status', 'objective' and 'parse_method', uses 'category'
+            and 'elapsed_s' when present)
+        dispatch: Optional `OptimizerAgent.run_many` output for heatmaps
+        sweep: Optional {'target': str, 'values': [...], 'objective': [...]}
+        title: Page title
+        bins: Histogram bins
+        max_rows: Maximum scenario buckets per heatmap
+
+    Returns:
+        JSON-serializable dashboard data
+    """
+    data = {'title': title}
+    if columns is not None and len(columns['solve_status']):
+        report = evaluation_report_from_columns(columns, bootstrap=200)
+        data['summary'] = {k: report[k] for k in ('total_questions', 'success_rate', 'average_cost',
+                                                  'parsing_accuracy', 'latency_s', 'confidence_intervals')}
+        # No optimal result: there is no average cost (the report omits its interval)
+        if not np.isfinite(columns['objective']).any():
+            data['summary']['average_cost'] = None
+        data['summary']['confidence_intervals'] = {'average_cost': None, **report['confidence_intervals']}
+        data['cost'] = {'histogram': histogram(columns['objective'], bins),
+                        'quantiles': quantiles(columns['objective'])}
+        data['categories'] = [{'name': name, 'total': stats['total_questions'],
+                               'success_rate': round(stats['success_rate'], 2)}
+                              for name, stats in sorted(report['by_category'].items())]
+        if 'elapsed_s' in columns:
+            data['latency'] = histogram(columns['elapsed_s'], bins)
+    if sweep is not None:
+        data['sweep'] = {'target': sweep['target'], 'values': _clean(sweep['values']),
+                         'objective': _clean(sweep['objective'])}
+    if dispatch is not None and len(dispatch['objective']):
+        objective = np.asarray(dispatch['objective'], dtype=np.float64)
+        order = np.argsort(np.where(np.isfinite(objective), objective, np.inf), kind='stable')
+        ordered = objective[order]
+        heatmaps = {flow: bucket_rows(dispatch[flow], max_rows, order)
+                    for flow in HEATMAP_FLOWS if flow in dispatch}
+        any_map = next(iter(heatmaps.values()))
+        labels = []
+        for start, size in zip(any_map['starts'], any_map['sizes']):
+            lo, hi = ordered[start], ordered[start + size - 1]
+            cost = f"EUR {lo:.2f}-{hi:.2f}" if math.isfinite(lo) and math.isfinite(hi) else 'not optimal'
+            labels.append(f"scenarios {start + 1}-{start + size} by cost ({cost})")
+        data['dispatch'] = {'scenarios': int(len(objective)), 'row_labels': labels,
+                            'flows': {flow: m['values'] for flow, m in heatmaps.items()}}
+    return data
+
+
+_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 24px; color: #222; background: #fafafa; }}
+h1 {{ font-size: 22px; }}
+h2 {{ font-size: 15px; margin: 0 0 8px; }}
+.grid {{ display: grid; grid-template-columns: repeat(auto-fill, minmax(460px, 1fr)); gap: 16px; }}
+.card {{ background: #fff; border: 1px solid #ddd; border-radius: 6px; padding: 12px; }}
+.chart {{ position: relative; width: 100%; }}
+.tip {{ display: none; position: absolute; pointer-events: none; background: rgba(0,0,0,0.8);
+        color: #fff; font-size: 11px; padding: 3px 6px; border-radius: 3px; white-space: nowrap; }}
+table {{ border-collapse: collapse; font-size: 13px; }}
+td {{ padding: 2px 12px 2px 0; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<div id="summary"></div>
+<div class="grid" id="charts"></div>
+<script>{charts_js}</script>
+<script id="dashboard-data" type="application/json">{data}</script>
+<script>
+(function () {{
+  var data = JSON.parse(document.getElementById('dashboard-data').textContent);
+  var charts = document.getElementById('charts');
+  function card(title) {{
+    var div = document.createElement('div');
+    div.className = 'card';
+    div.innerHTML = '<h2></h2><div class="chart"></div>';
+    div.firstChild.textContent = title;
+    charts.appendChild(div);
+    return div.lastChild;
+  }}
+  if (data.summary) {{
+    var s = data.summary, rows = [
+      ['Scenarios', s.total_questions], ['Success rate', s.success_rate.toFixed(1) + '%'],
+      ['Average cost (95% CI)', s.confidence_intervals.average_cost ? 'EUR ' + s.average_cost.toFixed(2) + ' (' +
+       s.confidence_intervals.average_cost.map(function (v) {{ return v.toFixed(2); }}).join(' - ') + ')'
+       : 'n/a (no optimal results)'],
+      ['Latency p50 / p99', s.latency_s.p50.toFixed(3) + ' / ' + s.latency_s.p99.toFixed(3) + ' s']];
+    var table = document.createElement('table');
+    rows.forEach(function (r) {{
+      var tr = table.insertRow();
+      tr.insertCell().textContent = r[0];
+      tr.insertCell().textContent = r[1];
+    }});
+    document.getElementById('summary').appendChild(table);
+  }}
+  if (data.cost) {{
+    SGPCharts.histogram(card('Cost distribution (' + data.cost.histogram.n + ' solved)'),
+                        data.cost.histogram, {{xLabel: 'objective (EUR)'}});
+    SGPCharts.line(card('Cost quantiles'), data.cost.quantiles.q, data.cost.quantiles.values,
+                   {{xLabel: 'quantile', yLabel: 'EUR'}});
+  }}
+  if (data.categories && data.categories.length) {{
+    SGPCharts.bars(card('Success rate by category'),
+                   data.categories.map(function (c) {{ return c.name + ' (' + c.total + ')'; }}),
+                   data.categories.map(function (c) {{ return c.success_rate; }}),
+                   {{max: 100, yLabel: '%', suffix: '%'}});
+  }}
+  if (data.latency && data.latency.n) {{
+    SGPCharts.histogram(card('Latency'), data.latency, {{xLabel: 'seconds', color: '#f28e2b'}});
+  }}
+  if (data.sweep) {{
+    SGPCharts.line(card('Objective over ' + data.sweep.target + ' sweep'), data.sweep.values,
+                   data.sweep.objective, {{xLabel: data.sweep.target + ' change (%)', yLabel: 'EUR'}});
+  }}
+  if (data.dispatch) {{
+    Object.keys(data.dispatch.flows).forEach(function (flow) {{
+      SGPCharts.heatmap(card(flow + ' (' + data.dispatch.scenarios + ' scenarios, cheapest first)'),
+                        data.dispatch.flows[flow], {{rowLabels: data.dispatch.row_labels}});
+    }});
+  }}
+}})();
+</script>
+</body>
+</html>
+"""
+
+
+def render_dashboard(data: Dict[str, Any], path) -> str:
+    """
+    Write dashboard data as a self-contained HTML page
+
+    Args:
+        data: Output of `dashboard_data`
+        path: Output HTML path
+
+    Returns:
+        The output path
+    """
+    # '</' inside the JSON would end the script element early
+    payload = json.dumps(data, allow_nan=False, separators=(',', ':')).replace('</', '<\\/')
+    page = _PAGE.format(title=html.escape(data.get('title', '')),
+                        charts_js=CHARTS_JS.read_text(encoding='utf-8'), data=payload)
+    Path(path).write_text(page, encoding='utf-8')
+    return str(path)
+
+
+def is_columnar(file_path: str) -> bool:
+    """Whether a results file is Parquet/Arrow (which stores no operations) rather than JSONL"""
+    return Path(file_path).suffix.lower() in COLUMNAR_SUFFIXES
+
+
+def load_dashboard_columns(file_path: str) -> Dict[str, np.ndarray]:
+    """Load the dashboard columns from a Parquet/Arrow or JSONL results file"""
+    if is_columnar(file_path):
+        return read_columnar(file_path, columns=DASHBOARD_COLUMNS)
+    from chatsgp.utils.jsonl import iter_jsonl
+    return columns_from_records(iter_jsonl(file_path), columns=DASHBOARD_COLUMNS)
+
+
+def solve_dispatch(records, optimizer, solver: str = 'pulp') -> Optional[Dict[str, Any]]:
+    """Solve the valid operations of result or dataset records as one batch (None if there are none)"""
+    from chatsgp.utils.validation import validate_operations_batch
+    from .render_scenarios import collect_scenarios
+
+    bundles, _, _ = collect_scenarios(records)
+    valid, _ = validate_operations_batch(bundles, hours=optimizer.snapshot.hours)
+    bundles = [b for b, ok in zip(bundles, valid) if ok]
+    return optimizer.run_many(bundles, solver=solver) if bundles else None
+
+
+def solve_sweep(target: str, values: Sequence[float], optimizer, ops: Optional[List[Dict[str, Any]]] = None,
+                solver: str = 'pulp') -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Solve a scale_series sweep as one batch
+
+    Returns:
+        Tuple of (sweep data for `dashboard_data`, run_many output)
+    """
+    base = list(ops or [])
+    bundles = [{'ops': base + [{'op': 'scale_series', 'target': target, 'scale_pct': float(v)}]}
+               for v in values]
+    results = optimizer.run_many(bundles, solver=solver)
+    return {'target': target, 'values': list(values), 'objective': results['objective']}, results
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Write a self-contained HTML dashboard for batch or sweep results')
+    ap.add_argument('--input', help='Results file (JSONL, .parquet or .arrow)')
+    ap.add_argument('--output', required=True, help='Output HTML file')
+    ap.add_argument('--title', default='Chat-SGP results', help='Page title')
+    ap.add_argument('--dispatch', action='store_true', help='Solve the records\' operations for dispatch heatmaps')
+    ap.add_argument('--sweep', nargs=4, metavar=('TARGET', 'START', 'STOP', 'STEP'),
+                    help='Solve a scale_series sweep, e.g. --sweep PV -50 100 1')
+    ap.add_argument('--json', help='Also write the aggregated data to this JSON file')
+    ap.add_argument('--bins', type=int, default=40, help='Histogram bins')
+    ap.add_argument('--max-rows', type=int, default=200, help='Scenario buckets per heatmap')
+    ap.add_argument('--config', help='Configuration file path')
+    ap.add_argument('--solver', default='pulp', choices=['pulp', 'highs', 'gurobi'], help='Solver to use')
+    ap.add_argument('--solver-workers', type=int, default=0, help='Solve in a pool of N processes')
+    args = ap.parse_args()
+    if not args.input and not args.sweep:
+        ap.error('need --input and/or --sweep')
+    if args.dispatch and args.sweep:
+        ap.error('--dispatch and --sweep both fill the dispatch heatmaps; pass one of them')
+    if args.dispatch and is_columnar(args.input):
+        ap.error('--dispatch needs a JSONL input: columnar results do not store the operations')
+
+    from chatsgp.agents.optimizer_agent import OptimizerAgent
+    from chatsgp.config import get_config
+    from chatsgp.optimization.solver_pool import SolverPool
+    from chatsgp.utils.jsonl import iter_jsonl
+
+    columns = load_dashboard_columns(args.input) if args.input else None
+    dispatch = sweep = None
+    if args.dispatch or args.sweep:
+        config = get_config(args.config) if args.config else get_config()
+        pool = SolverPool(workers=args.solver_workers) if args.solver_workers > 0 else None
+        optimizer = OptimizerAgent(config=config, solver_pool=pool)
+        try:
+            if args.sweep:
+                target, start, stop, step = args.sweep
+                values = np.arange(float(start), float(stop) + float(step) / 2, float(step))
+                sweep, dispatch = solve_sweep(target, values, optimizer, solver=args.solver)
+            else:
+                dispatch = solve_dispatch(iter_jsonl(args.input, skip_invalid=True), optimizer, solver=args.solver)
+        finally:
+            if pool is not None:
+                pool.close()
+
+    data = dashboard_data(columns, dispatch=dispatch, sweep=sweep, title=args.title,
+                          bins=args.bins, max_rows=args.max_rows)
+    render_dashboard(data, args.output)
+    if args.json:
+        Path(args.json).write_text(json.dumps(data, allow_nan=False, separators=(',', ':')), encoding='utf-8')
+    print(f"Dashboard written to {args.output}")
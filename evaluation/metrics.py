@@ -4,8 +4,12 @@ Evaluation metrics for Chat-SGP
 Provides functions to calculate various evaluation metrics for optimization results.
 """
 
-from typing import Dict, List, Any
-import json
+from array import array
+from typing import Dict, List, Any, Iterable
+
+import numpy as np
+
+from .results_store import flatten_result
 
 
 def calculate_cost_accuracy(predicted_cost: float, actual_cost: float) -> float:
@@ -26,92 +30,264 @@ def calculate_cost_accuracy(predicted_cost: float, actual_cost: float) -> float:
     return max(0.0, 100.0 - error)
 
 
-def calculate_parsing_accuracy(results: List[Dict[str, Any]]) -> Dict[str, float]:
+PARSE_METHODS = ('llm-with-icl', 'rule-based')
+LATENCY_PERCENTILES = (50, 90, 95, 99)
+UNCATEGORIZED = 'uncategorized'
+
+
+class MetricsAccumulator:
+    """
+    Single-pass, incremental evaluation metrics
+    
+    Each result adds one entry to compact typed arrays (category code, optimal
+    flag, parse method code, objective, elapsed time), either row by row while
+    streaming or a column batch at a time. Reports are NumPy reductions over
+    those arrays, so they can be taken at any point of a run, and accumulators
+    from separate shards can be merged.
+    """
+    
+    def __init__(self):
+        self.categories: Dict[str, int] = {}
+        self._rows = {'category': array('i'), 'optimal': array('b'), 'method': array('b'),
+                      'objective': array('d'), 'elapsed': array('d')}
+        self._chunks = {name: [] for name in self._rows}
+    
+    def _code(self, category) -> int:
+        name = category if category is not None else UNCATEGORIZED
+        if name not in self.categories:
+            self.categories[name] = len(self.categories)
+        return self.categories[name]
+    
+    def update(self, record: Dict[str, Any]):
+        """Add one result record"""
+        self.update_row(flatten_result(record))
+    
+    def update_row(self, row: Dict[str, Any]):
+        """Add one flattened row (see `results_store.flatten_result`)"""
+        method = row.get('parse_method')
+        self._rows['category'].append(self._code(row.get('category')))
+        self._rows['optimal'].append(row.get('solve_status') == 'optimal')
+        self._rows['method'].append(PARSE_METHODS.index(method) + 1 if method in PARSE_METHODS else 0)
+        self._rows['objective'].append(row.get('objective', float('nan')))
+        self._rows['elapsed'].append(row.get('elapsed_s', float('nan')))
+    
+    def update_columns(self, columns: Dict[str, np.ndarray]):
+        """
+        Add a batch of results given as columns
+        
+        Needs 'solve_status', 'objective' and 'parse_method'; 'category' and
+        'elapsed_s' are used when present.
+        """
+        solve_status = columns['solve_status']
+        n = len(solve_status)
+        method = np.zeros(n, dtype=np.int8)
+        for i, name in enumerate(PARSE_METHODS, 1):
+            method[columns['parse_method'] == name] = i
+        if 'category' in columns and n:
+            names, inverse = np.unique(np.where(columns['category'] == None, UNCATEGORIZED,  # noqa: E711
+                                                columns['category']).astype(str), return_inverse=True)
+            codes = np.array([self._code(name) for name in names], dtype=np.int32)[inverse]
+        else:
+            codes = np.full(n, self._code(None), dtype=np.int32)
+        self._chunks['category'].append(codes)
+        self._chunks['optimal'].append((solve_status == 'optimal').astype(np.int8))
+        self._chunks['method'].append(method)
+        self._chunks['objective'].append(np.asarray(columns['objective'], dtype=np.float64))
+        self._chunks['elapsed'].append(np.asarray(columns['elapsed_s'], dtype=np.float64)
+                                       if 'elapsed_s' in columns else np.full(n, np.nan))
+    
+    def merge(self, other: 'MetricsAccumulator'):
+        """Add every result of another accumulator (e.g. from another shard)"""
+        arrays = other._arrays()
+        remap = np.array([self._code(name) for name in sorted(other.categories, key=other.categories.get)],
+                         dtype=np.int32)
+        arrays['category'] = remap[arrays['category']] if len(remap) else arrays['category']
+        for name, values in arrays.items():
+            self._chunks[name].append(values)
+    
+    def __len__(self):
+        return sum(len(c) for c in self._chunks['optimal']) + len(self._rows['optimal'])
+    
+    def _arrays(self) -> Dict[str, np.ndarray]:
+        dtypes = {'category': np.int32, 'optimal': np.int8, 'method': np.int8,
+                  'objective': np.float64, 'elapsed': np.float64}
+        return {name: np.concatenate(self._chunks[name] + [np.frombuffer(self._rows[name], dtype=dtypes[name])])
+                for name in self._rows}
+    
+    @staticmethod
+    def _summary(optimal: np.ndarray, method: np.ndarray, objective: np.ndarray,
+                 elapsed: np.ndarray) -> Dict[str, Any]:
+        total = len(optimal)
+        successful = int(np.count_nonzero(optimal))
+        method_counts = np.bincount(method, minlength=len(PARSE_METHODS) + 1)
+        
+        def pct(n):
+            return (n / total * 100) if total > 0 else 0.0
+        
+        timed = elapsed[np.isfinite(elapsed)]
+        latency = {'count': len(timed), 'mean': float(timed.mean()) if len(timed) else 0.0}
+        for q, v in zip(LATENCY_PERCENTILES,
+                        np.percentile(timed, LATENCY_PERCENTILES) if len(timed) else [0.0] * len(LATENCY_PERCENTILES)):
+            latency[f'p{q}'] = float(v)
+        return {
+            'total_questions': total,
+            'success_rate': pct(successful),
+            'parsing_accuracy': {
+                'total': total,
+                'llm_parsing': pct(int(method_counts[1])),
+                'rule_based_parsing': pct(int(method_counts[2]))
+            },
+            'average_cost': float(objective[optimal.astype(bool)].mean()) if successful else 0.0,
+            'successful_count': successful,
+            'failed_count': total - successful,
+            'latency_s': latency
+        }
+    
+    @staticmethod
+    def _bootstrap(optimal: np.ndarray, objective: np.ndarray, n_boot: int, confidence: float,
+                   seed: int) -> Dict[str, List[float]]:
+        """Percentile bootstrap intervals for the success rate and average cost"""
+        rng = np.random.default_rng(seed)
+        tail = (1 - confidence) / 2 * 100
+        bounds = (tail, 100 - tail)
+        total = len(optimal)
+        out = {}
+        if total:
+            # Resampling n Bernoulli outcomes is a binomial draw: no (n_boot, n) matrix needed
+            rates = rng.binomial(total, optimal.mean(), size=n_boot) / total * 100
+            out['success_rate'] = [float(v) for v in np.percentile(rates, bounds)]
+        costs = objective[optimal.astype(bool)]
+        if len(costs):
+            m = len(costs)
+            values, counts = np.unique(costs, return_counts=True)
+            if len(values) * 4 <= m:
+                # Objectives repeat a lot (few distinct scenarios): resampling m values is a
+                # multinomial draw over the distinct values, costing O(n_boot * distinct)
+                draws = rng.multinomial(m, counts / m, size=n_boot)
+                means = draws @ values / m
+            else:
+                # Resample in chunks of about 10M indices to bound memory
+                per_chunk = max(1, 10_000_000 // m)
+                means = np.concatenate([costs[rng.integers(0, m, size=(min(per_chunk, n_boot - i), m))].mean(axis=1)
+                                        for i in range(0, n_boot, per_chunk)])
+            out['average_cost'] = [float(v) for v in np.percentile(means, bounds)]
+        return out
+    
+    def report(self, bootstrap: int = 1000, confidence: float = 0.95, seed: int = 0) -> Dict[str, Any]:
+        """
+        Build the evaluation report for everything added so far
+        
+        Args:
+            bootstrap: Bootstrap resamples for confidence intervals (0 disables)
+            confidence: Confidence level of the intervals
+            seed: Random seed for resampling
+        
+        Returns:
+            Dictionary with the overall metrics (success rate, parsing accuracy,
+            average cost, counts, latency percentiles), 'confidence_intervals'
+            and 'by_category' with the same metrics per question category
+        """
+        a = self._arrays()
+        report = self._summary(a['optimal'], a['method'], a['objective'], a['elapsed'])
+        report['confidence_intervals'] = (self._bootstrap(a['optimal'], a['objective'], bootstrap, confidence, seed)
+                                          if bootstrap > 0 else {})
+        
+        # One stable sort groups rows by category
+        order = np.argsort(a['category'], kind='stable')
+        splits = np.flatnonzero(np.diff(a['category'][order])) + 1
+        names = {code: name for name, code in self.categories.items()}
+        report['by_category'] = {}
+        for rows in np.split(order, splits) if len(order) else []:
+            name = names[int(a['category'][rows[0]])]
+            report['by_category'][name] = self._summary(a['optimal'][rows], a['method'][rows],
+                                                        a['objective'][rows], a['elapsed'][rows])
+        return report
+
+
+def _report(results: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    acc = MetricsAccumulator()
+    for record in results:
+        acc.update(record)
+    return acc.report(bootstrap=0)
+
+
+def calculate_parsing_accuracy(results: Iterable[Dict[str, Any]]) -> Dict[str, float]:
     """
     Calculate parsing accuracy metrics.
     
     Args:
-        results: List of result dictionaries with 'ops' and 'explanation' fields
+        results: Runner records or flat pipeline results (see `results_store.flatten_result`)
     
     Returns:
         Dictionary with accuracy metrics
     """
-    total = len(results)
-    if total == 0:
-        return {'total': 0, 'llm_parsing': 0.0, 'rule_based_parsing': 0.0}
-    
-    llm_count = sum(1 for r in results if r.get('ops', {}).get('explanation') == 'llm-with-icl')
-    rule_based_count = sum(1 for r in results if r.get('ops', {}).get('explanation') == 'rule-based')
-    
-    return {
-        'total': total,
-        'llm_parsing': (llm_count / total * 100) if total > 0 else 0.0,
-        'rule_based_parsing': (rule_based_count / total * 100) if total > 0 else 0.0
-    }
+    return _report(results)['parsing_accuracy']
 
 
-def calculate_success_rate(results: List[Dict[str, Any]]) -> float:
+def calculate_success_rate(results: Iterable[Dict[str, Any]]) -> float:
     """
     Calculate success rate (percentage of successful optimizations).
     
     Args:
-        results: List of result dictionaries with 'result' field containing 'status'
+        results: Runner records or flat pipeline results (see `results_store.flatten_result`)
     
     Returns:
         Success rate as a percentage (0-100)
     """
-    if not results:
-        return 0.0
-    
-    successful = sum(
-        1 for r in results 
-        if r.get('result', {}).get('status') == 'optimal'
-    )
-    
-    return (successful / len(results) * 100) if results else 0.0
+    return _report(results)['success_rate']
 
 
-def calculate_average_cost(results: List[Dict[str, Any]]) -> float:
+def calculate_average_cost(results: Iterable[Dict[str, Any]]) -> float:
     """
     Calculate average cost across all successful optimizations.
     
     Args:
-        results: List of result dictionaries with 'result' field containing 'objective'
+        results: Runner records or flat pipeline results (see `results_store.flatten_result`)
     
     Returns:
         Average cost, or 0.0 if no successful results
     """
-    costs = [
-        r.get('result', {}).get('objective', 0)
-        for r in results
-        if r.get('result', {}).get('status') == 'optimal'
-    ]
+    return _report(results)['average_cost']
+
+
+def evaluation_report_from_columns(columns: Dict[str, np.ndarray], bootstrap: int = 1000,
+                                   seed: int = 0) -> Dict[str, Any]:
+    """
+    Generate an evaluation report from result columns with vectorized reductions.
+    
+    Args:
+        columns: Column arrays as returned by `results_store.read_columnar`
+            (needs 'solve_status', 'objective' and 'parse_method'; uses
+            'category' and 'elapsed_s' when present)
+        bootstrap: Bootstrap resamples for confidence intervals (0 disables)
+        seed: Random seed for resampling
     
-    return sum(costs) / len(costs) if costs else 0.0
+    Returns:
+        Dictionary with the same metrics as generate_evaluation_report
+    """
+    acc = MetricsAccumulator()
+    acc.update_columns(columns)
+    return acc.report(bootstrap=bootstrap, seed=seed)
 
 
-def generate_evaluation_report(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+def generate_evaluation_report(results: Iterable[Dict[str, Any]], bootstrap: int = 1000,
+                               seed: int = 0) -> Dict[str, Any]:
     """
     Generate a comprehensive evaluation report.
     
+    Records are read in a single pass (so `results` may be a generator over a
+    results file) and every metric is a NumPy reduction.
+    
     Args:
-        results: List of result dictionaries from batch evaluation
+        results: Result dictionaries from batch evaluation
+        bootstrap: Bootstrap resamples for confidence intervals (0 disables)
+        seed: Random seed for resampling
     
     Returns:
-        Dictionary with evaluation metrics
+        Dictionary with evaluation metrics, latency percentiles, bootstrap
+        confidence intervals and per-category breakdowns
     """
-    return {
-        'total_questions': len(results),
-        'success_rate': calculate_success_rate(results),
-        'parsing_accuracy': calculate_parsing_accuracy(results),
-        'average_cost': calculate_average_cost(results),
-        'successful_count': sum(
-            1 for r in results 
-            if r.get('result', {}).get('status') == 'optimal'
-        ),
-        'failed_count': sum(
-            1 for r in results 
-            if r.get('result', {}).get('status') != 'optimal'
-        )
-    }
-
+    acc = MetricsAccumulator()
+    for record in results:
+        acc.update(record)
+    return acc.report(bootstrap=bootstrap, seed=seed)
@@ -0,0 +1,203 @@
+"""
+Parse accuracy benchmark for Chat-SGP
+
+Scores the CoderAgent against gold labels from the dataset generator: exact and
+tolerance matches of the parsed operations, and whether solving the parsed
+operations reproduces the gold objective. Distinct questions are parsed once,
+in parallel threads, and distinct parsed operation lists are solved once in a
+shared-memory batch (optionally on a SolverPool), so large datasets with many
+repeated questions stay cheap.
+
+Run with: python -m evaluation.parse_accuracy --dataset questions.jsonl --workers 8
+"""
+
+import argparse
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Iterable, Optional
+
+
+def _canonical_op(op: Dict[str, Any]) -> tuple:
+    if op.get('op') == 'scale_series':
+        return ('scale_series', op.get('target'), float(op.get('scale_pct', 0)))
+    if op.get('op') == 'shift_load':
+        return ('shift_load', int(op.get('from_hour', -1)), int(op.get('to_hour', -1)), float(op.get('percentage', 0)))
+    return (op.get('op'),)
+
+
+def canonical_ops(ops: List[Dict[str, Any]]) -> List[tuple]:
+    """Order-independent canonical form of an operation list (extra keys ignored)"""
+    return sorted((_canonical_op(op) for op in ops or []), key=repr)
+
+
+def ops_exact_match(pred: List[Dict[str, Any]], gold: List[Dict[str, Any]]) -> bool:
+    """Same operations, targets, hours and percentages"""
+    return canonical_ops(pred) == canonical_ops(gold)
+
+
+def ops_tolerance_match(pred: List[Dict[str, Any]], gold: List[Dict[str, Any]], pct_tol: float = 1.0) -> bool:
+    """Same operations, targets and hours, with percentages within `pct_tol` points"""
+    a, b = canonical_ops(pred), canonical_ops(gold)
+    if len(a) != len(b):
+        return False
+    for x, y in zip(a, b):
+        if x[:-1] != y[:-1] or len(x) == 1:
+            if x != y:
+                return False
+        elif abs(x[-1] - y[-1]) > pct_tol:
+            return False
+    return True
+
+
+def objective_match(pred: Optional[float], gold: Optional[float], rtol: float = 1e-3, atol: float = 1e-6) -> Optional[bool]:
+    """Whether the objectives agree; None when there is no gold objective"""
+    if gold is None:
+        return None
+    if pred is None:
+        return False
+    return math.isclose(pred, gold, rel_tol=rtol, abs_tol=atol)
+
+
+def _rates(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    n = len(rows)
+    with_gold = [r['objective_match'] for r in rows if r['objective_match'] is not None]
+    return {
+        'total': n,
+        'ops_exact': sum(r['ops_exact'] for r in rows) / n * 100 if n else 0.0,
+        'ops_tolerance': sum(r['ops_tolerance'] for r in rows) / n * 100 if n else 0.0,
+        'objective_match': sum(with_gold) / len(with_gold) * 100 if with_gold else None,
+        'objective_labelled': len(with_gold)
+    }
+
+
+def _group(rows: List[Dict[str, Any]], key: str) -> Dict[str, Dict[str, Any]]:
+    groups = {}
+    for r in rows:
+        groups.setdefault(r.get(key) or 'uncategorized', []).append(r)
+    return {name: _rates(members) for name, members in sorted(groups.items())}
+
+
+def score_parse_accuracy(
+    items: Iterable[Dict[str, Any]],
+    coder,
+    optimizer=None,
+    solver: str = 'pulp',
+    workers: int = 8,
+    pct_tol: float = 1.0,
+    rtol: float = 1e-3
+) -> Dict[str, Any]:
+    """
+    Score parsed operations and objectives against gold labels.
+
+    Args:
+        items: Dataset entries with 'question', gold 'ops' and optionally gold 'objective' and 'category'
+        coder: CoderAgent to evaluate
+        optimizer: OptimizerAgent used to solve parsed operations (None skips objective scoring)
+        solver: Solver to use
+        workers: Threads parsing questions in parallel
+        pct_tol: Percentage-point tolerance for tolerance matches
+        rtol: Relative tolerance for objective matches
+
+    Returns:
+        Dictionary with per-item 'rows' and a 'summary' (overall, by category,
+        by parse method, and timings)
+    """
+    from chatsgp.utils.validation import validate_operations_batch
+
+    items = list(items)
+    questions = list(dict.fromkeys(it['question'] for it in items))
+
+    # Parse each distinct question once
+    start = time.perf_counter()
+
+    def parse(q):
+        try:
+            return coder.propose_modifications(q)
+        except Exception as e:
+            return {'ops': [], 'explanation': 'error', 'error': str(e)}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        parsed = dict(zip(questions, pool.map(parse, questions)))
+    parse_s = time.perf_counter() - start
+
+    # Solve each distinct valid parsed operation list once
+    start = time.perf_counter()
+    objectives = {}
+    if optimizer is not None and any(it.get('objective') is not None for it in items):
+        keys = {}
+        candidates = list(parsed.values())
+        valid, _ = validate_operations_batch([p['ops'] for p in candidates], hours=optimizer.snapshot.hours)
+        for p, ok in zip(candidates, valid):
+            if ok:
+                keys.setdefault(json.dumps(p['ops'], sort_keys=True), p['ops'])
+        if keys:
+            res = optimizer.run_many([{'ops': ops} for ops in keys.values()], solver=solver)
+            objectives = {k: (float(obj) if status == 'optimal' else None)
+                          for k, obj, status in zip(keys, res['objective'], res['status'])}
+    solve_s = time.perf_counter() - start
+
+    rows = []
+    for it in items:
+        p = parsed[it['question']]
+        key = json.dumps(p['ops'], sort_keys=True)
+        rows.append({
+            'question': it['question'],
+            'category': it.get('category'),
+            'parse_method': p.get('explanation'),
+            'ops': p['ops'],
+            'gold_ops': it.get('ops', []),
+            'ops_exact': ops_exact_match(p['ops'], it.get('ops', [])),
+            'ops_tolerance': ops_tolerance_match(p['ops'], it.get('ops', []), pct_tol),
+            'objective': objectives.get(key),
+            'gold_objective': it.get('objective'),
+            'objective_match': (objective_match(objectives.get(key), it.get('objective'), rtol)
+                                if optimizer is not None else None)
+        })
+
+    summary = _rates(rows)
+    summary['by_category'] = _group(rows, 'category')
+    summary['by_parse_method'] = _group(rows, 'parse_method')
+    summary['timings_s'] = {'parse': parse_s, 'solve': solve_s,
+                            'distinct_questions': len(questions), 'distinct_solves': len(objectives)}
+    return {'rows': rows, 'summary': summary}
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Score parsed operations against gold labels')
+    ap.add_argument('--dataset', required=True, help='JSONL dataset with gold ops (from build_dataset.py)')
+    ap.add_argument('--output', help='Optional JSONL file for per-question rows')
+    ap.add_argument('--config', help='Configuration file path')
+    ap.add_argument('--solver', default='pulp', choices=['pulp', 'highs', 'gurobi'], help='Solver to use')
+    ap.add_argument('--workers', type=int, default=8, help='Parallel parsing threads')
+    ap.add_argument('--solver-workers', type=int, default=0, help='Solve in a pool of N processes')
+    ap.add_argument('--pct-tol', type=float, default=1.0, help='Percentage-point tolerance for ops')
+    ap.add_argument('--rtol', type=float, default=1e-3, help='Relative tolerance for objectives')
+    ap.add_argument('--rule-based', action='store_true', help='Score the rule-based parser only (no LLM)')
+    args = ap.parse_args()
+
+    from chatsgp.agents.coder_agent import CoderAgent
+    from chatsgp.agents.optimizer_agent import OptimizerAgent
+    from chatsgp.config import get_config
+    from chatsgp.optimization.solver_pool import SolverPool
+    from chatsgp.server import load_icl
+    from chatsgp.utils.jsonl import JsonlWriter, iter_jsonl
+    from chatsgp.utils.llm_backend import create_llm
+
+    config = get_config(args.config) if args.config else get_config()
+    coder = CoderAgent(load_icl(), llm=None if args.rule_based else create_llm(config.get_llm_config()), config=config)
+    pool = SolverPool(workers=args.solver_workers) if args.solver_workers > 0 else None
+    try:
+        scores = score_parse_accuracy(iter_jsonl(args.dataset), coder,
+                                      OptimizerAgent(config=config, solver_pool=pool), solver=args.solver,
+                                      workers=args.workers, pct_tol=args.pct_tol, rtol=args.rtol)
+    finally:
+        if pool is not None:
+            pool.close()
+
+    if args.output:
+        with JsonlWriter(args.output) as writer:
+            for row in scores['rows']:
+                writer.write(row)
+    print(json.dumps(scores['summary'], indent=2))
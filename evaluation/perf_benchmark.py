@@ -0,0 +1,245 @@
+"""
+Performance benchmark suite for Chat-SGP
+
+Times model build, solve per backend, end-to-end question latency and solver
+throughput versus worker count, and measures peak memory, across horizons. A
+run can be saved as a JSON baseline and later runs checked against it; any
+metric that regresses by more than the threshold fails the check.
+
+Run with:
+    python -m evaluation.perf_benchmark --save-baseline perf_baseline.json
+    python -m evaluation.perf_benchmark --check perf_baseline.json --threshold 0.25
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Any, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_PV = [0, 0, 0, 0, 0.2, 0.5, 1, 1.5, 2, 2.2, 2, 1.5, 1, 0.8, 0.5, 0.2, 0, 0, 0, 0, 0, 0, 0, 0]
+
+
+def make_data(H: int) -> Dict[str, Any]:
+    """Model data for a horizon of H hours (the default day repeated)"""
+    return {'H': H, 'PV': np.resize(np.array(DEFAULT_PV, dtype=float), H), 'Load': np.full(H, 2.0),
+            'price_import': 0.25, 'price_export': 0.10, 'battery_capacity_kwh': 5.0, 'battery_eff': 0.95,
+            'battery_pmax': 2.0, 'init_soc': 0.5, 'Pimp': None, 'Pexp': None}
+
+
+def _median_time(fn, repeats: int) -> float:
+    times = []
+    for _ in range(max(1, repeats)):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def _metric(value: float, unit: str, higher_is_better: bool = False) -> Dict[str, Any]:
+    return {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+
+
+def solver_available(solver: str) -> bool:
+    """Whether a solver backend can run here"""
+    if solver == 'pulp':
+        return True
+    if solver == 'highs':
+        import pulp
+        return pulp.HiGHS(msg=False).available()
+    if solver == 'gurobi':
+        try:
+            import gurobipy  # noqa: F401
+            return True
+        except ImportError:
+            return False
+    return False
+
+
+def bench_build(H: int, repeats: int = 5) -> float:
+    """Median seconds to build the PuLP model"""
+    from chatsgp.optimization.rec_baseline import build_pulp_model
+    data = make_data(H)
+    return _median_time(lambda: build_pulp_model(data), repeats)
+
+
+def bench_solve(H: int, solver: str, repeats: int = 5) -> float:
+    """Median seconds to build and solve one model with a backend"""
+    from chatsgp.optimization.rec_baseline import build_and_solve
+    data = make_data(H)
+
+    def solve():
+        res = build_and_solve(data, solver=solver)
+        if res['status'] != 'optimal':
+            raise RuntimeError(f"{solver} returned {res['status']}: {res.get('error', '')}")
+    return _median_time(solve, repeats)
+
+
+def bench_question(repeats: int = 5, solver: str = 'pulp') -> float:
+    """Median end-to-end latency of a question through the rule-based pipeline (StubLLM, no network calls)"""
+    from chatsgp.agents.coder_agent import CoderAgent
+    from chatsgp.agents.optimizer_agent import OptimizerAgent
+    from chatsgp.agents.interpreter_agent import InterpreterAgent
+    from chatsgp.agents.orchestrator import Orchestrator
+    from chatsgp.utils.llm_backend import StubLLM
+    orchestrator = Orchestrator(CoderAgent([]), OptimizerAgent(), InterpreterAgent(llm=StubLLM()))
+    return _median_time(lambda: orchestrator.run_question('What happens if PV generation increases by 20%?',
+                                                          solver=solver), repeats)
+
+
+def bench_throughput(workers: int, jobs: int = 32, H: int = 24, solver: str = 'pulp') -> float:
+    """Solves per second for `jobs` models, in-process (workers=0) or on a SolverPool"""
+    from chatsgp.optimization.rec_baseline import build_and_solve
+    from chatsgp.optimization.solver_pool import SolverPool
+    datas = [make_data(H) for _ in range(jobs)]
+    if workers <= 0:
+        start = time.perf_counter()
+        for d in datas:
+            build_and_solve(d, solver=solver)
+        return jobs / (time.perf_counter() - start)
+    with SolverPool(workers=workers, solver=solver) as pool:
+        pool.map(datas[:workers])  # warm every worker
+        start = time.perf_counter()
+        pool.map(datas)
+        return jobs / (time.perf_counter() - start)
+
+
+def bench_memory(H: int, scenarios: int = 64) -> float:
+    """Peak traced Python memory (MiB) building a model and batch-solving `scenarios` scenarios"""
+    from chatsgp.agents.optimizer_agent import OptimizerAgent
+    from chatsgp.optimization.rec_baseline import build_pulp_model
+    tracemalloc.start()
+    try:
+        build_pulp_model(make_data(H))
+        OptimizerAgent().run_many([{'ops': [{'op': 'scale_series', 'target': 'PV', 'scale_pct': i}]}
+                                   for i in range(scenarios)])
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+def run_suite(
+    horizons: Sequence[int] = (24, 96, 168),
+    solvers: Sequence[str] = ('pulp', 'highs', 'gurobi'),
+    workers: Sequence[int] = (0, 1, 2),
+    repeats: int = 5,
+    throughput_jobs: int = 32,
+    memory_scenarios: int = 64
+) -> Dict[str, Any]:
+    """
+    Run the performance suite
+
+    Args:
+        horizons: Horizons (hours) for build and solve timings
+        solvers: Solver backends to time; unavailable ones are skipped
+        workers: Worker counts for the throughput sweep (0 = in-process)
+        repeats: Repetitions per timing (the median is kept)
+        throughput_jobs: Models solved per throughput measurement
+        memory_scenarios: Scenarios in the memory measurement batch
+
+    Returns:
+        Dictionary with 'metrics' (name -> value, unit, direction), 'skipped'
+        and 'environment'
+    """
+    metrics, skipped = {}, []
+    available = [s for s in solvers if solver_available(s)]
+    skipped += [f"solve/{s}" for s in solvers if s not in available]
+    for H in horizons:
+        metrics[f'build_s/H={H}'] = _metric(bench_build(H, repeats), 's')
+        for solver in available:
+            metrics[f'solve_s/{solver}/H={H}'] = _metric(bench_solve(H, solver, repeats), 's')
+    metrics['question_latency_s'] = _metric(bench_question(repeats), 's')
+    for w in workers:
+        metrics[f'throughput_per_s/workers={w}'] = _metric(bench_throughput(w, throughput_jobs), 'solves/s', True)
+    metrics[f'memory_peak_mib/H={max(horizons)}'] = _metric(bench_memory(max(horizons), memory_scenarios), 'MiB')
+    return {'metrics': metrics, 'skipped': skipped, 'environment': environment()}
+
+
+def environment() -> Dict[str, Any]:
+    """Machine description stored with baselines"""
+    return {'python': platform.python_version(), 'platform': platform.platform(),
+            'machine': platform.machine(), 'cpu_count': os.cpu_count()}
+
+
+def save_baseline(results: Dict[str, Any], path: str):
+    """Write suite results as a JSON baseline"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.2,
+                        min_delta_s: float = 0.002) -> List[Dict[str, Any]]:
+    """
+    Find metrics that regressed against a baseline
+
+    A lower-is-better metric regresses when it grows by more than `threshold`
+    (relative); a higher-is-better one when it drops by more than `threshold`.
+    Time metrics must also move by at least `min_delta_s` seconds, so timer
+    noise on sub-millisecond measurements doesn't fail the check. Metrics
+    missing from either side are ignored.
+
+    Returns:
+        List of regressions with metric, baseline, current and change_pct
+    """
+    regressions = []
+    for name, current in results['metrics'].items():
+        base = baseline.get('metrics', {}).get(name)
+        if base is None or not base['value']:
+            continue
+        change = (current['value'] - base['value']) / base['value']
+        if current.get('higher_is_better'):
+            regressed = change < -threshold
+        else:
+            regressed = change > threshold
+            if current['unit'] == 's' and current['value'] - base['value'] < min_delta_s:
+                regressed = False
+        if regressed:
+            regressions.append({'metric': name, 'baseline': base['value'], 'current': current['value'],
+                                'change_pct': change * 100})
+    return regressions
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Run the performance benchmark suite')
+    ap.add_argument('--horizons', type=int, nargs='+', default=[24, 96, 168], help='Horizons in hours')
+    ap.add_argument('--solvers', nargs='+', default=['pulp', 'highs', 'gurobi'], help='Solver backends')
+    ap.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2], help='Worker counts (0 = in-process)')
+    ap.add_argument('--repeats', type=int, default=5, help='Repetitions per timing')
+    ap.add_argument('--save-baseline', help='Write results to this JSON baseline')
+    ap.add_argument('--check', help='Compare against this JSON baseline; exit 1 on regression')
+    ap.add_argument('--threshold', type=float, default=0.2, help='Allowed relative regression (0.2 = 20%%)')
+    ap.add_argument('--output', help='Write results JSON here')
+    args = ap.parse_args()
+
+    results = run_suite(args.horizons, args.solvers, args.workers, args.repeats)
+    for name, m in sorted(results['metrics'].items()):
+        print(f"{name:40s} {m['value']:12.4f} {m['unit']}")
+    if results['skipped']:
+        print(f"Skipped (unavailable): {', '.join(results['skipped'])}")
+    if args.output:
+        save_baseline(results, args.output)
+    if args.save_baseline:
+        save_baseline(results, args.save_baseline)
+        print(f"Baseline saved to {args.save_baseline}")
+    if args.check:
+        baseline = load_baseline(args.check)
+        if baseline.get('environment') != results['environment']:
+            print("Warning: baseline was recorded on a different environment")
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['metric']}: {r['baseline']:.4f} -> {r['current']:.4f} ({r['change_pct']:+.1f}%)")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%}")
@@ -0,0 +1,366 @@
+"""
+Synthetic question generator for Chat-SGP
+
+Generates labelled questions at load-test scale. Every question carries its
+gold operations, so the same datasets drive the parse accuracy benchmark.
+
+- Category mix: questions are drawn per category with configurable weights
+  (`QPimpPexp`, `QPconsPprod`, `QPshift` and `QPmulti` for 2-3 operations).
+- Paraphrases: 'base' uses the original nine templates; 'full' expands every
+  intent over subject synonyms, verbs and sentence frames.
+- Repetition: with `zipf > 0`, questions are drawn from a pool of `distinct`
+  questions with Zipf-distributed ranks, so a few questions recur often and
+  most rarely, like production traffic hitting a result cache. Pool entries
+  are derived from (seed, index), so every shard regenerates them
+  independently and the same rank is the same question everywhere.
+- Output: shards of `shard_size` records (`questions-00000.jsonl.gz`, ...)
+  written in parallel processes, plus `manifest.json` with the spec and
+  per-shard counts. Compression follows the suffix (.gz, .zst or none).
+
+Run with: python -m evaluation.question_generator --out-dir data/questions --n 1000000 --workers 4 --zipf 1.1
+"""
+
+import argparse
+import json
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+# The original dataset templates ('base' paraphrases)
+TEMPLATES = {
+    'QPimpPexp': [
+        'What happens if imports increase by {pct}%?',
+        'Reduce exports by {pct}%. What is the new cost?',
+        'If exports rise by {pct}%, how does the profit change?',
+        'Assume imports decrease by {pct}%. Compute the objective.'
+    ],
+    'QPconsPprod': [
+        'Increase PV generation by {pct}%. How does the objective change?',
+        'Increase consumption by {pct}%. What is the outcome?',
+        'Decrease load by {pct}% during the day. Evaluate the impact.'
+    ],
+    'QPshift': [
+        'What if we shift {pct}% of the load from {h1} to {h2}?',
+        'Shift {pct}% from hour {h1} to {h2} and report the cost.'
+    ]
+}
+
+# Gold scale_series meaning of each scaling template: (target, sign of the percentage)
+SCALE_GOLD = {
+    'What happens if imports increase by {pct}%?': ('Pimp', 1),
+    'Reduce exports by {pct}%. What is the new cost?': ('Pexp', -1),
+    'If exports rise by {pct}%, how does the profit change?': ('Pexp', 1),
+    'Assume imports decrease by {pct}%. Compute the objective.': ('Pimp', -1),
+    'Increase PV generation by {pct}%. How does the objective change?': ('PV', 1),
+    'Increase consumption by {pct}%. What is the outcome?': ('Load', 1),
+    'Decrease load by {pct}% during the day. Evaluate the impact.': ('Load', -1)
+}
+
+CATEGORIES = ('QPimpPexp', 'QPconsPprod', 'QPshift', 'QPmulti')
+DEFAULT_MIX = {'QPimpPexp': 0.35, 'QPconsPprod': 0.35, 'QPshift': 0.2, 'QPmulti': 0.1}
+SCALE_TARGETS = {'QPimpPexp': ('Pimp', 'Pexp'), 'QPconsPprod': ('PV', 'Load')}
+
+# 'full' paraphrases: (subject, plural) per target
+SUBJECTS = {
+    'Pimp': (('imports', True), ('grid imports', True), ('electricity imports', True), ('grid purchases', True)),
+    'Pexp': (('exports', True), ('grid exports', True), ('electricity exports', True), ('feed-in to the grid', False)),
+    'PV': (('PV generation', False), ('PV production', False), ('solar output', False), ('solar generation', False)),
+    'Load': (('consumption', False), ('load', False), ('demand', False), ('electricity demand', False)),
+}
+# (base form, third person) per direction
+VERBS = {1: (('increase', 'increases'), ('rise', 'rises'), ('grow', 'grows'), ('go up', 'goes up')),
+         -1: (('decrease', 'decreases'), ('fall', 'falls'), ('drop', 'drops'), ('go down', 'goes down'))}
+IMPERATIVES = {1: ('Increase', 'Raise', 'Boost'), -1: ('Reduce', 'Decrease', 'Cut', 'Lower')}
+SCALE_FRAMES = (
+    'What happens if {clause}?',
+    'What if {clause}?',
+    'Assume {clause}. Compute the objective.',
+    'Suppose {clause}; how does the cost change?',
+    'If {clause}, what is the outcome?',
+    '{imperative} {subject} by {pct}%. What is the new cost?',
+    '{imperative} {subject} by {pct}%. How does the objective change?',
+)
+SHIFT_CLAUSES = (
+    'we shift {pct}% of the load from {h1} to {h2}',
+    '{pct}% of the load moves from hour {h1} to hour {h2}',
+    'we move {pct}% of consumption from hour {h1} to hour {h2}',
+    '{pct}% of demand is shifted from {h1}:00 to {h2}:00',
+)
+SHIFT_FRAMES = (
+    'What if {clause}?',
+    'What happens if {clause}?',
+    'Suppose {clause}. What is the new cost?',
+    'Shift {pct}% from hour {h1} to {h2} and report the cost.',
+)
+MULTI_FRAMES = (
+    'What happens if {clauses}?',
+    'Suppose {clauses}. What is the new cost?',
+    'Assume {clauses}. Compute the objective.',
+)
+
+SCALE_PCTS = {'QPimpPexp': (5, 10, 15, 20, -5, -10, -15, -20), 'QPconsPprod': (5, 10, 20, 25, -10, -20)}
+FULL_SCALE_PCTS = (5, 10, 15, 20, 25, 30, 40, 50)
+SHIFT_PCTS = (25, 33, 50, 67, 75)
+SHIFT_FROM = (7, 8, 9, 10, 12, 13, 17, 18, 20)
+SHIFT_TO = (6, 11, 14, 15, 16, 19, 21, 22, 23)
+
+
+def sample_with_gold(cat: str, rng=random) -> Tuple[str, List[Dict[str, Any]]]:
+    """Sample a question from a category's base templates together with its gold operations"""
+    if cat in ('QPimpPexp', 'QPconsPprod'):
+        template = rng.choice(TEMPLATES[cat])
+        pct = rng.choice(SCALE_PCTS[cat])
+        target, sign = SCALE_GOLD[template]
+        return template.format(pct=pct), [{'op': 'scale_series', 'target': target, 'scale_pct': sign * pct}]
+    if cat == 'QPshift':
+        pct, h1, h2 = _shift_params(rng)
+        question = rng.choice(TEMPLATES[cat]).format(pct=pct, h1=h1, h2=h2)
+        return question, [{'op': 'shift_load', 'percentage': pct, 'from_hour': h1, 'to_hour': h2}]
+    raise ValueError(f"Unknown category: {cat}")
+
+
+def _shift_params(rng) -> Tuple[int, int, int]:
+    pct = rng.choice(SHIFT_PCTS)
+    h1 = rng.choice(SHIFT_FROM)
+    h2 = rng.choice(SHIFT_TO)
+    if h1 == h2:
+        h2 = (h2 + 1) % 24
+    return pct, h1, h2
+
+
+def _scale_clause(rng, targets) -> Tuple[str, Dict[str, Any], tuple]:
+    target = rng.choice(targets)
+    sign = rng.choice((1, -1))
+    pct = rng.choice(FULL_SCALE_PCTS)
+    subject, plural = rng.choice(SUBJECTS[target])
+    base, third = rng.choice(VERBS[sign])
+    clause = f"{subject} {base if plural else third} by {pct}%"
+    return clause, {'op': 'scale_series', 'target': target, 'scale_pct': sign * pct}, (subject, sign, pct)
+
+
+def _shift_clause(rng) -> Tuple[str, Dict[str, Any], tuple]:
+    pct, h1, h2 = _shift_params(rng)
+    clause = rng.choice(SHIFT_CLAUSES).format(pct=pct, h1=h1, h2=h2)
+    return clause, {'op': 'shift_load', 'percentage': pct, 'from_hour': h1, 'to_hour': h2}, (pct, h1, h2)
+
+
+def sample_full(cat: str, rng=random, max_ops: int = 3) -> Tuple[str, List[Dict[str, Any]]]:
+    """Sample a question from a category's expanded paraphrases together with its gold operations"""
+    if cat in SCALE_TARGETS:
+        clause, op, (subject, sign, pct) = _scale_clause(rng, SCALE_TARGETS[cat])
+        frame = rng.choice(SCALE_FRAMES)
+        return frame.format(clause=clause, subject=subject, pct=pct,
+                            imperative=rng.choice(IMPERATIVES[sign])), [op]
+    if cat == 'QPshift':
+        clause, op, (pct, h1, h2) = _shift_clause(rng)
+        return rng.choice(SHIFT_FRAMES).format(clause=clause, pct=pct, h1=h1, h2=h2), [op]
+    if cat == 'QPmulti':
+        # Each series is scaled at most once per question, so the gold ops are unambiguous
+        clauses, ops, free = [], [], ['Pimp', 'Pexp', 'PV', 'Load']
+        for _ in range(rng.randint(2, max(2, max_ops))):
+            if rng.random() < 0.2 or not free:
+                clause, op, _ = _shift_clause(rng)
+            else:
+                clause, op, _ = _scale_clause(rng, free)
+                free.remove(op['target'])
+            clauses.append(clause)
+            ops.append(op)
+        joined = ', '.join(clauses[:-1]) + ' and ' + clauses[-1]
+        return rng.choice(MULTI_FRAMES).format(clauses=joined), ops
+    raise ValueError(f"Unknown category: {cat}")
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """
+    Parse a category mix such as 'QPimpPexp=2,QPshift=1' (a bare name weighs 1)
+
+    Categories and weights are checked by QuestionGenerator.
+    """
+    mix = {}
+    for part in filter(None, (p.strip() for p in text.split(','))):
+        name, _, weight = part.partition('=')
+        mix[name.strip()] = float(weight) if weight else 1.0
+    return mix
+
+
+class QuestionGenerator:
+    """Draws labelled questions from a category mix"""
+
+    def __init__(self, mix: Optional[Dict[str, float]] = None, paraphrases: str = 'full',
+                 max_ops: int = 3, seed: int = 1337):
+        """
+        Initialize QuestionGenerator
+
+        Args:
+            mix: Category -> relative weight (default DEFAULT_MIX)
+            paraphrases: 'base' (original templates; no QPmulti) or 'full'
+            max_ops: Maximum operations per QPmulti question
+            seed: Seed for pool entries (see `pool_item`)
+
+        Raises:
+            ValueError: If the mix or paraphrase mode is invalid
+        """
+        mix = dict(mix or DEFAULT_MIX)
+        if paraphrases not in ('base', 'full'):
+            raise ValueError(f"Unknown paraphrase mode: {paraphrases}")
+        unknown = set(mix) - set(CATEGORIES)
+        if unknown:
+            raise ValueError(f"Unknown categories: {sorted(unknown)}")
+        if paraphrases == 'base' and mix.get('QPmulti'):
+            raise ValueError("QPmulti needs paraphrases='full'")
+        if not mix or any(w < 0 for w in mix.values()) or sum(mix.values()) <= 0:
+            raise ValueError("Category weights must be non-negative with a positive total")
+        total = sum(mix.values())
+        self.mix = {name: round(weight / total, 6) for name, weight in mix.items() if weight > 0}
+        self.categories = list(self.mix)
+        self.weights = list(self.mix.values())
+        self.paraphrases = paraphrases
+        self.max_ops = max_ops
+        self.seed = seed
+
+    def sample(self, rng) -> Dict[str, Any]:
+        """One labelled question: {'question', 'category', 'ops'}"""
+        cat = rng.choices(self.categories, self.weights)[0]
+        if self.paraphrases == 'base':
+            question, ops = sample_with_gold(cat, rng)
+        else:
+            question, ops = sample_full(cat, rng, self.max_ops)
+        return {'question': question, 'category': cat, 'ops': ops}
+
+    def pool_item(self, index: int) -> Dict[str, Any]:
+        """The pool question at `index` (the same for every shard and process)"""
+        return self.sample(random.Random(self.seed * 1_000_003 + index))
+
+    def spec(self) -> Dict[str, Any]:
+        return {'mix': self.mix, 'paraphrases': self.paraphrases, 'max_ops': self.max_ops, 'seed': self.seed}
+
+
+def zipf_ranks(count: int, distinct: int, s: float, rng: np.random.Generator) -> np.ndarray:
+    """Draw `count` ranks in [0, distinct) with P(rank k) proportional to 1 / (k + 1) ** s"""
+    cdf = np.cumsum(1.0 / np.arange(1, distinct + 1, dtype=np.float64) ** s)
+    cdf /= cdf[-1]
+    return np.minimum(np.searchsorted(cdf, rng.random(count), side='right'), distinct - 1)
+
+
+def write_shard(spec: Dict[str, Any], shard: int, start: int, count: int, path: str,
+                zipf: float = 0.0, distinct: int = 0) -> Dict[str, Any]:
+    """
+    Generate one shard file (worker entry point)
+
+    Args:
+        spec: QuestionGenerator.spec()
+        shard: Shard index (seeds this shard's draws)
+        start: Global index of the shard's first record
+        count: Records to write
+        path: Output file
+        zipf: Zipf exponent for pool draws (0 samples every record fresh)
+        distinct: Pool size for Zipf draws
+
+    Returns:
+        {'path', 'count', 'distinct'} for the manifest
+    """
+    from chatsgp.utils.jsonl import open_jsonl
+
+    generator = QuestionGenerator(**spec)
+    seen = set()
+    with open_jsonl(path, 'w') as f:
+        if zipf > 0:
+            ranks = zipf_ranks(count, distinct, zipf, np.random.default_rng([generator.seed, shard]))
+            pool = {}
+            for i, rank in enumerate(ranks.tolist()):
+                line = pool.get(rank)
+                if line is None:
+                    item = generator.pool_item(rank)
+                    line = pool[rank] = json.dumps({'question': item['question'], 'category': item['category'],
+                                                    'ops': item['ops']})[:-1]
+                f.write(f'{line}, "qid": {rank}, "index": {start + i}}}\n')
+            seen.update(pool)
+        else:
+            rng = random.Random(generator.seed * 1_000_003 + 999_983 * (shard + 1))
+            for i in range(count):
+                item = generator.sample(rng)
+                item['index'] = start + i
+                f.write(json.dumps(item) + '\n')
+    return {'path': Path(path).name, 'count': count, 'distinct': len(seen) if zipf > 0 else None}
+
+
+def generate_dataset(
+    out_dir,
+    n: int,
+    generator: Optional[QuestionGenerator] = None,
+    shard_size: int = 100_000,
+    workers: int = 0,
+    zipf: float = 0.0,
+    distinct: int = 10_000,
+    suffix: str = '.jsonl.gz'
+) -> Dict[str, Any]:
+    """
+    Write `n` labelled questions as shards plus a manifest
+
+    Args:
+        out_dir: Output directory (created if missing)
+        n: Number of questions
+        generator: QuestionGenerator (default mix and paraphrases)
+        shard_size: Records per shard
+        workers: Generator processes (0 writes shards in this process)
+        zipf: Zipf exponent for repeated questions (0 disables repetition)
+        distinct: Pool size for Zipf repetition
+        suffix: Shard file suffix ('.jsonl.gz', '.jsonl.zst' or '.jsonl')
+
+    Returns:
+        The manifest (also written to out_dir/manifest.json)
+    """
+    generator = generator or QuestionGenerator()
+    if zipf > 0 and distinct < 1:
+        raise ValueError("distinct must be positive for Zipf repetition")
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    shard_size = max(1, shard_size)
+    jobs = [(generator.spec(), shard, start, min(shard_size, n - start),
+             str(out_dir / f'questions-{shard:05d}{suffix}'), zipf, distinct)
+            for shard, start in enumerate(range(0, n, shard_size))]
+
+    started = time.perf_counter()
+    if workers <= 0 or len(jobs) <= 1:
+        shards = [write_shard(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            shards = list(pool.map(write_shard, *zip(*jobs)))
+    manifest = {
+        'n': n,
+        'generator': generator.spec(),
+        'zipf': zipf,
+        'distinct': distinct if zipf > 0 else None,
+        'shards': shards,
+        'elapsed_s': round(time.perf_counter() - started, 3),
+    }
+    (out_dir / 'manifest.json').write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+    return manifest
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Generate sharded synthetic questions with gold operations')
+    ap.add_argument('--out-dir', required=True, help='Output directory for shards and manifest.json')
+    ap.add_argument('--n', type=int, default=1_000_000, help='Number of questions')
+    ap.add_argument('--mix', help='Category weights, e.g. QPimpPexp=0.4,QPconsPprod=0.3,QPshift=0.2,QPmulti=0.1')
+    ap.add_argument('--paraphrases', default='full', choices=['base', 'full'], help='Template set')
+    ap.add_argument('--max-ops', type=int, default=3, help='Maximum operations per multi-op question')
+    ap.add_argument('--zipf', type=float, default=0.0, help='Zipf exponent for repeated questions (0 disables)')
+    ap.add_argument('--distinct', type=int, default=10_000, help='Distinct questions drawn from with --zipf')
+    ap.add_argument('--shard-size', type=int, default=100_000, help='Records per shard')
+    ap.add_argument('--compression', default='gz', choices=['gz', 'zst', 'none'], help='Shard compression')
+    ap.add_argument('--workers', type=int, default=0, help='Generator processes')
+    ap.add_argument('--seed', type=int, default=1337, help='Random seed')
+    args = ap.parse_args()
+
+    gen = QuestionGenerator(parse_mix(args.mix) if args.mix else None, paraphrases=args.paraphrases,
+                            max_ops=args.max_ops, seed=args.seed)
+    suffix = '.jsonl' if args.compression == 'none' else f'.jsonl.{args.compression}'
+    manifest = generate_dataset(args.out_dir, args.n, gen, shard_size=args.shard_size, workers=args.workers,
+                                zipf=args.zipf, distinct=args.distinct, suffix=suffix)
+    print(f"Wrote {manifest['n']} questions in {len(manifest['shards'])} shards to {args.out_dir} "
+          f"({manifest['elapsed_s']} s)")
@@ -0,0 +1,115 @@
+"""
+Batch scenario thumbnails for Chat-SGP
+
+Solves the operations of every record in a results or dataset file as one
+shared-memory batch and renders an energy-flow thumbnail per scenario with
+`chatsgp.utils.batch_render`, reusing one Agg figure per worker process
+instead of building a pyplot figure per plot.
+
+Run with: python -m evaluation.render_scenarios --input results.jsonl --out-dir thumbs --workers 4
+"""
+
+import argparse
+import json
+import time
+from itertools import islice
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+
+def record_ops(record: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """Operations of a result record (parsed ops) or dataset record (gold ops)"""
+    result = record.get('result')
+    if isinstance(result, dict) and isinstance(result.get('ops'), dict):
+        return result['ops'].get('ops')
+    return record.get('ops')
+
+
+def collect_scenarios(records: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str], List[str]]:
+    """Operation bundles, file names and titles of the records that have operations"""
+    bundles, names, titles = [], [], []
+    for i, record in enumerate(records):
+        ops = record_ops(record)
+        if ops is None:
+            continue
+        bundles.append({'ops': ops})
+        names.append(f"scenario_{i:05d}")
+        titles.append(str(record.get('question', ''))[:70])
+    return bundles, names, titles
+
+
+def render_records(records: Iterable[Dict[str, Any]], optimizer, out_dir: str, fmt: str = 'png',
+                   workers: int = 0, solver: str = 'pulp', dpi: int = 72) -> Dict[str, Any]:
+    """
+    Solve and render every record with operations
+
+    Records whose operations are invalid are skipped and counted.
+
+    Args:
+        records: Result or dataset records
+        optimizer: OptimizerAgent (optionally with a solver pool)
+        out_dir: Directory for the images
+        fmt: 'png' or 'svg'
+        workers: Rendering processes (0 renders in this process)
+        solver: Solver to use
+        dpi: Resolution of PNG thumbnails
+
+    Returns:
+        Summary with counts, timings and the rendered paths
+    """
+    from chatsgp.utils.batch_render import render_many, scenarios_from_results
+    from chatsgp.utils.validation import validate_operations_batch
+
+    bundles, names, titles = collect_scenarios(records)
+    valid, _ = validate_operations_batch(bundles, hours=optimizer.snapshot.hours)
+    keep = [i for i, ok in enumerate(valid) if ok]
+    bundles = [bundles[i] for i in keep]
+    names = [names[i] for i in keep]
+    titles = [titles[i] for i in keep]
+
+    start = time.perf_counter()
+    results = optimizer.run_many(bundles, solver=solver) if bundles else None
+    solve_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    paths = render_many(scenarios_from_results(results, names, titles), out_dir, fmt=fmt,
+                        workers=workers, dpi=dpi) if results is not None else []
+    render_s = time.perf_counter() - start
+    return {
+        'rendered': len(paths),
+        'skipped_invalid': int(len(valid) - len(keep)),
+        'solve_s': round(solve_s, 3),
+        'render_s': round(render_s, 3),
+        'paths': paths,
+    }
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Render energy-flow thumbnails for many scenarios')
+    ap.add_argument('--input', required=True, help='JSONL results (run_batch.py) or dataset with gold ops')
+    ap.add_argument('--out-dir', required=True, help='Directory for the images')
+    ap.add_argument('--format', default='png', choices=['png', 'svg'], help='Image format')
+    ap.add_argument('--workers', type=int, default=0, help='Rendering processes (0 renders in-process)')
+    ap.add_argument('--dpi', type=int, default=72, help='Resolution of PNG thumbnails')
+    ap.add_argument('--limit', type=int, help='Render at most N records')
+    ap.add_argument('--config', help='Configuration file path')
+    ap.add_argument('--solver', default='pulp', choices=['pulp', 'highs', 'gurobi'], help='Solver to use')
+    ap.add_argument('--solver-workers', type=int, default=0, help='Solve in a pool of N processes')
+    args = ap.parse_args()
+
+    from chatsgp.agents.optimizer_agent import OptimizerAgent
+    from chatsgp.config import get_config
+    from chatsgp.optimization.solver_pool import SolverPool
+    from chatsgp.utils.jsonl import iter_jsonl
+
+    config = get_config(args.config) if args.config else get_config()
+    pool = SolverPool(workers=args.solver_workers) if args.solver_workers > 0 else None
+    try:
+        summary = render_records(islice(iter_jsonl(args.input, skip_invalid=True), args.limit),
+                                 OptimizerAgent(config=config, solver_pool=pool), args.out_dir,
+                                 fmt=args.format, workers=args.workers, solver=args.solver, dpi=args.dpi)
+    finally:
+        if pool is not None:
+            pool.close()
+
+    summary.pop('paths')
+    print(json.dumps(summary, indent=2))
@@ -0,0 +1,209 @@
+"""
+Columnar results store for Chat-SGP
+
+Flattens nested per-question result records into typed columns and stores them
+as Parquet (.parquet) or Arrow IPC (.arrow/.feather) files, written in row
+groups so arbitrarily long runs never sit in memory. Columns load back as NumPy
+arrays, so metrics and comparisons are vectorized reductions rather than
+per-record dict walks. Requires the optional `pyarrow` package.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Optional
+
+import numpy as np
+
+# Column name -> Arrow type name, in file order
+RESULT_SCHEMA = (
+    ('question', 'string'),
+    ('category', 'string'),
+    ('ops', 'string'),            # JSON-encoded operation list
+    ('n_ops', 'int32'),
+    ('parse_method', 'string'),   # 'llm-with-icl', 'rule-based', ...
+    ('status', 'string'),         # pipeline status: 'success' or 'error'
+    ('solve_status', 'string'),   # solver status: 'optimal', 'infeasible', ...
+    ('objective', 'float64'),     # NaN when not solved
+    ('elapsed_s', 'float64'),     # NaN when not timed
+    ('error', 'string'),
+)
+COLUMNS = tuple(name for name, _ in RESULT_SCHEMA)
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+        import pyarrow.ipc  # noqa: F401
+    except ImportError as e:
+        raise ImportError("The columnar results store requires the 'pyarrow' package") from e
+    return pyarrow
+
+
+def _format(path) -> str:
+    suffix = Path(path).suffix.lower()
+    if suffix == '.parquet':
+        return 'parquet'
+    if suffix in ('.arrow', '.feather', '.ipc'):
+        return 'arrow'
+    raise ValueError(f"Unsupported columnar file type: {path} (use .parquet or .arrow)")
+
+
+def flatten_result(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Flatten one result record into a row of RESULT_SCHEMA columns
+
+    Accepts the records written by the batch and benchmark runners, where
+    'result' holds the orchestrator output ({'ops', 'result', 'answer'}), as
+    well as flat records with 'ops' and 'result' ({'status', 'objective'}) at
+    the top level.
+
+    Args:
+        record: Result record
+
+    Returns:
+        Dictionary with one value per column
+    """
+    out = record.get('result') or {}
+    solved = out.get('result') if isinstance(out.get('result'), dict) else out
+    parsed = out.get('ops') if isinstance(out.get('ops'), dict) else record.get('ops') or {}
+    ops = parsed.get('ops') if isinstance(parsed, dict) else None
+    objective = solved.get('objective')
+    elapsed = record.get('elapsed_s')
+    return {
+        'question': record.get('question'),
+        'category': record.get('category'),
+        'ops': json.dumps(ops) if ops is not None else None,
+        'n_ops': len(ops) if isinstance(ops, list) else 0,
+        'parse_method': parsed.get('explanation') if isinstance(parsed, dict) else None,
+        'status': record.get('status'),
+        'solve_status': solved.get('status'),
+        'objective': float(objective) if isinstance(objective, (int, float)) else float('nan'),
+        'elapsed_s': float(elapsed) if isinstance(elapsed, (int, float)) else float('nan'),
+        'error': record.get('error') or solved.get('error'),
+    }
+
+
+class ColumnarWriter:
+    """Buffers flattened rows and writes them as row groups to a Parquet or Arrow file"""
+
+    def __init__(self, path, batch_size: int = 65536):
+        """
+        Initialize ColumnarWriter
+
+        Args:
+            path: Output path (.parquet or .arrow/.feather)
+            batch_size: Rows buffered per row group / record batch
+        """
+        pa = _pyarrow()
+        self.path = Path(path)
+        self.format = _format(path)
+        self.batch_size = max(1, batch_size)
+        self.count = 0
+        self.schema = pa.schema([(name, getattr(pa, kind)()) for name, kind in RESULT_SCHEMA])
+        self._buffer = {name: [] for name in COLUMNS}
+        if self.format == 'parquet':
+            self._writer = pa.parquet.ParquetWriter(str(self.path), self.schema)
+        else:
+            self._writer = pa.ipc.new_file(str(self.path), self.schema)
+
+    def write(self, record: Dict[str, Any]):
+        """Append one result record (flattened on the way in)"""
+        self.write_row(flatten_result(record))
+
+    def write_row(self, row: Dict[str, Any]):
+        """Append one already flattened row"""
+        for name in COLUMNS:
+            self._buffer[name].append(row.get(name))
+        self.count += 1
+        if len(self._buffer['question']) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer['question']:
+            return
+        pa = _pyarrow()
+        batch = pa.record_batch([self._buffer[name] for name in COLUMNS], schema=self.schema)
+        if self.format == 'parquet':
+            self._writer.write_batch(batch)
+        else:
+            self._writer.write(batch)
+        self._buffer = {name: [] for name in COLUMNS}
+
+    def close(self):
+        if self._writer is not None:
+            self._flush()
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_columnar(records: Iterable[Dict[str, Any]], path, batch_size: int = 65536) -> int:
+    """
+    Write result records to a columnar file, streaming in row groups
+
+    Returns:
+        Number of rows written
+    """
+    with ColumnarWriter(path, batch_size=batch_size) as writer:
+        for record in records:
+            writer.write(record)
+    return writer.count
+
+
+def jsonl_to_columnar(src, dst, batch_size: int = 65536) -> int:
+    """Convert a (possibly compressed) JSONL results file to Parquet/Arrow"""
+    from chatsgp.utils.jsonl import iter_jsonl
+    return write_columnar(iter_jsonl(src), dst, batch_size=batch_size)
+
+
+def read_columnar(path, columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Load columns from a Parquet/Arrow results file
+
+    Args:
+        path: Input path
+        columns: Columns to load (default: all); unread columns cost nothing
+
+    Returns:
+        Dictionary of column name -> NumPy array (object arrays for strings)
+    """
+    pa = _pyarrow()
+
+    def to_numpy(table):
+        return {name: table.column(name).to_numpy(zero_copy_only=False) for name in table.column_names}
+
+    if _format(path) == 'parquet':
+        return to_numpy(pa.parquet.read_table(str(path), columns=columns))
+    with pa.memory_map(str(path)) as source:
+        table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+        # Copy out before the map closes
+        return {name: np.array(values) for name, values in to_numpy(table).items()}
+
+
+def columns_from_records(records: Iterable[Dict[str, Any]],
+                         columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Flatten result records into the same column arrays read_columnar returns
+
+    Args:
+        records: Result records (any iterable, consumed once)
+        columns: Columns to keep (default: all)
+    """
+    names = list(columns) if columns is not None else list(COLUMNS)
+    data = {name: [] for name in names}
+    for record in records:
+        row = flatten_result(record)
+        for name in names:
+            data[name].append(row[name])
+    types = dict(RESULT_SCHEMA)
+    return {name: np.array(values, dtype=np.float64 if types[name] == 'float64'
+                           else np.int32 if types[name] == 'int32' else object)
+            for name, values in data.items()}
@@ -0,0 +1,215 @@
+/*
+ * Minimal canvas charts for Chat-SGP dashboards.
+ *
+ * Bundled with the report generator and inlined into each page, so reports
+ * open offline. Every chart takes pre-aggregated data (histogram bins, row
+ * buckets), so drawing cost does not grow with the number of scenarios.
+ */
+(function (global) {
+  'use strict';
+
+  var PAD = {left: 56, right: 12, top: 12, bottom: 36};
+  var FONT = '11px sans-serif';
+
+  function setup(el, height) {
+    var canvas = document.createElement('canvas');
+    var ratio = global.devicePixelRatio || 1;
+    var width = el.clientWidth || 480;
+    canvas.width = width * ratio;
+    canvas.height = height * ratio;
+    canvas.style.width = width + 'px';
+    canvas.style.height = height + 'px';
+    el.appendChild(canvas);
+    var ctx = canvas.getContext('2d');
+    ctx.scale(ratio, ratio);
+    ctx.font = FONT;
+    var tip = document.createElement('div');
+    tip.className = 'tip';
+    el.appendChild(tip);
+    return {canvas: canvas, ctx: ctx, tip: tip, w: width, h: height,
+            pw: width - PAD.left - PAD.right, ph: height - PAD.top - PAD.bottom};
+  }
+
+  function fmt(v) {
+    if (v === null || v === undefined) return '-';
+    var a = Math.abs(v);
+    if (a !== 0 && (a < 0.01 || a >= 1e5)) return v.toExponential(2);
+    return (Math.round(v * 100) / 100).toString();
+  }
+
+  function extent(values) {
+    var lo = Infinity, hi = -Infinity;
+    for (var i = 0; i < values.length; i++) {
+      var v = values[i];
+      if (v === null) continue;
+      if (v < lo) lo = v;
+      if (v > hi) hi = v;
+    }
+    if (lo === Infinity) return [0, 1];
+    if (lo === hi) return [lo - 1, hi + 1];
+    return [lo, hi];
+  }
+
+  function axes(c, x0, x1, y0, y1, xLabel, yLabel) {
+    var ctx = c.ctx;
+    ctx.strokeStyle = '#999';
+    ctx.fillStyle = '#333';
+    ctx.beginPath();
+    ctx.moveTo(PAD.left, PAD.top);
+    ctx.lineTo(PAD.left, PAD.top + c.ph);
+    ctx.lineTo(PAD.left + c.pw, PAD.top + c.ph);
+    ctx.stroke();
+    ctx.textAlign = 'right';
+    ctx.textBaseline = 'middle';
+    for (var i = 0; i <= 4; i++) {
+      var y = PAD.top + c.ph - i / 4 * c.ph;
+      ctx.fillText(fmt(y0 + (y1 - y0) * i / 4), PAD.left - 4, y);
+    }
+    ctx.textAlign = 'center';
+    ctx.textBaseline = 'top';
+    if (x0 !== null) {
+      for (var j = 0; j <= 4; j++) {
+        ctx.fillText(fmt(x0 + (x1 - x0) * j / 4), PAD.left + j / 4 * c.pw, PAD.top + c.ph + 4);
+      }
+    }
+    if (xLabel) ctx.fillText(xLabel, PAD.left + c.pw / 2, PAD.top + c.ph + 20);
+    if (yLabel) {
+      ctx.save();
+      ctx.translate(10, PAD.top + c.ph / 2);
+      ctx.rotate(-Math.PI / 2);
+      ctx.fillText(yLabel, 0, 0);
+      ctx.restore();
+    }
+  }
+
+  function hover(c, describe) {
+    c.canvas.addEventListener('mousemove', function (e) {
+      var r = c.canvas.getBoundingClientRect();
+      var text = describe(e.clientX - r.left - PAD.left, e.clientY - r.top - PAD.top);
+      c.tip.style.display = text ? 'block' : 'none';
+      if (text) {
+        c.tip.textContent = text;
+        c.tip.style.left = (e.clientX - r.left + 12) + 'px';
+        c.tip.style.top = (e.clientY - r.top + 12) + 'px';
+      }
+    });
+    c.canvas.addEventListener('mouseleave', function () { c.tip.style.display = 'none'; });
+  }
+
+  // Histogram from bin edges (n + 1) and counts (n)
+  function histogram(el, data, opts) {
+    opts = opts || {};
+    var c = setup(el, opts.height || 240);
+    var n = data.counts.length;
+    var ymax = Math.max.apply(null, data.counts.concat([1]));
+    var x0 = data.edges[0], x1 = data.edges[n];
+    axes(c, x0, x1, 0, ymax, opts.xLabel, opts.yLabel || 'count');
+    var bw = c.pw / Math.max(n, 1);
+    c.ctx.fillStyle = opts.color || '#4878a8';
+    for (var i = 0; i < n; i++) {
+      var h = data.counts[i] / ymax * c.ph;
+      c.ctx.fillRect(PAD.left + i * bw + 0.5, PAD.top + c.ph - h, Math.max(bw - 1, 1), h);
+    }
+    hover(c, function (x) {
+      var i = Math.floor(x / bw);
+      if (i < 0 || i >= n) return null;
+      return fmt(data.edges[i]) + ' to ' + fmt(data.edges[i + 1]) + ': ' + data.counts[i];
+    });
+  }
+
+  // Vertical bars with one label and value per bar
+  function bars(el, labels, values, opts) {
+    opts = opts || {};
+    var c = setup(el, opts.height || 240);
+    var n = values.length;
+    var ymax = opts.max || Math.max.apply(null, values.concat([1]));
+    axes(c, null, null, 0, ymax, null, opts.yLabel);
+    var bw = c.pw / Math.max(n, 1);
+    c.ctx.textAlign = 'center';
+    c.ctx.textBaseline = 'top';
+    for (var i = 0; i < n; i++) {
+      var h = values[i] / ymax * c.ph;
+      c.ctx.fillStyle = opts.color || '#59a14f';
+      c.ctx.fillRect(PAD.left + i * bw + bw * 0.15, PAD.top + c.ph - h, bw * 0.7, h);
+      if (bw > 30) {
+        c.ctx.fillStyle = '#333';
+        c.ctx.fillText(String(labels[i]).slice(0, Math.floor(bw / 6)), PAD.left + (i + 0.5) * bw, PAD.top + c.ph + 4);
+      }
+    }
+    hover(c, function (x) {
+      var i = Math.floor(x / bw);
+      if (i < 0 || i >= n) return null;
+      return labels[i] + ': ' + fmt(values[i]) + (opts.suffix || '');
+    });
+  }
+
+  // Line through (xs, ys) points; null ys leave gaps
+  function line(el, xs, ys, opts) {
+    opts = opts || {};
+    var c = setup(el, opts.height || 240);
+    var xr = extent(xs), yr = extent(ys);
+    axes(c, xr[0], xr[1], yr[0], yr[1], opts.xLabel, opts.yLabel);
+    function px(x) { return PAD.left + (x - xr[0]) / (xr[1] - xr[0]) * c.pw; }
+    function py(y) { return PAD.top + c.ph - (y - yr[0]) / (yr[1] - yr[0]) * c.ph; }
+    var ctx = c.ctx;
+    ctx.strokeStyle = opts.color || '#e15759';
+    ctx.lineWidth = 1.5;
+    ctx.beginPath();
+    var pen = false;
+    for (var i = 0; i < xs.length; i++) {
+      if (ys[i] === null) { pen = false; continue; }
+      if (pen) ctx.lineTo(px(xs[i]), py(ys[i])); else ctx.moveTo(px(xs[i]), py(ys[i]));
+      pen = true;
+    }
+    ctx.stroke();
+    hover(c, function (x) {
+      var best = -1, dist = Infinity;
+      for (var i = 0; i < xs.length; i++) {
+        var d = Math.abs(px(xs[i]) - PAD.left - x);
+        if (d < dist) { dist = d; best = i; }
+      }
+      return best < 0 ? null : fmt(xs[best]) + ': ' + fmt(ys[best]);
+    });
+  }
+
+  function colour(t) {
+    // Blue (low) to white to red (high)
+    t = Math.max(0, Math.min(1, t));
+    var r, g, b;
+    if (t < 0.5) { r = g = Math.round(255 * t * 2); b = 255; }
+    else { r = 255; g = b = Math.round(255 * (1 - t) * 2); }
+    return 'rgb(' + r + ',' + g + ',' + b + ')';
+  }
+
+  // Matrix heatmap: rows are scenario buckets, columns are hours
+  function heatmap(el, values, opts) {
+    opts = opts || {};
+    var c = setup(el, opts.height || 260);
+    var rows = values.length, cols = rows ? values[0].length : 0;
+    var flat = [].concat.apply([], values);
+    var r = extent(flat);
+    axes(c, null, null, 0, rows, opts.xLabel || 'hour', opts.yLabel || 'scenarios');
+    var cw = c.pw / Math.max(cols, 1), ch = c.ph / Math.max(rows, 1);
+    for (var i = 0; i < rows; i++) {
+      for (var j = 0; j < cols; j++) {
+        var v = values[i][j];
+        c.ctx.fillStyle = v === null ? '#ddd' : colour((v - r[0]) / (r[1] - r[0]));
+        c.ctx.fillRect(PAD.left + j * cw, PAD.top + i * ch, Math.ceil(cw), Math.ceil(ch));
+      }
+    }
+    c.ctx.fillStyle = '#333';
+    c.ctx.textAlign = 'center';
+    c.ctx.textBaseline = 'top';
+    for (var k = 0; k < cols; k += Math.max(1, Math.ceil(cols / 12))) {
+      c.ctx.fillText(String(k), PAD.left + (k + 0.5) * cw, PAD.top + c.ph + 4);
+    }
+    hover(c, function (x, y) {
+      var i = Math.floor(y / ch), j = Math.floor(x / cw);
+      if (i < 0 || i >= rows || j < 0 || j >= cols) return null;
+      var label = opts.rowLabels ? opts.rowLabels[i] : 'row ' + i;
+      return label + ', hour ' + j + ': ' + fmt(values[i][j]);
+    });
+  }
+
+  global.SGPCharts = {histogram: histogram, bars: bars, line: line, heatmap: heatmap};
+})(window);
@@ -0,0 +1,108 @@
+"""
+Scenario transport benchmark for Chat-SGP
+
+Measures the serialization overhead of sending scenario profiles to worker
+processes and dispatch results back, comparing per-scenario pickling (what a
+plain process pool does) with the shared-memory ScenarioBlock transport. No
+models are solved, so only transport cost is measured.
+
+Run with: python -m evaluation.transport_benchmark --scenarios 1000 10000 100000
+"""
+
+import argparse
+import json
+import pickle
+import time
+from typing import Dict, List, Any
+
+import numpy as np
+
+from chatsgp.optimization.shared_memory import ScenarioBlock, FLOWS
+
+PARAMS = {'price_import': 0.25, 'price_export': 0.10, 'battery_capacity_kwh': 5.0,
+          'battery_eff': 0.95, 'battery_pmax': 2.0, 'init_soc': 0.5}
+
+
+def _pickle_roundtrip(pv: np.ndarray, load: np.ndarray, flows: np.ndarray) -> Dict[str, float]:
+    """Per-scenario pickling of input data dicts and result dicts (both directions)"""
+    H = pv.shape[1]
+    nbytes = 0
+    start = time.perf_counter()
+    for i in range(pv.shape[0]):
+        data = {'H': H, 'PV': pv[i], 'Load': load[i], 'Pimp': None, 'Pexp': None, **PARAMS}
+        payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        nbytes += len(payload)
+        pickle.loads(payload)
+        res = {'status': 'optimal', 'objective': 1.0}
+        res.update({name: flows[i, j].tolist() for j, name in enumerate(FLOWS)})
+        payload = pickle.dumps(res, protocol=pickle.HIGHEST_PROTOCOL)
+        nbytes += len(payload)
+        out = pickle.loads(payload)
+        np.array([out[name] for name in FLOWS])
+    return {'seconds': time.perf_counter() - start, 'bytes_pickled': nbytes}
+
+
+def _shared_roundtrip(pv: np.ndarray, load: np.ndarray, flows: np.ndarray, chunk_size: int) -> Dict[str, float]:
+    """Shared-memory block: copy in once, pickle only chunk handles, write results in place, copy out once"""
+    S = pv.shape[0]
+    nbytes = 0
+    start = time.perf_counter()
+    with ScenarioBlock.create(pv, load) as block:
+        for lo in range(0, S, chunk_size):
+            hi = min(lo + chunk_size, S)
+            payload = pickle.dumps(('block', block.handle, lo, hi, PARAMS, 'pulp'), protocol=pickle.HIGHEST_PROTOCOL)
+            nbytes += len(payload)
+            _, handle, lo, hi, params, _ = pickle.loads(payload)
+            worker = ScenarioBlock.attach(handle)
+            for i in range(lo, hi):
+                worker.pv[i].copy(); worker.load[i].copy()
+                worker.flows[i] = flows[i]
+                worker.objective[i] = 1.0
+            worker.close()
+            nbytes += len(pickle.dumps(('result', hi - lo)))
+        block.to_results()
+    return {'seconds': time.perf_counter() - start, 'bytes_pickled': nbytes}
+
+
+def benchmark_transport(scenario_counts: List[int], hours: int = 24, chunk_size: int = 64,
+                        seed: int = 1337) -> List[Dict[str, Any]]:
+    """
+    Compare pickling and shared-memory transport for several scenario counts
+
+    Args:
+        scenario_counts: Numbers of scenarios S to test
+        hours: Horizon H
+        chunk_size: Scenarios per worker job for the shared-memory path
+        seed: Random seed for synthetic profiles
+
+    Returns:
+        One dictionary per scenario count with timings, bytes and speedup
+    """
+    rng = np.random.default_rng(seed)
+    report = []
+    for S in scenario_counts:
+        pv = rng.random((S, hours)) * 2.0
+        load = rng.random((S, hours)) + 1.5
+        flows = rng.random((S, len(FLOWS), hours))
+        pickled = _pickle_roundtrip(pv, load, flows)
+        shared = _shared_roundtrip(pv, load, flows, chunk_size)
+        report.append({
+            'scenarios': S,
+            'hours': hours,
+            'pickle_s': pickled['seconds'],
+            'shared_memory_s': shared['seconds'],
+            'pickle_bytes': pickled['bytes_pickled'],
+            'shared_memory_bytes': shared['bytes_pickled'],
+            'speedup': pickled['seconds'] / shared['seconds'] if shared['seconds'] > 0 else float('inf'),
+        })
+    return report
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Benchmark scenario transport overhead')
+    ap.add_argument('--scenarios', type=int, nargs='+', default=[1000, 10000, 100000], help='Scenario counts')
+    ap.add_argument('--hours', type=int, default=24, help='Horizon length')
+    ap.add_argument('--chunk-size', type=int, default=64, help='Scenarios per worker job')
+    args = ap.parse_args()
+
+    print(json.dumps(benchmark_transport(args.scenarios, args.hours, args.chunk_size), indent=2))
@@ -3,6 +3,7 @@ from chatsgp.agents.coder_agent import CoderAgent
 from chatsgp.agents.optimizer_agent import OptimizerAgent
 from chatsgp.agents.interpreter_agent import InterpreterAgent
 from chatsgp.agents.autogen_orchestrator import AutoGenOrchestrator
+from chatsgp.agents.orchestrator import Orchestrator
 from chatsgp.utils.llm_backend import LLM
 
 def load_icl(path='chatsgp/icl/examples.jsonl'):
@@ -13,18 +14,33 @@ def load_icl(path='chatsgp/icl/examples.jsonl'):
             ex.append(json.loads(line))
     return ex
 
+def compare_timings(autogen_out, plain_out):
+    """Per-stage milliseconds of the AutoGen and plain orchestrators side by side"""
+    stages=sorted(set(autogen_out['timings_ms']) | set(plain_out['timings_ms']))
+    return {s: {'autogen': autogen_out['timings_ms'].get(s), 'orchestrator': plain_out['timings_ms'].get(s)} for s in stages}
+
 if __name__=='__main__':
-    import os
     ap=argparse.ArgumentParser()
     ap.add_argument('--question', required=True)
     ap.add_argument('--solver', default='pulp')
+    ap.add_argument('--llm-tools', action='store_true', help='Let the AutoGen assistants call the tools through LLM chats instead of calling the fixed tool chain directly')
+    ap.add_argument('--compare', action='store_true', help='Also run the plain Orchestrator and print per-stage timings of both')
     ap.add_argument('--debug', action='store_true', help='Enable debug output showing prompts and responses')
     args=ap.parse_args()
-    
-    # Set debug environment variable
+
+    # Enable debug logging
     if args.debug:
-        os.environ['DEBUG'] = 'true'
-    
-    orch=AutoGenOrchestrator(CoderAgent(load_icl(), llm=LLM()), OptimizerAgent(), InterpreterAgent(), llm=LLM())
+        from chatsgp.utils.debug import configure_debug
+        configure_debug(enabled=True)
+
+    llm=LLM()
+    coder, optimizer, interpreter = CoderAgent(load_icl(), llm=llm), OptimizerAgent(), InterpreterAgent()
+    if args.compare:
+        optimizer.baseline_objective()  # warm the shared baseline cache so neither run pays for it
+    orch=AutoGenOrchestrator(coder, optimizer, interpreter, llm=llm, short_circuit=not args.llm_tools, trace=args.compare)
     out=orch.run_question(args.question, solver=args.solver)
+    if args.compare:
+        plain=Orchestrator(coder, optimizer, interpreter, trace=True).run_question(args.question, solver=args.solver)
+        out.pop('trace')
+        out['timings_ms']=compare_timings(out, plain)
     print(json.dumps(out, indent=2, ensure_ascii=False))
@@ -0,0 +1,108 @@
+"""
+Load test for the Chat-SGP pipeline server
+
+Fires concurrent requests at a running server and reports latency percentiles.
+Run with: python scripts/load_test.py --url http://127.0.0.1:8000 --requests 200 --concurrency 16
+"""
+
+import argparse
+import json
+import random
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+QUESTIONS = [
+    'What happens if imports increase by {pct}%?',
+    'Increase PV generation by {pct}%. How does the objective change?',
+    'What if we shift {pct}% of load from hour 13 to hour 14?',
+    'Reduce exports by {pct}%. What is the new cost?',
+]
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q / 100.0 * len(values)))]
+
+
+def send(url, endpoint, payload, timeout):
+    """POST one request; returns (latency_s, http_status)"""
+    data = json.dumps(payload).encode('utf-8')
+    req = urllib.request.Request(url + endpoint, data=data, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except Exception:
+        status = 0
+    return time.perf_counter() - start, status
+
+
+def run_load_test(url, n_requests=200, concurrency=16, endpoint='/run_question', distinct=20, timeout=60.0, seed=1337):
+    """
+    Run a load test and return a latency/throughput report
+    
+    Args:
+        url: Server base URL
+        n_requests: Total requests to send
+        concurrency: Number of concurrent clients
+        endpoint: '/run_question' or '/sweep'
+        distinct: Number of distinct questions (lower values exercise the cache)
+        timeout: Per-request timeout in seconds
+        seed: Random seed for question selection
+    
+    Returns:
+        Dictionary with counts, throughput and p50/p90/p99 latency in ms
+    """
+    rng = random.Random(seed)
+    pool = [rng.choice(QUESTIONS).format(pct=rng.choice([5, 10, 15, 20, 25])) for _ in range(distinct)]
+    if endpoint == '/sweep':
+        payloads = [{'target': 'PV', 'values': [rng.choice([-20, -10, 0, 10, 20])]} for _ in range(n_requests)]
+    else:
+        payloads = [{'question': rng.choice(pool)} for _ in range(n_requests)]
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        outcomes = list(ex.map(lambda p: send(url, endpoint, p, timeout), payloads))
+    elapsed = time.perf_counter() - start
+    
+    ok = sorted(lat for lat, status in outcomes if status == 200)
+    return {
+        'requests': n_requests,
+        'concurrency': concurrency,
+        'ok': len(ok),
+        'rejected_503': sum(1 for _, status in outcomes if status == 503),
+        'errors': sum(1 for _, status in outcomes if status not in (200, 503)),
+        'elapsed_s': elapsed,
+        'throughput_rps': len(ok) / elapsed if elapsed > 0 else 0.0,
+        'latency_ms': {
+            'p50': percentile(ok, 50) * 1000,
+            'p90': percentile(ok, 90) * 1000,
+            'p99': percentile(ok, 99) * 1000,
+            'max': (ok[-1] if ok else 0.0) * 1000,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the Chat-SGP pipeline server')
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='Server base URL')
+    parser.add_argument('--requests', type=int, default=200, help='Total requests (default: 200)')
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent clients (default: 16)')
+    parser.add_argument('--endpoint', default='/run_question', choices=['/run_question', '/sweep'])
+    parser.add_argument('--distinct', type=int, default=20, help='Distinct questions (default: 20)')
+    parser.add_argument('--timeout', type=float, default=60.0, help='Per-request timeout in seconds')
+    args = parser.parse_args()
+    
+    report = run_load_test(args.url, args.requests, args.concurrency, args.endpoint, args.distinct, args.timeout)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
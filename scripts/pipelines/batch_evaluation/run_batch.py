@@ -1,13 +1,17 @@
 """
 Batch evaluation script
 
-Runs the pipeline on multiple questions from a file.
+Runs the pipeline on multiple questions from a file, streaming questions in and
+results out one at a time. Input and output may be .gz or .zst compressed.
 Run with: python scripts/pipelines/batch_evaluation/run_batch.py --input questions.jsonl --output results.jsonl
+Add --resume to continue an interrupted run, skipping questions already in the output.
 """
 
 import argparse
 import json
 import sys
+import time
+from contextlib import nullcontext
 from pathlib import Path
 
 # Add project root to path
@@ -18,8 +22,11 @@ from chatsgp.agents.coder_agent import CoderAgent
 from chatsgp.agents.optimizer_agent import OptimizerAgent
 from chatsgp.agents.interpreter_agent import InterpreterAgent
 from chatsgp.agents.orchestrator import Orchestrator
-from chatsgp.utils.llm_backend import LLM
+from chatsgp.utils.llm_backend import create_llm
+from chatsgp.utils.jsonl import JsonlWriter, iter_jsonl, completed_counts, skip_completed
 from chatsgp.config import get_config
+from chatsgp.utils.debug import configure_debug
+from evaluation.results_store import ColumnarWriter, jsonl_to_columnar
 
 
 def load_icl(path='chatsgp/icl/examples.jsonl'):
@@ -38,61 +45,95 @@ def main():
     parser.add_argument('--input', required=True, help='Input JSONL file with questions')
     parser.add_argument('--output', required=True, help='Output JSONL file for results')
     parser.add_argument('--config', help='Configuration file path')
-    parser.add_argument('--solver', default='pulp', choices=['pulp', 'gurobi'], help='Solver to use')
+    parser.add_argument('--solver', default='pulp', choices=['pulp', 'highs', 'gurobi'], help='Solver to use')
+    parser.add_argument('--speculative', action='store_true',
+                        help='Solve the rule-based parse while waiting for the LLM parse')
+    parser.add_argument('--resume', action='store_true',
+                        help='Append to an existing output, skipping questions already answered')
+    parser.add_argument('--flush-every', type=int, default=1, help='Flush the output every N results')
+    parser.add_argument('--columnar',
+                        help='Also write flat result columns to this .parquet/.arrow file (needs pyarrow); '
+                             'rebuilt from --output when resuming')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='Record per-stage timings and append OpenTelemetry (OTLP/JSON) traces to FILE')
     parser.add_argument('--debug', action='store_true', help='Enable debug output')
+    parser.add_argument('--debug-file', metavar='FILE',
+                        help='Write debug events as JSON lines to FILE instead of stdout (implies --debug)')
+    parser.add_argument('--debug-sample', type=float, default=1.0,
+                        help='Fraction of debug events to log (default: 1.0)')
     args = parser.parse_args()
     
+    if args.debug or args.debug_file:
+        configure_debug(enabled=True, file=args.debug_file, sample_rate=args.debug_sample)
+    
     # Load configuration
     config = get_config(args.config) if args.config else get_config()
     
     # Initialize agents
     icl_examples = load_icl()
-    llm = LLM()
+    llm = create_llm(config.get_llm_config())
     coder = CoderAgent(icl_examples, llm=llm)
     optimizer = OptimizerAgent(config=config)
-    interpreter = InterpreterAgent()
-    orchestrator = Orchestrator(coder, optimizer, interpreter)
-    
-    # Load questions
-    questions = []
-    with open(args.input, 'r', encoding='utf-8') as f:
-        for line in f:
-            if line.strip():
-                questions.append(json.loads(line))
-    
-    print(f"Processing {len(questions)} questions...")
+    interpreter = InterpreterAgent(llm=llm, profile_token_budget=config.get('llm.profile_token_budget', 200))
+    orchestrator = Orchestrator(coder, optimizer, interpreter, speculative=args.speculative,
+                                trace=bool(args.trace))
     
-    # Process questions
-    results = []
-    for i, item in enumerate(questions, 1):
-        question = item.get('question', '')
-        print(f"\n[{i}/{len(questions)}] Processing: {question}")
-        
-        try:
-            result = orchestrator.run_question(question, solver=args.solver)
-            results.append({
-                'question': question,
-                'result': result,
-                'status': 'success'
-            })
-            print(f"  ✓ Success - Cost: EUR {result['result']['objective']:.2f}")
-        except Exception as e:
-            print(f"  ✗ Error: {e}")
-            results.append({
-                'question': question,
-                'error': str(e),
-                'status': 'error'
-            })
+    # Stream questions, skipping those already answered when resuming
+    done = completed_counts(args.output) if args.resume else None
+    questions = iter_jsonl(args.input)
+    if done:
+        print(f"Resuming: {sum(done.values())} results already in {args.output}")
+        questions = skip_completed(questions, done)
     
-    # Save results
-    with open(args.output, 'w', encoding='utf-8') as f:
-        for result in results:
-            f.write(json.dumps(result) + '\n')
+    # Process questions, writing each result as soon as it is ready
+    success_count = 0
+    # Both writers are closed on errors too, so the output stays readable for --resume.
+    # When resuming, the columnar file is rebuilt from the full JSONL output instead
+    # (writing it row by row would drop the rows of earlier runs)
+    rebuild_columnar = bool(args.columnar and args.resume)
+    stream_columnar = args.columnar and not rebuild_columnar
+    try:
+        with JsonlWriter(args.output, resume=args.resume, flush_every=args.flush_every) as writer, \
+                (ColumnarWriter(args.columnar) if stream_columnar else nullcontext()) as columnar:
+            for i, item in enumerate(questions, 1):
+                question = item.get('question', '')
+                print(f"\n[{i}] Processing: {question}")
+            
+                start = time.perf_counter()
+                try:
+                    result = orchestrator.run_question(question, solver=args.solver)
+                    trace = result.pop('trace', None)
+                    if trace is not None:
+                        with open(args.trace, 'a', encoding='utf-8') as f:
+                            f.write(json.dumps(trace) + '\n')
+                    record = {
+                        'question': question,
+                        'result': result,
+                        'status': 'success'
+                    }
+                    success_count += 1
+                    print(f"  ✓ Success - Cost: EUR {result['result']['objective']:.2f}")
+                except Exception as e:
+                    print(f"  ✗ Error: {e}")
+                    record = {
+                        'question': question,
+                        'error': str(e),
+                        'status': 'error'
+                    }
+                record['elapsed_s'] = time.perf_counter() - start
+                if 'category' in item:
+                    record['category'] = item['category']
+                writer.write(record)
+                if columnar is not None:
+                    columnar.write(record)
+            processed = writer.count
+    finally:
+        if rebuild_columnar:
+            jsonl_to_columnar(args.output, args.columnar)
     
     # Summary
-    success_count = sum(1 for r in results if r['status'] == 'success')
     print(f"\n{'='*60}")
-    print(f"Summary: {success_count}/{len(results)} successful")
+    print(f"Summary: {success_count}/{processed} successful")
     print(f"Results saved to: {args.output}")
 
 
@@ -1,61 +1,71 @@
 """
 Dataset generation script
 
-Generates test questions for evaluation across different categories.
+Generates test questions for evaluation across different categories, each with
+its gold operations and (unless --no-objectives) the gold objective obtained by
+solving those operations. The templates live in evaluation.question_generator,
+which also generates sharded load-test datasets of millions of questions.
 Run with: python scripts/pipelines/dataset_generation/build_dataset.py --out questions.jsonl --n 60
 """
 
-import argparse, json, random
-
-TEMPLATES = {
-    'QPimpPexp': [
-        'What happens if imports increase by {pct}%?',
-        'Reduce exports by {pct}%. What is the new cost?',
-        'If exports rise by {pct}%, how does the profit change?',
-        'Assume imports decrease by {pct}%. Compute the objective.'
-    ],
-    'QPconsPprod': [
-        'Increase PV generation by {pct}%. How does the objective change?',
-        'Increase consumption by {pct}%. What is the outcome?',
-        'Decrease load by {pct}% during the day. Evaluate the impact.'
-    ],
-    'QPshift': [
-        'What if we shift {pct}% of the load from {h1} to {h2}?',
-        'Shift {pct}% from hour {h1} to {h2} and report the cost.'
-    ]
-}
+import argparse, json, random, sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from evaluation.question_generator import TEMPLATES, SCALE_GOLD, sample_with_gold
 
 def sample(cat):
     """Sample a question from a category"""
-    if cat == 'QPimpPexp':
-        return random.choice(TEMPLATES[cat]).format(
-            pct=random.choice([5, 10, 15, 20, -5, -10, -15, -20])
-        )
-    if cat == 'QPconsPprod':
-        return random.choice(TEMPLATES[cat]).format(
-            pct=random.choice([5, 10, 20, 25, -10, -20])
-        )
-    if cat == 'QPshift':
-        pct = random.choice([25, 33, 50, 67, 75])
-        h1 = random.choice([7, 8, 9, 10, 12, 13, 17, 18, 20])
-        h2 = random.choice([6, 11, 14, 15, 16, 19, 21, 22, 23])
-        if h1 == h2:
-            h2 = (h2 + 1) % 24
-        return random.choice(TEMPLATES[cat]).format(pct=pct, h1=h1, h2=h2)
+    return sample_with_gold(cat)[0]
+
+def gold_objectives(ops_lists, solver='pulp', solver_workers=0):
+    """
+    Solve each distinct gold operation list once and return one objective per entry
+    
+    Solves go through OptimizerAgent.run_many (shared-memory batch), in a
+    SolverPool when solver_workers > 0.
+    """
+    from chatsgp.agents.optimizer_agent import OptimizerAgent
+    from chatsgp.optimization.solver_pool import SolverPool
+    keys = [json.dumps(ops, sort_keys=True) for ops in ops_lists]
+    unique = list(dict.fromkeys(keys))
+    pool = SolverPool(workers=solver_workers) if solver_workers > 0 else None
+    try:
+        res = OptimizerAgent(solver_pool=pool).run_many([{'ops': json.loads(k)} for k in unique], solver=solver)
+    finally:
+        if pool is not None:
+            pool.close()
+    by_key = {k: (float(obj) if status == 'optimal' else None)
+              for k, obj, status in zip(unique, res['objective'], res['status'])}
+    return [by_key[k] for k in keys]
 
 if __name__ == '__main__':
     ap = argparse.ArgumentParser(description='Generate test questions for evaluation')
     ap.add_argument('--out', required=True, help='Output file path')
     ap.add_argument('--n', type=int, default=60, help='Number of questions to generate')
+    ap.add_argument('--no-objectives', action='store_true', help='Skip solving for gold objectives')
+    ap.add_argument('--solver', default='pulp', choices=['pulp', 'highs', 'gurobi'], help='Solver for gold objectives')
+    ap.add_argument('--solver-workers', type=int, default=0, help='Solve gold objectives in a pool of N processes')
     args = ap.parse_args()
     
     random.seed(1337)
     cats = list(TEMPLATES.keys())
     
+    items = []
+    for _ in range(args.n):
+        cat = random.choice(cats)
+        question, ops = sample_with_gold(cat)
+        items.append({'question': question, 'category': cat, 'ops': ops})
+    if not args.no_objectives:
+        for item, objective in zip(items, gold_objectives([it['ops'] for it in items], args.solver, args.solver_workers)):
+            item['objective'] = objective
+    
     with open(args.out, 'w', encoding='utf-8') as f:
-        for _ in range(args.n):
-            q = sample(random.choice(cats))
-            f.write(json.dumps({'question': q}) + '\n')
+        for item in items:
+            f.write(json.dumps(item) + '\n')
     
     print(f'Wrote {args.n} questions to {args.out}')
 
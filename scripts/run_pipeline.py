@@ -5,24 +5,26 @@ Supports:
 - Configuration file loading
 - Multiple output formats (json, yaml, text)
 - Saving results to file
-- Interactive Q&A mode
+- Interactive Q&A mode with follow-up questions on one scenario
 - Visualization
 """
 
 import argparse
 import json
-import os
 import sys
 from pathlib import Path
-import yaml
 
 from chatsgp.agents.coder_agent import CoderAgent
 from chatsgp.agents.optimizer_agent import OptimizerAgent
 from chatsgp.agents.interpreter_agent import InterpreterAgent
 from chatsgp.agents.orchestrator import Orchestrator
-from chatsgp.utils.llm_backend import LLM
+from chatsgp.agents.session import ScenarioSession
+from chatsgp.utils.llm_backend import create_llm
 from chatsgp.config import get_config
-from chatsgp.utils.visualization import plot_energy_flows, plot_cost_comparison
+from chatsgp.utils.debug import configure_debug
+from chatsgp.utils.tracing import start_trace
+
+# yaml and chatsgp.utils.visualization (matplotlib) are imported only when used
 
 
 def load_icl(path='chatsgp/icl/examples.jsonl'):
@@ -40,6 +42,7 @@ def format_output(result, format_type='json'):
     if format_type == 'json':
         return json.dumps(result, indent=2, ensure_ascii=False)
     elif format_type == 'yaml':
+        import yaml
         return yaml.dump(result, default_flow_style=False, allow_unicode=True)
     elif format_type == 'text':
         output = []
@@ -50,11 +53,28 @@ def format_output(result, format_type='json'):
         output.append(f"\nOperations:")
         for op in result.get('ops', {}).get('ops', []):
             output.append(f"  - {op}")
+        if len(result.get('scenario_ops', [])) > len(result.get('ops', {}).get('ops', [])):
+            output.append(f"\nScenario so far:")
+            for op in result['scenario_ops']:
+                output.append(f"  - {op}")
         output.append(f"\nOptimization Result:")
         output.append(f"  Status: {result.get('result', {}).get('status', 'N/A')}")
         output.append(f"  Objective: EUR {result.get('result', {}).get('objective', 0):.2f}")
+        if result.get('previous_objective') is not None:
+            output.append(f"  Previous: EUR {result['previous_objective']:.2f}")
+        robustness = result.get('result', {}).get('robustness')
+        if robustness:
+            output.append(f"\nRobustness ({result['result']['scenarios']['samples']} sampled days):")
+            for plan in ('deterministic', 'stochastic'):
+                stats = robustness[plan]
+                output.append(f"  {plan.capitalize()} plan: expected EUR {stats['expected']:.2f}, "
+                              f"95th percentile EUR {stats['p95']:.2f}, worst EUR {stats['worst']:.2f}")
         output.append(f"\nAnswer:")
         output.append(result.get('answer', 'N/A'))
+        if result.get('timings_ms'):
+            output.append(f"\nTimings (ms):")
+            for stage, ms in result['timings_ms'].items():
+                output.append(f"  {stage}: {ms:.1f}")
         output.append("\n" + "=" * 60)
         return "\n".join(output)
     else:
@@ -70,6 +90,7 @@ def save_output(output, output_path, format_type='json'):
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(output, f, indent=2, ensure_ascii=False)
     elif format_type == 'yaml':
+        import yaml
         with open(output_file, 'w', encoding='utf-8') as f:
             yaml.dump(output, f, default_flow_style=False, allow_unicode=True)
     else:
@@ -79,12 +100,60 @@ def save_output(output, output_path, format_type='json'):
     print(f"Results saved to {output_file}")
 
 
-def interactive_mode(orchestrator, solver='pulp', format_type='text'):
-    """Interactive Q&A mode"""
+def stream_output(orchestrator, question, solver='pulp'):
+    """Print solver results immediately, then stream the answer as it is generated"""
+    result = orchestrator.stream_question(question, solver=solver)
+    print("=" * 60)
+    print("Chat-SGP Results")
+    print("=" * 60)
+    print(f"\nQuestion: {question}")
+    print(f"\nOperations:")
+    for op in result.get('ops', {}).get('ops', []):
+        print(f"  - {op}")
+    print(f"\nOptimization Result:")
+    print(f"  Status: {result['result'].get('status', 'N/A')}")
+    print(f"  Objective: EUR {result['result'].get('objective', 0):.2f}")
+    print(f"\nAnswer:")
+    for chunk in result['answer_stream']:
+        print(chunk, end='', flush=True)
+    print("\n\n" + "=" * 60)
+
+
+def write_trace(result, trace_path):
+    """Move a result's OTLP/JSON trace into a JSON-lines trace file"""
+    trace = result.pop('trace', None)
+    if trace_path and trace is not None:
+        with open(trace_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(trace) + '\n')
+
+
+def ask_session(session, question, trace_path=None):
+    """Answer a follow-up in a ScenarioSession, timing it when tracing"""
+    if not trace_path:
+        return session.ask(question)
+    with start_trace('session_turn', solver=session.solver) as tracer:
+        result = session.ask(question)
+    result['timings_ms'] = tracer.timings_ms()
+    result['trace'] = tracer.to_otel()
+    return result
+
+
+def interactive_mode(orchestrator, solver='pulp', format_type='text', stream=True, trace_path=None,
+                     independent=False):
+    """
+    Interactive Q&A mode
+    
+    Questions build on each other in a ScenarioSession ('reset' and 'undo'
+    manage it); with independent=True each question starts from the
+    unmodified scenario and text answers are streamed.
+    """
+    session = None if independent else ScenarioSession(orchestrator, solver=solver)
     print("=" * 60)
     print("Chat-SGP Interactive Mode")
     print("=" * 60)
     print("\nEnter questions about energy scenarios.")
+    if session is not None:
+        print("Each question builds on the previous ones; type 'undo' to revert one, 'reset' to start over.")
     print("Type 'quit' or 'exit' to exit, 'help' for examples.\n")
     
     while True:
@@ -101,15 +170,39 @@ def interactive_mode(orchestrator, solver='pulp', format_type='text'):
                 print("  - What happens if imports increase by 10%?")
                 print("  - What if we shift 25% of load from hour 13 to hour 14?")
                 print("  - What happens if exports decrease by 15%?")
+                if session is not None:
+                    print("  - Now also raise PV by 10%")
                 print()
                 continue
             
             if not question:
                 continue
             
+            if session is not None and question.lower() in ['reset', 'undo']:
+                if question.lower() == 'reset':
+                    session.reset()
+                    print("\nScenario reset.\n")
+                else:
+                    print("\nReverted the last question.\n" if session.undo() else "\nNothing to undo.\n")
+                continue
+            
             print("\nProcessing...")
+            if session is not None:
+                result = ask_session(session, question, trace_path)
+                result['question'] = question
+                write_trace(result, trace_path)
+                print(format_output(result, format_type))
+                print()
+                continue
+            
+            if stream and format_type == 'text' and not trace_path:
+                stream_output(orchestrator, question, solver=solver)
+                print()
+                continue
+            
             result = orchestrator.run_question(question, solver=solver)
             result['question'] = question  # Add question to result
+            write_trace(result, trace_path)
             
             output = format_output(result, format_type)
             print(output)
@@ -143,6 +236,9 @@ Examples:
   # Interactive mode
   python scripts/run_pipeline.py --interactive
   
+  # Robustness to uncertain PV and load (two-stage stochastic optimization)
+  python scripts/run_pipeline.py --question "How robust is this plan to cloudy days?" --format text
+  
   # With visualization
   python scripts/run_pipeline.py --question "What happens if PV increases by 20%?" --plot
         """
@@ -150,7 +246,7 @@ Examples:
     
     parser.add_argument('--question', '-q', 
                        help='Question about energy scenario (required unless --interactive)')
-    parser.add_argument('--solver', '-s', default='pulp', choices=['pulp', 'gurobi'],
+    parser.add_argument('--solver', '-s', default='pulp', choices=['pulp', 'highs', 'gurobi'],
                        help='Optimization solver to use (default: pulp)')
     parser.add_argument('--config', '-c',
                        help='Path to configuration file (YAML or JSON)')
@@ -160,10 +256,24 @@ Examples:
                        help='Output format (default: json)')
     parser.add_argument('--interactive', '-i', action='store_true',
                        help='Start interactive Q&A mode')
+    parser.add_argument('--independent', action='store_true',
+                       help='In interactive mode, answer each question from the unmodified scenario')
     parser.add_argument('--plot', '-p', action='store_true',
                        help='Generate and display visualization plots')
+    parser.add_argument('--speculative', action='store_true',
+                       help='Solve the rule-based parse while waiting for the LLM parse')
+    parser.add_argument('--deterministic', action='store_true',
+                       help='Answer robustness questions with the forecast only (no stochastic optimization)')
+    parser.add_argument('--no-stream', action='store_true',
+                       help='Wait for the full answer instead of streaming it (text format only)')
+    parser.add_argument('--trace', metavar='FILE',
+                       help='Time each pipeline stage and append OpenTelemetry (OTLP/JSON) traces to FILE')
     parser.add_argument('--debug', action='store_true',
                        help='Enable debug output showing prompts and responses')
+    parser.add_argument('--debug-file', metavar='FILE',
+                       help='Write debug events as JSON lines to FILE instead of stdout (implies --debug)')
+    parser.add_argument('--debug-sample', type=float, default=1.0,
+                       help='Fraction of debug events to log (default: 1.0)')
     
     args = parser.parse_args()
     
@@ -171,34 +281,42 @@ Examples:
     if not args.interactive and not args.question:
         parser.error("--question is required unless --interactive is used")
     
-    # Set debug environment variable
-    if args.debug:
-        os.environ['DEBUG'] = 'true'
+    # Configure debug logging
+    if args.debug or args.debug_file:
+        configure_debug(enabled=True, file=args.debug_file, sample_rate=args.debug_sample)
     
     # Load configuration if provided
     config = get_config(args.config) if args.config else get_config()
     
     # Initialize agents
     icl_examples = load_icl()
-    llm = LLM()
+    llm = create_llm(config.get_llm_config())
     coder = CoderAgent(icl_examples, llm=llm)
     optimizer = OptimizerAgent(config=config)
-    interpreter = InterpreterAgent()
-    orchestrator = Orchestrator(coder, optimizer, interpreter)
+    interpreter = InterpreterAgent(llm=llm, profile_token_budget=config.get('llm.profile_token_budget', 200))
+    orchestrator = Orchestrator(coder, optimizer, interpreter, speculative=args.speculative,
+                                trace=bool(args.trace), stochastic=not args.deterministic)
     
     # Interactive mode
     if args.interactive:
-        interactive_mode(orchestrator, solver=args.solver, format_type=args.format)
+        interactive_mode(orchestrator, solver=args.solver, format_type=args.format,
+                         stream=not args.no_stream, trace_path=args.trace, independent=args.independent)
         sys.exit(0)
     
     # Single question mode
     try:
+        if args.format == 'text' and not (args.output or args.plot or args.no_stream or args.trace):
+            stream_output(orchestrator, args.question, solver=args.solver)
+            sys.exit(0)
+        
         result = orchestrator.run_question(args.question, solver=args.solver)
         result['question'] = args.question  # Add question to result
+        write_trace(result, args.trace)
         
         # Generate plots if requested
         if args.plot:
             try:
+                from chatsgp.utils.visualization import plot_energy_flows, plot_cost_comparison
                 ops = result['ops']
                 data, res = optimizer.run(ops, solver=args.solver)
                 
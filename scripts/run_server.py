@@ -0,0 +1,74 @@
+"""
+Chat-SGP pipeline server
+
+Starts a long-running HTTP/JSON server with warm agents.
+Run with: python scripts/run_server.py --port 8000 --workers 4
+
+Example request:
+  curl -X POST localhost:8000/run_question -d '{"question": "What happens if PV increases by 20%?"}'
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from chatsgp.config import get_config
+from chatsgp.utils.debug import configure_debug
+from chatsgp.server import PipelineService, make_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the Chat-SGP pipeline server')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on (default: 8000)')
+    parser.add_argument('--config', '-c', help='Path to configuration file (YAML or JSON)')
+    parser.add_argument('--workers', type=int, default=4, help='Pipeline worker threads (default: 4)')
+    parser.add_argument('--max-pending', type=int, default=64,
+                        help='Queued plus running jobs before requests are rejected with 503 (default: 64)')
+    parser.add_argument('--cache-size', type=int, default=1024, help='Question result cache entries (0 disables)')
+    parser.add_argument('--solver-workers', type=int, default=0,
+                        help='Solve models in this many persistent solver processes (default: 0, in-thread)')
+    parser.add_argument('--speculative', action='store_true',
+                        help='Solve the rule-based parse while waiting for the LLM parse')
+    parser.add_argument('--site', action='append', default=[], metavar='NAME=CONFIG',
+                        help='Register a site configuration selectable per request with "site" (repeatable)')
+    parser.add_argument('--watch-config', type=float, metavar='SECONDS',
+                        help='Reload the config file when it changes, checking at most every SECONDS')
+    parser.add_argument('--debug', action='store_true', help='Enable debug output')
+    parser.add_argument('--debug-file', metavar='FILE',
+                        help='Write debug events as JSON lines to FILE instead of stdout (implies --debug)')
+    parser.add_argument('--debug-sample', type=float, default=1.0,
+                        help='Fraction of debug events to log (default: 1.0)')
+    args = parser.parse_args()
+    
+    if args.debug or args.debug_file:
+        configure_debug(enabled=True, file=args.debug_file, sample_rate=args.debug_sample)
+    
+    config = get_config(args.config) if args.config else get_config()
+    sites = {}
+    for spec in args.site:
+        name, sep, path = spec.partition('=')
+        if not sep or not name or not path:
+            parser.error(f"--site expects NAME=CONFIG, got {spec!r}")
+        sites[name] = path
+    service = PipelineService(config=config, workers=args.workers, max_pending=args.max_pending,
+                              cache_size=args.cache_size, speculative=args.speculative,
+                              solver_workers=args.solver_workers, config_check_interval=args.watch_config,
+                              sites=sites)
+    server = make_server(service, args.host, args.port)
+    print(f"Chat-SGP server listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,7 @@ setup(
     version="0.1.0",
     description="Chat-based Stochastic Generation Planning - A multi-agent system for renewable energy optimization",
     packages=find_packages(),
+    package_data={"evaluation": ["static/*.js"]},
     install_requires=[
         "openai>=1.21.0",
         "pulp>=2.8.0",
@@ -0,0 +1,82 @@
+"""Tests for headless batch rendering"""
+import numpy as np
+import pytest
+
+pytest.importorskip('matplotlib')
+
+from chatsgp.agents.optimizer_agent import OptimizerAgent
+from chatsgp.utils import batch_render
+from chatsgp.utils.batch_render import render_many, scenarios_from_results
+from evaluation.render_scenarios import render_records
+
+
+def _scenarios(n, hours=24):
+    rng = np.random.default_rng(0)
+    return [{
+        'name': f's{i}', 'title': f'scenario {i}',
+        'PV': rng.random(hours) * 3, 'Load': rng.random(hours) * 2,
+        'battery_charge': rng.random(hours), 'battery_discharge': rng.random(hours),
+        'grid_import': rng.random(hours), 'grid_export': rng.random(hours),
+    } for i in range(n)]
+
+
+class TestRenderMany:
+    """Test suite for render_many"""
+
+    @pytest.mark.parametrize('fmt, magic', [('png', b'\x89PNG'), ('svg', b'<?xml')])
+    def test_formats(self, tmp_path, fmt, magic):
+        """Test that one image per scenario is written, in scenario order"""
+        paths = render_many(_scenarios(3), tmp_path, fmt=fmt)
+        assert [p.rsplit('/', 1)[-1] for p in paths] == [f's0.{fmt}', f's1.{fmt}', f's2.{fmt}']
+        for p in paths:
+            with open(p, 'rb') as f:
+                assert f.read(5).startswith(magic)
+
+    def test_template_reused(self, tmp_path):
+        """Test that the figure is built once per horizon and reused"""
+        render_many(_scenarios(2), tmp_path)
+        template = batch_render._TEMPLATES[(24, (4.0, 2.5), 72)]
+        render_many(_scenarios(2, hours=48), tmp_path / 'long')
+        render_many(_scenarios(3), tmp_path)
+        assert batch_render._TEMPLATES[(24, (4.0, 2.5), 72)] is template
+        assert template.title.get_text() == 'scenario 2'
+        assert (48, (4.0, 2.5), 72) in batch_render._TEMPLATES
+
+    def test_workers_match_in_process(self, tmp_path):
+        """Test that worker processes produce the same files as in-process rendering"""
+        scenarios = _scenarios(5)
+        local = render_many(scenarios, tmp_path / 'local')
+        pooled = render_many(scenarios, tmp_path / 'pooled', workers=2, chunk_size=2)
+        assert len(pooled) == 5
+        for a, b in zip(local, pooled):
+            assert open(a, 'rb').read() == open(b, 'rb').read()
+
+    def test_bad_format(self, tmp_path):
+        """Test that unsupported formats are rejected"""
+        with pytest.raises(ValueError):
+            render_many(_scenarios(1), tmp_path, fmt='gif')
+
+
+class TestScenariosFromResults:
+    """Test suite for rendering run_many output"""
+
+    def test_run_many_results(self, tmp_path):
+        """Test that run_many arrays split into renderable scenarios"""
+        results = OptimizerAgent().run_many([{'ops': []}, {'ops': [{'op': 'scale_series', 'target': 'PV', 'scale_pct': 50}]}])
+        scenarios = list(scenarios_from_results(results, names=['base', 'pv']))
+        assert [s['name'] for s in scenarios] == ['base', 'pv']
+        assert scenarios[1]['PV'].sum() == pytest.approx(1.5 * scenarios[0]['PV'].sum())
+        assert scenarios[0]['title'].startswith('EUR ')
+        assert len(render_many(scenarios, tmp_path)) == 2
+
+    def test_render_records(self, tmp_path):
+        """Test that records are solved and rendered, skipping invalid operations"""
+        records = [
+            {'question': 'q1', 'result': {'ops': {'ops': []}}},
+            {'question': 'q2', 'ops': [{'op': 'scale_series', 'target': 'Load', 'scale_pct': 10}]},
+            {'question': 'q3', 'ops': [{'op': 'shift_load', 'percentage': 10, 'from_hour': 3, 'to_hour': 99}]},
+            {'question': 'q4', 'status': 'error'},
+        ]
+        summary = render_records(records, OptimizerAgent(), tmp_path, fmt='svg')
+        assert summary['rendered'] == 2 and summary['skipped_invalid'] == 1
+        assert [p.rsplit('/', 1)[-1] for p in summary['paths']] == ['scenario_00000.svg', 'scenario_00001.svg']
@@ -100,3 +100,17 @@ class TestCoderAgent:
             if original_key:
                 os.environ['OPENAI_API_KEY'] = original_key
 
+    
+    def test_llm_ops_validated_against_configured_horizon(self):
+        """Test that LLM operations are checked against the agent's config horizon, not the default one"""
+        from chatsgp.config import Config
+        from chatsgp.utils.llm_backend import StubLLM
+        llm = StubLLM(default='[{"op": "shift_load", "percentage": 50, "from_hour": 30, "to_hour": 40}]')
+        icl = [{'question': 'test', 'ops': []}]
+        question = "Shift 50% of the load from hour 30 to hour 40"
+        
+        long_horizon = CoderAgent(icl, llm=llm, config=Config(config_dict={'optimization': {'hours': 48}}))
+        default = CoderAgent(icl, llm=llm)
+        
+        assert long_horizon.propose_modifications(question)['explanation'] == 'llm-with-icl'
+        assert default.propose_modifications(question)['explanation'] == 'rule-based'
@@ -0,0 +1,221 @@
+"""Tests for configuration snapshots and reloading"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+from chatsgp.agents.coder_agent import CoderAgent
+from chatsgp.agents.interpreter_agent import InterpreterAgent
+from chatsgp.utils.llm_backend import StubLLM
+from chatsgp.agents.optimizer_agent import OptimizerAgent
+from chatsgp.agents.orchestrator import Orchestrator
+from chatsgp.config import Config, ConfigRegistry, ConfigSnapshot, get_config, use_config
+
+
+def _write(path, config, mtime=None):
+    path.write_text(json.dumps(config))
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+class TestConfigSnapshot:
+    """Test suite for ConfigSnapshot"""
+
+    def test_typed_fields_and_lookup(self):
+        """Test that the snapshot exposes typed model parameters and dotted lookups"""
+        config = Config(config_dict=Config()._default_config())
+        snap = config.snapshot()
+
+        assert snap.hours == 24
+        assert snap.battery_capacity_kwh == 5.0 and snap.price_import == 0.25
+        assert snap.pv.dtype == np.float64 and len(snap.pv) == 24
+        assert snap.get('battery.efficiency') == 0.95
+        assert snap.get('battery')['max_power'] == 2.0
+        assert snap.get('missing.key', 'x') == 'x'
+        assert config.get('llm.profile_token_budget') == 200
+
+    def test_immutable(self):
+        """Test that snapshots, their profiles and nested sections are read-only"""
+        snap = ConfigSnapshot({'battery': {'capacity_kwh': 5.0}, 'pv_profile': [1.0] * 24})
+        with pytest.raises(AttributeError):
+            snap.hours = 48
+        with pytest.raises(ValueError):
+            snap.pv[0] = 3.0
+        with pytest.raises(TypeError):
+            snap.get('battery')['capacity_kwh'] = 10.0
+
+    def test_model_data_is_a_writable_copy(self):
+        """Test that model data can be modified without touching the snapshot"""
+        snap = ConfigSnapshot({})
+        data = snap.model_data()
+        data['Load'][3] += 1.0
+        assert snap.load[3] == 2.0
+        assert snap.model_data()['Load'][3] == 2.0
+
+    def test_content_hash(self):
+        """Test that the hash depends on content only, not key order"""
+        a = ConfigSnapshot({'prices': {'import': 0.3, 'export': 0.1}, 'battery': {}})
+        b = ConfigSnapshot({'battery': {}, 'prices': {'export': 0.1, 'import': 0.3}})
+        c = ConfigSnapshot({'battery': {}, 'prices': {'export': 0.1, 'import': 0.31}})
+        assert a.content_hash == b.content_hash and a == b and hash(a) == hash(b)
+        assert a.content_hash != c.content_hash
+        assert len({a, b, c}) == 2
+
+
+class TestConfigReload:
+    """Test suite for hot-reloading"""
+
+    def test_reload_swaps_snapshot(self, tmp_path):
+        """Test that reload picks up file changes and agents see them"""
+        path = tmp_path / 'config.json'
+        _write(path, {'prices': {'import': 0.25}})
+        config = Config(str(path))
+        agent = OptimizerAgent(config=config)
+        old = config.snapshot()
+        assert agent._default()['price_import'] == 0.25
+
+        _write(path, {'prices': {'import': 0.40}})
+        assert config.reload()
+        assert agent._default()['price_import'] == 0.40
+        assert old.price_import == 0.25
+        assert not config.reload()
+
+    def test_reload_if_changed(self, tmp_path):
+        """Test that only a modification-time change triggers a reload"""
+        path = tmp_path / 'config.json'
+        _write(path, {'prices': {'import': 0.25}}, mtime=1_000_000)
+        config = Config(str(path))
+        assert not config.reload_if_changed()
+
+        _write(path, {'prices': {'import': 0.30}}, mtime=1_000_100)
+        # Checked moments ago, so a long interval skips the check
+        assert not config.reload_if_changed(min_interval=3600)
+        assert config.snapshot().price_import == 0.25
+        assert config.reload_if_changed()
+        assert config.snapshot().price_import == 0.30
+
+    def test_bad_file_keeps_current_config(self, tmp_path, capsys):
+        """Test that an unparsable file on reload leaves the configuration unchanged"""
+        path = tmp_path / 'config.json'
+        _write(path, {'prices': {'import': 0.25}})
+        config = Config(str(path))
+        before = config.content_hash
+
+        path.write_text('{"prices": ')
+        assert not config.reload()
+        assert config.content_hash == before
+        assert 'keeping the current configuration' in capsys.readouterr().out
+
+    def test_missing_file_keeps_current_config(self, tmp_path, capsys):
+        """Test that reloading after the file is deleted (or mid atomic rename) keeps the configuration"""
+        path = tmp_path / 'config.json'
+        _write(path, {'prices': {'import': 0.40}})
+        config = Config(str(path))
+        before = config.content_hash
+
+        path.unlink()
+        assert not config.reload()
+        assert config.content_hash == before
+        assert config.snapshot().price_import == 0.40
+        assert 'keeping the current configuration' in capsys.readouterr().out
+
+    def test_dict_config_not_reloaded(self):
+        """Test that dict-built configurations ignore reloads"""
+        config = Config(config_dict={'prices': {'import': 0.2}})
+        assert not config.reload() and not config.reload_if_changed()
+
+
+class TestBaselineCache:
+    """Test suite for the configuration-keyed baseline cache"""
+
+    def test_baseline_per_config(self):
+        """Test that baselines are cached per configuration content"""
+        cheap = OptimizerAgent(config=Config(config_dict={'prices': {'import': 0.20}}))
+        dear = OptimizerAgent(config=Config(config_dict={'prices': {'import': 0.30}}))
+        same = OptimizerAgent(config=Config(config_dict={'prices': {'import': 0.20}}))
+
+        assert cheap.baseline_objective() < dear.baseline_objective()
+        calls = []
+        same.run = lambda *a, **k: calls.append(1)
+        assert same.baseline_objective() == cheap.baseline_objective()
+        assert calls == []
+
+    def test_cache_is_bounded(self, monkeypatch):
+        """Test that per-request override configurations do not grow the cache without bound"""
+        from chatsgp.agents import optimizer_agent
+        monkeypatch.setattr(optimizer_agent, '_BASELINE_CACHE', type(optimizer_agent._BASELINE_CACHE)())
+        monkeypatch.setattr(optimizer_agent, '_BASELINE_CACHE_SIZE', 3)
+        registry = ConfigRegistry(Config(config_dict=Config()._default_config()))
+        optimizer = OptimizerAgent()
+        for price in (0.20, 0.21, 0.22, 0.23, 0.24):
+            with use_config(registry.resolve(overrides={'prices': {'import': price}})):
+                optimizer.baseline_objective()
+        assert len(optimizer_agent._BASELINE_CACHE) == 3
+
+
+class TestConfigRegistry:
+    """Test suite for site configurations and per-request overrides"""
+
+    def test_get_config_per_path(self, tmp_path):
+        """Test that get_config returns one shared instance per path"""
+        path = tmp_path / 'site.json'
+        _write(path, {'prices': {'import': 0.4}})
+        site = get_config(str(path))
+        assert site is get_config(str(path))
+        assert site is not get_config()
+        assert site.snapshot().price_import == 0.4
+
+    def test_sites_and_overrides(self):
+        """Test site lookup, override merging and the override cache"""
+        registry = ConfigRegistry(Config(config_dict={'prices': {'import': 0.25, 'export': 0.1}}))
+        registry.register('north', {'prices': {'import': 0.3, 'export': 0.1}})
+
+        assert registry.resolve().price_import == 0.25
+        assert registry.resolve('north').price_import == 0.3
+        snap = registry.resolve('north', {'prices': {'export': 0.05}})
+        assert (snap.price_import, snap.price_export) == (0.3, 0.05)
+        assert registry.resolve('north', {'prices': {'export': 0.05}}) is snap
+        assert set(registry.sites()) == {'north'}
+
+    def test_invalid_requests(self):
+        """Test unknown sites and invalid overrides"""
+        registry = ConfigRegistry(Config(config_dict={}))
+        with pytest.raises(KeyError):
+            registry.resolve('nowhere')
+        with pytest.raises(ValueError, match='llm'):
+            registry.resolve(None, {'llm': {'model': 'other'}})
+        with pytest.raises(ValueError):
+            registry.resolve(None, {'prices': {'import': 'cheap'}})
+        with pytest.raises(ValueError):
+            registry.resolve(None, {'pv_profile': [1.0] * 12})
+
+    def test_scope_is_per_thread(self):
+        """Test that concurrent scoped requests each solve with their own configuration"""
+        agent = OptimizerAgent(config=Config(config_dict={}))
+        prices = [0.2, 0.3, 0.4, 0.5] * 3
+
+        def solve(price):
+            with use_config(ConfigSnapshot({'prices': {'import': price, 'export': 0.1}})):
+                data, res = agent.run({'ops': []})
+            return data['price_import'], res['objective']
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(solve, prices))
+        assert [p for p, _ in results] == prices
+        by_price = dict(results)
+        assert by_price[0.2] < by_price[0.3] < by_price[0.4] < by_price[0.5]
+        assert agent._default()['price_import'] == 0.25
+
+    def test_interpreter_baseline_follows_config(self):
+        """Test that the interpreter baseline uses the question's configuration, not the global one"""
+        expensive = Config(config_dict={'prices': {'import': 0.5, 'export': 0.1}})
+        orchestrator = Orchestrator(CoderAgent([]), OptimizerAgent(config=expensive), InterpreterAgent(llm=StubLLM()))
+        assert orchestrator.interpreter._calculate_baseline() == pytest.approx(
+            OptimizerAgent(config=expensive).baseline_objective())
+
+        override = ConfigSnapshot({'prices': {'import': 0.1, 'export': 0.05}})
+        out = orchestrator.run_question('What happens if PV generation increases by 0%?', config=override)
+        with use_config(override):
+            baseline = orchestrator.interpreter._calculate_baseline()
+        assert out['result']['objective'] == pytest.approx(baseline)
+        assert f"EUR {baseline:.2f}" in out['answer']
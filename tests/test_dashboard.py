@@ -0,0 +1,140 @@
+"""Tests for the static HTML dashboard"""
+import json
+import re
+import numpy as np
+import pytest
+from chatsgp.agents.optimizer_agent import OptimizerAgent
+from evaluation.dashboard import (
+    bucket_rows, dashboard_data, histogram, render_dashboard, solve_dispatch, solve_sweep
+)
+from evaluation.results_store import columns_from_records
+
+
+def _records(n):
+    rng = np.random.default_rng(0)
+    records = []
+    for i in range(n):
+        ok = i % 10 != 0
+        records.append({
+            'question': f'q{i}', 'category': ['pv', 'load', 'price'][i % 3], 'status': 'success',
+            'elapsed_s': float(rng.random()),
+            'result': {'ops': {'ops': [{'op': 'scale_series', 'target': 'PV', 'scale_pct': i % 50}],
+                               'explanation': 'rule-based'},
+                       'result': {'status': 'optimal' if ok else 'infeasible',
+                                  'objective': float(rng.normal(8, 1)) if ok else float('inf')}},
+        })
+    return records
+
+
+def _embedded(path):
+    page = open(path, encoding='utf-8').read()
+    payload = re.search(r'<script id="dashboard-data" type="application/json">(.*?)</script>', page, re.S)
+    return page, json.loads(payload.group(1))
+
+
+class TestAggregation:
+    """Test suite for the dashboard aggregations"""
+
+    def test_histogram_ignores_non_finite(self):
+        """Test that histograms count finite values only"""
+        h = histogram(np.array([1.0, 2.0, np.nan, np.inf, 3.0]), bins=4)
+        assert h['n'] == 3 and sum(h['counts']) == 3 and len(h['edges']) == 5
+        assert histogram(np.array([np.nan]))['n'] == 0
+
+    def test_bucket_rows(self):
+        """Test that rows are reduced to bucket means in the given order"""
+        matrix = np.arange(10, dtype=float)[:, None] * np.ones((1, 3))
+        matrix[9, 0] = np.nan
+        out = bucket_rows(matrix, max_rows=4, order=np.arange(10)[::-1])
+        assert out['sizes'] == [2, 3, 2, 3] and sum(out['sizes']) == 10
+        assert out['values'][0] == [8.0, 8.5, 8.5]
+        assert out['values'][-1] == [1.0, 1.0, 1.0]
+        assert len(bucket_rows(matrix, max_rows=50)['values']) == 10
+
+    def test_data_size_is_bounded(self):
+        """Test that embedded data does not grow with the number of scenarios"""
+        small = json.dumps(dashboard_data(columns_from_records(_records(100))))
+        large = json.dumps(dashboard_data(columns_from_records(_records(3000))))
+        assert len(large) < 1.2 * len(small)
+
+    def test_categories(self):
+        """Test per-category success rates"""
+        data = dashboard_data(columns_from_records(_records(30)))
+        by_name = {c['name']: c for c in data['categories']}
+        assert set(by_name) == {'pv', 'load', 'price'}
+        # Every tenth record failed: one per category
+        assert all(c['total'] == 10 and c['success_rate'] == 90.0 for c in by_name.values())
+        assert data['summary']['total_questions'] == 30
+
+
+class TestDashboard:
+    """Test suite for the HTML page"""
+
+    def test_self_contained_page(self, tmp_path):
+        """Test that the page inlines the chart script and valid JSON data"""
+        records = _records(40)
+        optimizer = OptimizerAgent()
+        data = dashboard_data(columns_from_records(records), dispatch=solve_dispatch(records, optimizer),
+                              title='Run </script> 1', max_rows=10)
+        page, embedded = _embedded(render_dashboard(data, tmp_path / 'report.html'))
+
+        assert 'SGPCharts' in page and '<script src=' not in page and 'http' not in page
+        assert '<title>Run &lt;/script&gt; 1</title>' in page
+        assert embedded['title'] == 'Run </script> 1'
+        assert embedded['dispatch']['scenarios'] == 40
+        assert len(embedded['dispatch']['flows']['grid_import']) == 10
+        assert len(embedded['dispatch']['row_labels']) == 10
+
+    def test_sweep(self, tmp_path):
+        """Test that a solved sweep is plotted with its heatmaps"""
+        sweep, dispatch = solve_sweep('PV', [-50, 0, 50], OptimizerAgent())
+        data = dashboard_data(sweep=sweep, dispatch=dispatch)
+        assert data['sweep']['values'] == [-50.0, 0.0, 50.0]
+        assert data['sweep']['objective'][0] > data['sweep']['objective'][2]
+        assert 'summary' not in data
+        _, embedded = _embedded(render_dashboard(data, tmp_path / 'sweep.html'))
+        # Cheapest first: the +50% PV scenario leads
+        assert embedded['dispatch']['flows']['PV'][0][12] > embedded['dispatch']['flows']['PV'][-1][12]
+
+    def test_all_infeasible_page_runs(self, tmp_path):
+        """Test that a batch without optimal results renders (the page script runs without errors)"""
+        import shutil
+        import subprocess
+        records = _records(20)
+        for record in records:
+            record['result']['result'] = {'status': 'infeasible', 'objective': float('inf')}
+        data = dashboard_data(columns_from_records(records))
+        assert data['summary']['average_cost'] is None
+        assert data['summary']['confidence_intervals']['average_cost'] is None
+        page, _ = _embedded(render_dashboard(data, tmp_path / 'report.html'))
+
+        node = shutil.which('node')
+        if node is None:
+            pytest.skip('node is not installed')
+        scripts = re.findall(r'<script>(.*?)</script>', page, re.S)
+        # Minimal DOM: every element is an inert stub; only the embedded data is real
+        shim = ("var payload = %s;"
+                "function stub() { return new Proxy(function () {}, {get: function (t, k) {"
+                "  return k === Symbol.toPrimitive ? function () { return 0; } : stub(); },"
+                "  apply: function () { return stub(); }, set: function () { return true; }}); }"
+                "var document = new Proxy({}, {get: function (t, k) {"
+                "  if (k === 'getElementById') return function (id) {"
+                "    return id === 'dashboard-data' ? {textContent: payload} : stub(); };"
+                "  return stub(); }});"
+                "var window = globalThis;" % json.dumps(json.dumps(data)))
+        run = subprocess.run([node, '-e', shim + '\n'.join(scripts)], capture_output=True, text=True, timeout=60)
+        assert run.returncode == 0, run.stderr
+    
+    @pytest.mark.parametrize('args', [
+        ['--input', 'results.jsonl', '--dispatch', '--sweep', 'PV', '-50', '50', '50'],
+        ['--input', 'results.parquet', '--dispatch'],
+    ])
+    def test_cli_rejects_ambiguous_dispatch(self, tmp_path, args):
+        """Test that --dispatch with --sweep or a columnar input is an error, not silently ignored"""
+        import subprocess
+        import sys
+        from pathlib import Path
+        run = subprocess.run([sys.executable, '-m', 'evaluation.dashboard', *args, '--output', str(tmp_path / 'x.html')],
+                             cwd=Path(__file__).parent.parent, capture_output=True, text=True, timeout=60)
+        assert run.returncode == 2 and '--dispatch' in run.stderr
+        assert not (tmp_path / 'x.html').exists()
@@ -0,0 +1,79 @@
+"""Tests for structured debug logging"""
+import json
+import numpy as np
+import pytest
+from chatsgp.agents.optimizer_agent import OptimizerAgent
+from chatsgp.utils import debug
+from chatsgp.utils.debug import configure_debug, close_debug, debug_data, flush_debug
+
+
+@pytest.fixture(autouse=True)
+def reset_debug():
+    configure_debug(enabled=False, file='', sample_rate=1.0)
+    yield
+    configure_debug(enabled=False, file='', sample_rate=1.0)
+
+
+class TestDebugLogging:
+    """Test suite for the debug logger"""
+
+    def test_lazy_payload_not_built_when_off(self, capsys):
+        """Test that callable payloads are never called with debugging off"""
+        def payload():
+            raise AssertionError('payload built while debugging is off')
+
+        debug_data('Agent', 'DATA', payload)
+        OptimizerAgent().run({'ops': []})
+        assert capsys.readouterr().out == ''
+
+    def test_environment_read_once(self, monkeypatch):
+        """Test that the DEBUG variable is read on first use and then cached"""
+        monkeypatch.setattr(debug, '_enabled', None)
+        monkeypatch.setenv('DEBUG', 'true')
+        assert debug._is_debug_enabled()
+        monkeypatch.setenv('DEBUG', 'false')
+        assert debug._is_debug_enabled()
+        configure_debug()
+        assert not debug._is_debug_enabled()
+
+    def test_stdout_output(self, capsys):
+        """Test pretty-printed events, including NumPy payloads"""
+        configure_debug(enabled=True)
+        debug_data('Agent', 'PROFILE', lambda: {'PV': np.array([1.0, 2.0])})
+        out = capsys.readouterr().out
+        assert '[DEBUG] Agent - DATA: PROFILE' in out
+        assert '1.0' in out and '2.0' in out
+
+    def test_file_sink(self, tmp_path, capsys):
+        """Test that events go to the file sink as JSON lines"""
+        path = tmp_path / 'debug.jsonl'
+        configure_debug(enabled=True, file=str(path))
+        OptimizerAgent().run({'ops': [{'op': 'scale_series', 'target': 'PV', 'scale_pct': 10}]})
+        flush_debug()
+
+        events = [json.loads(line) for line in path.read_text().splitlines()]
+        assert capsys.readouterr().out == ''
+        sections = [e['section'] for e in events]
+        assert 'DATA: MODIFIED DATA' in sections
+        modified = events[sections.index('DATA: MODIFIED DATA')]
+        assert modified['agent'] == 'OptimizerAgent'
+        assert len(modified['data']['PV']) == 24
+        assert all('ts' in e for e in events)
+
+    def test_sampling(self, tmp_path):
+        """Test that a sample rate keeps about that fraction of events"""
+        path = tmp_path / 'debug.jsonl'
+        configure_debug(enabled=True, file=str(path), sample_rate=0.25)
+        calls = []
+        for i in range(4000):
+            debug_data('Agent', 'TICK', lambda: calls.append(1) or i)
+        close_debug()
+
+        kept = len(path.read_text().splitlines())
+        assert kept == len(calls)
+        assert 800 < kept < 1200
+
+    def test_invalid_sample_rate(self):
+        """Test that sample rates outside [0, 1] are rejected"""
+        with pytest.raises(ValueError):
+            configure_debug(sample_rate=1.5)
@@ -0,0 +1,54 @@
+"""Import-time budget for the CLI startup path"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Modules that must only load when their code path is used
+HEAVY_MODULES = ('openai', 'matplotlib', 'pandas', 'yaml', 'tiktoken')
+
+# Cumulative import budget for the CLI modules, in milliseconds
+IMPORT_BUDGET_MS = float(os.getenv('CHATSGP_IMPORT_BUDGET_MS', '1500'))
+
+CLI_IMPORT = (
+    "import importlib.util; "
+    "spec = importlib.util.spec_from_file_location('run_pipeline', 'scripts/run_pipeline.py'); "
+    "spec.loader.exec_module(importlib.util.module_from_spec(spec))"
+)
+
+
+def _importtime(code):
+    """Run `code` under -X importtime; return {module: cumulative_us} for top-level imports and all names"""
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT))
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=PROJECT_ROOT,
+                          env=env, capture_output=True, text=True, check=True)
+    top_level, names = {}, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        names.add(name.strip())
+        if not name[1:].startswith(' '):
+            top_level[name.strip()] = int(cumulative)
+    return top_level, names
+
+
+class TestImportTime:
+    """Test suite for lazy imports"""
+    
+    def test_cli_does_not_import_heavy_modules(self):
+        """Test that the CLI module graph leaves heavy dependencies unloaded"""
+        _, names = _importtime(CLI_IMPORT)
+        loaded = sorted({n.split('.')[0] for n in names} & set(HEAVY_MODULES))
+        assert loaded == []
+    
+    @pytest.mark.slow
+    def test_cli_import_within_budget(self):
+        """Test that importing the CLI stays within the import-time budget"""
+        top_level, _ = _importtime(CLI_IMPORT)
+        total_ms = sum(top_level.values()) / 1000.0
+        assert total_ms <= IMPORT_BUDGET_MS, f"CLI import took {total_ms:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)"
@@ -2,7 +2,7 @@
 import pytest
 import numpy as np
 from chatsgp.agents.interpreter_agent import InterpreterAgent
-from chatsgp.utils.llm_backend import LLM
+from chatsgp.utils.llm_backend import LLM, StubLLM
 
 
 class TestInterpreterAgent:
@@ -10,7 +10,7 @@ class TestInterpreterAgent:
     
     def test_rule_based_interpretation_optimal(self):
         """Test rule-based interpretation for optimal result"""
-        agent = InterpreterAgent(llm=None)
+        agent = InterpreterAgent(llm=StubLLM())
         data = {
             'PV': np.array([1.0] * 24),
             'Load': np.array([2.0] * 24),
@@ -31,7 +31,7 @@ class TestInterpreterAgent:
     
     def test_rule_based_interpretation_infeasible(self):
         """Test rule-based interpretation for infeasible result"""
-        agent = InterpreterAgent(llm=None)
+        agent = InterpreterAgent(llm=StubLLM())
         data = {
             'PV': np.array([1.0] * 24),
             'Load': np.array([2.0] * 24),
@@ -49,12 +49,12 @@ class TestInterpreterAgent:
     
     def test_icl_examples_loaded(self):
         """Test that ICL examples are properly loaded"""
-        agent = InterpreterAgent(llm=None)
+        agent = InterpreterAgent(llm=StubLLM())
         assert len(agent.icl) >= 0  # May be empty if file doesn't exist
     
     def test_baseline_calculation(self):
         """Test baseline calculation"""
-        agent = InterpreterAgent(llm=None)
+        agent = InterpreterAgent(llm=StubLLM())
         baseline_obj = agent._calculate_baseline()
         
         assert isinstance(baseline_obj, (int, float))
@@ -63,7 +63,7 @@ class TestInterpreterAgent:
     
     def test_interpret_with_baseline_comparison(self):
         """Test interpretation includes baseline comparison"""
-        agent = InterpreterAgent(llm=None)
+        agent = InterpreterAgent(llm=StubLLM())
         data = {
             'PV': np.array([1.0] * 24),
             'Load': np.array([2.0] * 24),
@@ -79,3 +79,34 @@ class TestInterpreterAgent:
         # Should mention baseline or comparison
         assert 'baseline' in answer.lower() or 'compared' in answer.lower() or 'EUR' in answer
 
+    
+    def test_interpret_stream_rule_based(self):
+        """Test streaming falls back to a single rule-based chunk without LLM"""
+        agent = InterpreterAgent(llm=StubLLM())
+        agent.llm.client = None
+        data = {'PV': np.array([1.0] * 24), 'Load': np.array([2.0] * 24)}
+        result = {'status': 'optimal', 'objective': 10.5}
+        ops = {'ops': [{'op': 'scale_series', 'target': 'PV', 'scale_pct': 20.0}]}
+        
+        chunks = list(agent.interpret_stream(data, result, ops))
+        
+        assert len(chunks) == 1
+        assert chunks[0] == agent.interpret(data, result, ops)
+    
+    def test_interpret_stream_with_llm(self):
+        """Test streaming yields LLM chunks as they arrive"""
+        class StreamingLLM:
+            client = object()
+            def complete(self, prompt, temperature=0.0, max_tokens=256):
+                return "Costs go down."
+            def complete_stream(self, prompt, temperature=0.0, max_tokens=256):
+                yield from ["  Costs", " go", " down."]
+        
+        agent = InterpreterAgent(llm=StreamingLLM())
+        data = {'PV': np.array([1.0] * 24), 'Load': np.array([2.0] * 24)}
+        result = {'status': 'optimal', 'objective': 10.5}
+        
+        chunks = list(agent.interpret_stream(data, result))
+        
+        assert chunks == ["Costs", " go", " down."]
+        assert "".join(chunks) == agent.interpret(data, result)
@@ -0,0 +1,92 @@
+"""Tests for streaming JSONL reading and writing"""
+import gzip
+import json
+import pytest
+from collections import Counter
+from chatsgp.utils.jsonl import JsonlWriter, iter_jsonl, completed_counts, skip_completed
+
+
+class TestJsonl:
+    """Test suite for the JSONL helpers"""
+    
+    @pytest.mark.parametrize('name', ['out.jsonl', 'out.jsonl.gz'])
+    def test_round_trip(self, tmp_path, name):
+        """Test that written records read back in order"""
+        path = tmp_path / name
+        with JsonlWriter(path) as w:
+            for i in range(50):
+                w.write({'question': f'q{i}', 'i': i})
+        
+        assert [r['i'] for r in iter_jsonl(path)] == list(range(50))
+        if name.endswith('.gz'):
+            with gzip.open(path, 'rt') as f:
+                assert f.readline().startswith('{"question": "q0"')
+    
+    def test_zstd_round_trip(self, tmp_path):
+        """Test zstd output, including a resumed second frame"""
+        pytest.importorskip('zstandard')
+        path = tmp_path / 'out.jsonl.zst'
+        with JsonlWriter(path) as w:
+            w.write({'question': 'a'})
+        with JsonlWriter(path, resume=True) as w:
+            w.write({'question': 'b'})
+        assert [r['question'] for r in iter_jsonl(path)] == ['a', 'b']
+    
+    def test_resume_after_torn_write(self, tmp_path):
+        """Test that a half-written last record is dropped and appending continues cleanly"""
+        path = tmp_path / 'out.jsonl'
+        path.write_text('{"question": "a"}\n{"question": "b"}\n{"quest', encoding='utf-8')
+        
+        assert completed_counts(path) == Counter({'a': 1, 'b': 1})
+        with JsonlWriter(path, resume=True) as w:
+            w.write({'question': 'c'})
+        assert [r['question'] for r in iter_jsonl(path)] == ['a', 'b', 'c']
+    
+    def test_resume_truncated_gzip(self, tmp_path):
+        """Test recovery of a gzip file whose stream was cut off mid-run"""
+        path = tmp_path / 'out.jsonl.gz'
+        with JsonlWriter(path) as w:
+            for i in range(100):
+                w.write({'question': f'q{i}', 'pad': 'x' * 40})
+        path.write_bytes(path.read_bytes()[:-30])
+        
+        recovered = sum(completed_counts(path).values())
+        assert 0 < recovered < 100
+        with JsonlWriter(path, resume=True) as w:
+            w.write({'question': 'new'})
+        records = list(iter_jsonl(path))
+        assert len(records) == recovered + 1
+        assert records[-1] == {'question': 'new'}
+    
+    def test_resume_torn_write_longer_than_a_block(self, tmp_path):
+        """Test that the torn tail is found by scanning back across several blocks"""
+        path = tmp_path / 'out.jsonl'
+        path.write_text('{"question": "a"}\n{"question": "b", "pad": "' + 'x' * 200_000, encoding='utf-8')
+        with JsonlWriter(path, resume=True) as w:
+            w.write({'question': 'c'})
+        assert [r['question'] for r in iter_jsonl(path)] == ['a', 'c']
+        
+        path.write_text('{"question": "a"}', encoding='utf-8')
+        with JsonlWriter(path, resume=True) as w:
+            w.write({'question': 'b'})
+        assert [r['question'] for r in iter_jsonl(path)] == ['a', 'b']
+    
+    def test_resume_gzip_rejects_earlier_corruption(self, tmp_path):
+        """Test that only the torn last record of a compressed file is dropped on resume"""
+        path = tmp_path / 'out.jsonl.gz'
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            f.write('{"question": "a"}\nnot json\n')
+            for i in range(100):
+                f.write(json.dumps({'question': f'q{i}', 'pad': 'x' * 40}) + '\n')
+        before = path.read_bytes()[:-30]
+        path.write_bytes(before)
+        with pytest.raises(json.JSONDecodeError):
+            JsonlWriter(path, resume=True)
+        assert path.read_bytes() == before
+        assert list(tmp_path.iterdir()) == [path]
+    
+    def test_skip_completed_counts_duplicates(self):
+        """Test that a repeated question is skipped only as often as it was answered"""
+        items = [{'question': q} for q in ['a', 'b', 'a', 'c']]
+        remaining = list(skip_completed(iter(items), Counter({'a': 1, 'b': 1})))
+        assert [r['question'] for r in remaining] == ['a', 'c']
@@ -0,0 +1,130 @@
+"""Unit tests for the LLM backend against a local mock server"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from chatsgp.utils.llm_backend import LLM, LocalLLM, StubLLM, TokenBucket, create_llm, reset_pools
+
+
+class MockChatHandler(BaseHTTPRequestHandler):
+    """Minimal /chat/completions endpoint; returns 429 for the first `fail_first` requests"""
+    
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with server.lock:
+            server.requests += 1
+            fail = server.requests <= server.fail_first
+        if fail:
+            payload = json.dumps({'error': {'message': 'rate limited', 'type': 'rate_limit'}}).encode()
+            self.send_response(429)
+            self.send_header('Retry-After', '0')
+        else:
+            payload = json.dumps({
+                'id': 'cmpl-1', 'object': 'chat.completion', 'created': 0, 'model': body['model'],
+                'choices': [{'index': 0, 'finish_reason': 'stop',
+                             'message': {'role': 'assistant', 'content': 'mock answer'}}],
+            }).encode()
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def mock_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockChatHandler)
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.fail_first = 0
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    reset_pools()
+    yield server
+    server.shutdown()
+    reset_pools()
+
+
+def _llm(server, **kwargs):
+    return LLM(api_key='test', base_url=f'http://127.0.0.1:{server.server_address[1]}/v1', **kwargs)
+
+
+class TestLLMBackend:
+    """Test suite for the pooled, retrying LLM client"""
+    
+    def test_complete(self, mock_server):
+        """Test a plain completion round-trip"""
+        assert _llm(mock_server).complete('hello') == 'mock answer'
+    
+    def test_retries_on_rate_limit(self, mock_server):
+        """Test that 429 responses are retried up to max_retries"""
+        mock_server.fail_first = 2
+        assert _llm(mock_server, max_retries=2).complete('hello') == 'mock answer'
+        assert mock_server.requests == 3
+    
+    def test_gives_up_after_max_retries(self, mock_server):
+        """Test that retries are bounded"""
+        import openai
+        mock_server.fail_first = 10
+        with pytest.raises(openai.RateLimitError):
+            _llm(mock_server, max_retries=1).complete('hello')
+        assert mock_server.requests == 2
+    
+    def test_clients_are_shared(self, mock_server):
+        """Test that LLMs for the same endpoint share one client and limiter"""
+        a = _llm(mock_server, rpm=600)
+        b = _llm(mock_server, rpm=600)
+        assert a.client is b.client
+        assert a.limiter is b.limiter
+    
+    def test_token_bucket_limits_rate(self):
+        """Test that the bucket blocks once its burst capacity is used"""
+        bucket = TokenBucket(rate=50.0, capacity=1)
+        start = time.monotonic()
+        for _ in range(3):
+            bucket.acquire()
+        # First call is free, the next two wait ~20ms each
+        assert time.monotonic() - start >= 0.035
+    
+    def test_local_backend(self, mock_server):
+        """Test the OpenAI-compatible local backend and its metrics"""
+        llm = LocalLLM(base_url=f'http://127.0.0.1:{mock_server.server_address[1]}/v1')
+        assert llm.complete('hello') == 'mock answer'
+        metrics = llm.metrics.summary()
+        assert metrics['backend'] == 'local'
+        assert metrics['calls'] == 1
+        assert metrics['latency_p50_s'] > 0
+    
+    def test_create_llm_selects_backend(self):
+        """Test backend selection from the llm config section"""
+        assert isinstance(create_llm({'backend': 'stub'}), StubLLM)
+        assert isinstance(create_llm({'backend': 'local', 'base_url': 'http://127.0.0.1:1/v1'}), LocalLLM)
+        with pytest.raises(ValueError):
+            create_llm({'backend': 'nope'})
+    
+    def test_stub_backend_drives_pipeline(self):
+        """Test that the stub backend runs the full pipeline offline"""
+        from chatsgp.agents.coder_agent import CoderAgent
+        from chatsgp.agents.optimizer_agent import OptimizerAgent
+        from chatsgp.agents.interpreter_agent import InterpreterAgent
+        from chatsgp.agents.orchestrator import Orchestrator
+        
+        llm = create_llm({'backend': 'stub', 'responses': {
+            'Extract the modifications': '[{"op": "scale_series", "target": "Load", "scale_pct": 5}]',
+            'Interpret': 'Stub interpretation.',
+        }})
+        icl = [{'question': 'imports increase by 18%', 'ops': [{'op': 'scale_series', 'target': 'Pimp', 'scale_pct': 18}]}]
+        orchestrator = Orchestrator(CoderAgent(icl, llm=llm), OptimizerAgent(), InterpreterAgent(llm=llm))
+        
+        result = orchestrator.run_question("Any question at all")
+        
+        assert result['ops']['explanation'] == 'llm-with-icl'
+        assert result['ops']['ops'][0]['target'] == 'Load'
+        assert result['answer'] == 'Stub interpretation.'
+        assert llm.metrics.summary()['calls'] == 2
@@ -0,0 +1,88 @@
+"""Tests for gold-labelled datasets and the parse accuracy benchmark"""
+import importlib.util
+import random
+from pathlib import Path
+import pytest
+from chatsgp.agents.coder_agent import CoderAgent
+from chatsgp.agents.optimizer_agent import OptimizerAgent
+from evaluation.parse_accuracy import ops_exact_match, ops_tolerance_match, score_parse_accuracy
+
+_spec = importlib.util.spec_from_file_location(
+    'build_dataset', Path(__file__).parent.parent / 'scripts' / 'pipelines' / 'dataset_generation' / 'build_dataset.py')
+build_dataset = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(build_dataset)
+
+
+class TestGoldDataset:
+    """Test suite for gold labels from the dataset generator"""
+    
+    def test_gold_ops_follow_template_direction(self):
+        """Test that 'reduce'/'decrease' templates get negative gold percentages"""
+        random.seed(0)
+        for _ in range(200):
+            question, ops = build_dataset.sample_with_gold(random.choice(list(build_dataset.TEMPLATES)))
+            assert len(ops) == 1
+            if ops[0]['op'] == 'scale_series':
+                pct = float(question.split('by ')[1].split('%')[0])
+                negated = question.startswith(('Reduce', 'Assume imports decrease', 'Decrease'))
+                assert ops[0]['scale_pct'] == (-pct if negated else pct)
+            else:
+                assert f"{ops[0]['from_hour']} to {ops[0]['to_hour']}" in question
+    
+    def test_gold_objectives_solve_each_bundle_once(self):
+        """Test gold objectives match individual solves"""
+        ops = [[{'op': 'scale_series', 'target': 'PV', 'scale_pct': 10}], [], [{'op': 'scale_series', 'target': 'PV', 'scale_pct': 10}]]
+        objectives = build_dataset.gold_objectives(ops)
+        
+        assert objectives[0] == objectives[2]
+        assert objectives[1] == pytest.approx(OptimizerAgent().run({'ops': []})[1]['objective'])
+
+
+class TestParseAccuracy:
+    """Test suite for parse accuracy scoring"""
+    
+    def test_matchers(self):
+        """Test exact and tolerance matching of operation lists"""
+        gold = [{'op': 'scale_series', 'target': 'PV', 'scale_pct': 20}]
+        assert ops_exact_match([{'op': 'scale_series', 'target': 'PV', 'scale_pct': 20.0}], gold)
+        assert not ops_exact_match([{'op': 'scale_series', 'target': 'PV', 'scale_pct': 20.5}], gold)
+        assert ops_tolerance_match([{'op': 'scale_series', 'target': 'PV', 'scale_pct': 20.5}], gold, pct_tol=1.0)
+        assert not ops_tolerance_match([{'op': 'scale_series', 'target': 'Load', 'scale_pct': 20}], gold)
+        assert not ops_tolerance_match([], gold)
+    
+    def test_score_rule_based_parser(self):
+        """Test scoring catches a sign error of the rule-based parser"""
+        base = OptimizerAgent()
+        items = [
+            {'question': 'Increase PV generation by 20%. How does the objective change?', 'category': 'QPconsPprod',
+             'ops': [{'op': 'scale_series', 'target': 'PV', 'scale_pct': 20}]},
+            {'question': 'Reduce exports by 15%. What is the new cost?', 'category': 'QPimpPexp',
+             'ops': [{'op': 'scale_series', 'target': 'Pexp', 'scale_pct': -15}]},
+        ]
+        for it in items:
+            it['objective'] = base.run({'ops': it['ops']})[1]['objective']
+        
+        scores = score_parse_accuracy(items * 3, CoderAgent([]), optimizer=base, workers=2)
+        summary = scores['summary']
+        
+        assert summary['total'] == 6
+        assert summary['ops_exact'] == pytest.approx(50.0)
+        assert summary['objective_match'] == pytest.approx(50.0)
+        assert summary['by_category']['QPconsPprod']['ops_exact'] == pytest.approx(100.0)
+        assert summary['timings_s']['distinct_questions'] == 2
+        assert scores['rows'][1]['ops'][0]['scale_pct'] == 15
+    
+    def test_long_horizon_candidates_are_solved(self):
+        """Test that parsed ops beyond hour 23 are valid under a 48-hour config"""
+        from chatsgp.config import Config
+        config = Config(config_dict={'optimization': {'hours': 48},
+                                     'pv_profile': [1.0] * 48, 'load_profile': [2.0] * 48})
+        optimizer = OptimizerAgent(config=config)
+        gold = [{'op': 'shift_load', 'percentage': 50, 'from_hour': 30, 'to_hour': 40}]
+        item = {'question': 'Shift 50% of the load from 30 to 40', 'category': 'QPshift', 'ops': gold,
+                'objective': optimizer.run({'ops': gold})[1]['objective']}
+        
+        scores = score_parse_accuracy([item], CoderAgent([], config=config), optimizer=optimizer)
+        
+        assert scores['rows'][0]['ops'] == gold
+        assert scores['rows'][0]['objective_match']
@@ -0,0 +1,41 @@
+"""Tests for the performance benchmark suite and regression gating"""
+import pytest
+from evaluation.perf_benchmark import run_suite, compare_to_baseline, save_baseline, load_baseline
+
+
+def _results(**values):
+    return {'metrics': {name: {'value': v, 'unit': 'solves/s' if name.startswith('throughput') else 's',
+                               'higher_is_better': name.startswith('throughput')}
+                        for name, v in values.items()}}
+
+
+class TestPerfBenchmark:
+    """Test suite for the perf suite"""
+    
+    def test_suite_runs(self, tmp_path):
+        """Test a minimal suite run and baseline round trip"""
+        results = run_suite(horizons=(24,), solvers=('pulp', 'no-such-solver'), workers=(0,), repeats=1,
+                            throughput_jobs=2, memory_scenarios=2)
+        
+        assert {'build_s/H=24', 'solve_s/pulp/H=24', 'question_latency_s', 'throughput_per_s/workers=0',
+                'memory_peak_mib/H=24'} <= set(results['metrics'])
+        assert results['skipped'] == ['solve/no-such-solver']
+        path = tmp_path / 'baseline.json'
+        save_baseline(results, str(path))
+        assert compare_to_baseline(results, load_baseline(str(path))) == []
+    
+    def test_regression_directions(self):
+        """Test that slower timings and lower throughput beyond the threshold are flagged"""
+        baseline = _results(**{'solve_s/pulp/H=24': 0.10, 'throughput_per_s/workers=1': 100.0, 'build_s/H=24': 0.10})
+        current = _results(**{'solve_s/pulp/H=24': 0.13, 'throughput_per_s/workers=1': 70.0, 'build_s/H=24': 0.05})
+        
+        regressions = {r['metric']: r for r in compare_to_baseline(current, baseline, threshold=0.2)}
+        assert set(regressions) == {'solve_s/pulp/H=24', 'throughput_per_s/workers=1'}
+        assert regressions['solve_s/pulp/H=24']['change_pct'] == pytest.approx(30.0)
+        assert compare_to_baseline(current, baseline, threshold=0.5) == []
+    
+    def test_timer_noise_ignored(self):
+        """Test that tiny absolute changes on sub-millisecond timings don't fail the check"""
+        baseline = _results(**{'build_s/H=24': 0.0005})
+        current = _results(**{'build_s/H=24': 0.0010})
+        assert compare_to_baseline(current, baseline) == []
@@ -0,0 +1,54 @@
+"""Unit tests for prompt token budgeting"""
+import numpy as np
+from chatsgp.agents.interpreter_agent import InterpreterAgent
+from chatsgp.utils.prompt_budget import compact_profiles, count_tokens, key_hours
+
+
+def _profiles(H):
+    hours = np.arange(H) % 24
+    pv = np.clip(2.2 - np.abs(hours - 9) * 0.3, 0, None)
+    load = np.full(H, 2.0)
+    return pv, load
+
+
+class TestPromptBudget:
+    """Test suite for compact profile rendering"""
+    
+    def test_short_horizon_keeps_full_series(self):
+        """Test that a 24h horizon within budget is rendered in full"""
+        pv, load = _profiles(24)
+        pv_text, load_text = compact_profiles(pv, load, budget=400)
+        
+        assert pv_text.startswith('[') and pv_text.count(',') == 23
+        assert load_text.startswith('[')
+    
+    def test_long_horizon_stays_within_budget(self):
+        """Test that long horizons are summarized to fit the budget"""
+        for H in (384, 2000, 20000):
+            pv, load = _profiles(H)
+            pv_text, load_text = compact_profiles(pv, load, budget=200)
+            assert count_tokens(pv_text) + count_tokens(load_text) <= 200
+            assert f'{H} h' in pv_text
+    
+    def test_key_hours_include_shifted_hours(self):
+        """Test that shifted hours and dispatch extremes are kept"""
+        pv, load = _profiles(24)
+        ops = [{'op': 'shift_load', 'percentage': 25, 'from_hour': 20, 'to_hour': 3}]
+        hours = key_hours(pv, load, ops, k=2)
+        
+        assert 20 in hours and 3 in hours
+        assert 9 in hours  # largest PV surplus
+    
+    def test_prompt_size_flat_in_horizon(self):
+        """Test that the interpreter prompt does not grow with the horizon"""
+        agent = InterpreterAgent(llm=None)
+        agent._calculate_baseline = lambda: 8.0
+        result = {'status': 'optimal', 'objective': 7.5}
+        
+        sizes = []
+        for H in (384, 3840):
+            pv, load = _profiles(H)
+            prompt, _ = agent._build_llm_prompt({'PV': pv, 'Load': load}, result, {'ops': []})
+            sizes.append(count_tokens(prompt))
+        
+        assert abs(sizes[1] - sizes[0]) <= 10
@@ -0,0 +1,88 @@
+"""Tests for the sharded synthetic question generator"""
+import json
+import random
+import pytest
+from chatsgp.utils.jsonl import iter_jsonl
+from evaluation.question_generator import (QuestionGenerator, generate_dataset, parse_mix, sample_full,
+                                           zipf_ranks)
+
+
+def _records(out_dir):
+    return [r for path in sorted(out_dir.glob('questions-*')) for r in iter_jsonl(path)]
+
+
+class TestQuestionGenerator:
+    """Test suite for question sampling"""
+
+    def test_full_paraphrases_carry_matching_gold(self):
+        """Test that every gold percentage and hour pair appears in its question"""
+        rng = random.Random(0)
+        for cat in ('QPimpPexp', 'QPconsPprod', 'QPshift', 'QPmulti'):
+            for _ in range(200):
+                question, ops = sample_full(cat, rng)
+                assert len(ops) == 1 or cat == 'QPmulti'
+                for op in ops:
+                    if op['op'] == 'scale_series':
+                        assert f"by {abs(op['scale_pct'])}%" in question
+                    else:
+                        assert f"{op['percentage']}%" in question and str(op['to_hour']) in question
+
+    def test_multi_questions_scale_each_series_once(self):
+        """Test that multi-op questions have 2-3 ops and never scale a series twice"""
+        rng = random.Random(1)
+        for _ in range(300):
+            _, ops = sample_full('QPmulti', rng, max_ops=3)
+            targets = [op['target'] for op in ops if op['op'] == 'scale_series']
+            assert 2 <= len(ops) <= 3
+            assert len(targets) == len(set(targets))
+
+    def test_mix_validation(self):
+        """Test category mix parsing and rejection of invalid mixes"""
+        assert parse_mix('QPshift=2, QPmulti') == {'QPshift': 2.0, 'QPmulti': 1.0}
+        assert QuestionGenerator({'QPshift': 3, 'QPmulti': 1}).mix == {'QPshift': 0.75, 'QPmulti': 0.25}
+        with pytest.raises(ValueError):
+            QuestionGenerator({'QPunknown': 1})
+        with pytest.raises(ValueError):
+            QuestionGenerator({'QPmulti': 1}, paraphrases='base')
+
+    def test_zipf_ranks_favour_low_ranks(self):
+        """Test that Zipf draws stay in range and rank 0 is the most frequent"""
+        import numpy as np
+        ranks = zipf_ranks(20000, 500, 1.2, np.random.default_rng(0))
+        counts = np.bincount(ranks, minlength=500)
+        assert ranks.min() >= 0 and ranks.max() < 500
+        assert counts.argmax() == 0
+        assert counts[:10].sum() > counts[250:].sum()
+
+
+class TestGenerateDataset:
+    """Test suite for sharded dataset generation"""
+
+    def test_shards_and_manifest(self, tmp_path):
+        """Test that records are split into compressed shards with a manifest"""
+        manifest = generate_dataset(tmp_path, 2500, QuestionGenerator({'QPshift': 1}), shard_size=1000)
+        records = _records(tmp_path)
+
+        assert [s['count'] for s in manifest['shards']] == [1000, 1000, 500]
+        assert json.loads((tmp_path / 'manifest.json').read_text())['n'] == 2500
+        assert (tmp_path / 'questions-00002.jsonl.gz').exists()
+        assert [r['index'] for r in records] == list(range(2500))
+        assert {r['category'] for r in records} == {'QPshift'}
+
+    def test_zipf_repetition_is_consistent_across_shards(self, tmp_path):
+        """Test that a repeated qid is the same question with the same gold in every shard"""
+        generate_dataset(tmp_path, 3000, shard_size=1000, zipf=1.1, distinct=200, suffix='.jsonl')
+        by_qid = {}
+        for record in _records(tmp_path):
+            by_qid.setdefault(record['qid'], set()).add(json.dumps([record['question'], record['ops']]))
+
+        assert len(by_qid) < 200
+        assert all(len(variants) == 1 for variants in by_qid.values())
+
+    def test_parallel_matches_serial(self, tmp_path):
+        """Test that worker processes write the same shards as a serial run"""
+        serial = generate_dataset(tmp_path / 'serial', 1200, shard_size=400, zipf=1.0, distinct=100)
+        parallel = generate_dataset(tmp_path / 'parallel', 1200, shard_size=400, zipf=1.0, distinct=100, workers=2)
+
+        assert _records(tmp_path / 'serial') == _records(tmp_path / 'parallel')
+        assert serial['shards'] == parallel['shards']
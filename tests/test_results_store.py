@@ -0,0 +1,166 @@
+"""Tests for the columnar results store and vectorized metrics"""
+import numpy as np
+import pytest
+from evaluation.compare_results import compare_result_files, compare_results
+from evaluation.metrics import (
+    calculate_average_cost, calculate_parsing_accuracy, calculate_success_rate, generate_evaluation_report
+)
+from evaluation.results_store import flatten_result, columns_from_records
+
+
+def _record(i, status='optimal', method='rule-based'):
+    return {
+        'question': f'q{i}',
+        'category': 'QPshift' if i % 2 else 'QPimpPexp',
+        'result': {
+            'ops': {'ops': [{'op': 'scale_series', 'target': 'PV', 'scale_pct': i}], 'explanation': method},
+            'result': {'status': status, 'objective': float(i)},
+            'answer': '...'
+        },
+        'status': 'success',
+        'elapsed_s': 0.01 * i
+    }
+
+
+RECORDS = [_record(1), _record(2, method='llm-with-icl'), _record(3, status='infeasible'),
+           {'question': 'q4', 'error': 'boom', 'status': 'error'}]
+
+
+class TestResultsStore:
+    """Test suite for flattening and columnar storage"""
+    
+    def test_flatten_nested_and_flat_records(self):
+        """Test that runner records and flat records flatten to the same columns"""
+        row = flatten_result(_record(2))
+        flat = flatten_result({'ops': {'explanation': 'rule-based'}, 'result': {'status': 'optimal', 'objective': 2.0}})
+        
+        assert row['solve_status'] == flat['solve_status'] == 'optimal'
+        assert row['objective'] == flat['objective'] == 2.0
+        assert row['n_ops'] == 1 and row['category'] == 'QPimpPexp'
+        assert np.isnan(flatten_result(RECORDS[3])['objective'])
+    
+    @pytest.mark.parametrize('name', ['results.parquet', 'results.arrow'])
+    def test_round_trip(self, tmp_path, name):
+        """Test writing in several row groups and reading selected columns back"""
+        pytest.importorskip('pyarrow')
+        from evaluation.results_store import write_columnar, read_columnar
+        path = tmp_path / name
+        assert write_columnar(RECORDS, path, batch_size=3) == 4
+        
+        cols = read_columnar(path, columns=['question', 'objective'])
+        assert list(cols) == ['question', 'objective']
+        assert cols['question'].tolist() == ['q1', 'q2', 'q3', 'q4']
+        assert cols['objective'][:3].tolist() == [1.0, 2.0, 3.0]
+        assert np.isnan(cols['objective'][3])
+
+    def test_benchmark_resume_keeps_columnar_rows(self, tmp_path, monkeypatch):
+        """Test that resuming a benchmark keeps the earlier rows in the columnar file"""
+        pytest.importorskip('pyarrow')
+        import json
+        from chatsgp.utils import llm_backend
+        from chatsgp.utils.jsonl import iter_jsonl
+        from chatsgp.utils.llm_backend import StubLLM
+        from evaluation.benchmark import run_benchmark
+        from evaluation.results_store import read_columnar
+        monkeypatch.setattr(llm_backend, 'create_llm', lambda *args, **kwargs: StubLLM())
+        questions = [f'What happens if PV increases by {pct}%?' for pct in (10, 20, 30)]
+        src, out, columnar = tmp_path / 'questions.jsonl', tmp_path / 'results.jsonl', tmp_path / 'results.parquet'
+        
+        src.write_text(''.join(json.dumps({'question': q}) + '\n' for q in questions[:2]))
+        run_benchmark(str(src), output_file=str(out), columnar_file=str(columnar))
+        src.write_text(''.join(json.dumps({'question': q}) + '\n' for q in questions))
+        run_benchmark(str(src), output_file=str(out), columnar_file=str(columnar), resume=True)
+        
+        assert [r['question'] for r in iter_jsonl(out)] == questions
+        assert read_columnar(columnar, columns=['question'])['question'].tolist() == questions
+
+
+class TestVectorizedMetrics:
+    """Test suite for column-based reports and comparisons"""
+    
+    def test_report(self):
+        """Test the evaluation report on runner records"""
+        report = generate_evaluation_report(RECORDS)
+        
+        assert report['total_questions'] == 4
+        assert report['successful_count'] == 2 and report['failed_count'] == 2
+        assert report['success_rate'] == pytest.approx(50.0)
+        assert report['average_cost'] == pytest.approx(1.5)
+        assert report['parsing_accuracy']['llm_parsing'] == pytest.approx(25.0)
+        assert report['parsing_accuracy']['rule_based_parsing'] == pytest.approx(50.0)
+    
+    def test_metric_helpers_match_report(self):
+        """Test that the single-metric helpers agree with the report on runner and flat records"""
+        report = generate_evaluation_report(RECORDS)
+        assert calculate_success_rate(RECORDS) == report['success_rate']
+        assert calculate_average_cost(RECORDS) == report['average_cost']
+        assert calculate_parsing_accuracy(RECORDS) == report['parsing_accuracy']
+        
+        flat = [r['result'] for r in RECORDS[:3]]
+        assert calculate_success_rate(flat) == pytest.approx(200 / 3)
+        assert calculate_average_cost(flat) == pytest.approx(1.5)
+        assert calculate_success_rate([]) == 0.0
+    
+    def test_compare_files_matches_in_memory(self, tmp_path):
+        """Test that JSONL and columnar files compare like the in-memory records"""
+        pytest.importorskip('pyarrow')
+        from chatsgp.utils.jsonl import JsonlWriter
+        from evaluation.results_store import write_columnar
+        other = [_record(i) for i in (2, 4)]
+        with JsonlWriter(tmp_path / 'a.jsonl') as w:
+            for r in RECORDS:
+                w.write(r)
+        write_columnar(other, tmp_path / 'b.parquet')
+        
+        expected = compare_results(RECORDS, other, 'a', 'b')
+        assert compare_result_files(str(tmp_path / 'a.jsonl'), str(tmp_path / 'b.parquet')) == expected
+        assert expected['difference']['cost_difference'] == pytest.approx(1.5)
+
+
+class TestMetricsAccumulator:
+    """Test suite for the incremental metrics engine"""
+    
+    def test_streaming_matches_columns(self):
+        """Test that row-by-row, column-batch and merged aggregation agree"""
+        from evaluation.metrics import MetricsAccumulator
+        streamed = MetricsAccumulator()
+        for r in RECORDS:
+            streamed.update(r)
+        batched = MetricsAccumulator()
+        batched.update_columns(columns_from_records(RECORDS[:2]))
+        shard = MetricsAccumulator()
+        for r in RECORDS[2:]:
+            shard.update(r)
+        batched.merge(shard)
+        
+        assert streamed.report(seed=1) == batched.report(seed=1)
+        assert len(batched) == 4
+    
+    def test_categories_and_latency(self):
+        """Test per-category breakdowns and latency percentiles"""
+        report = generate_evaluation_report(RECORDS, bootstrap=0)
+        
+        assert set(report['by_category']) == {'QPshift', 'QPimpPexp', 'uncategorized'}
+        assert report['by_category']['QPshift']['total_questions'] == 2
+        assert report['by_category']['QPshift']['success_rate'] == pytest.approx(50.0)
+        assert report['by_category']['QPimpPexp']['average_cost'] == pytest.approx(2.0)
+        assert report['latency_s']['count'] == 3
+        assert report['latency_s']['p50'] == pytest.approx(0.02)
+        assert report['confidence_intervals'] == {}
+    
+    def test_bootstrap_intervals(self):
+        """Test that bootstrap intervals bracket the point estimates"""
+        records = [_record(i, status='optimal' if i % 4 else 'infeasible') for i in range(400)]
+        report = generate_evaluation_report(records, bootstrap=500)
+        
+        lo, hi = report['confidence_intervals']['success_rate']
+        assert lo < report['success_rate'] < hi
+        lo, hi = report['confidence_intervals']['average_cost']
+        assert lo < report['average_cost'] < hi
+        assert hi - lo < 40
+        
+        # Few distinct objectives take the multinomial path
+        repeated = generate_evaluation_report([_record(i % 3) for i in range(300)], bootstrap=500)
+        lo, hi = repeated['confidence_intervals']['average_cost']
+        assert repeated['average_cost'] == pytest.approx(1.0)
+        assert lo < 1.0 < hi
@@ -0,0 +1,142 @@
+"""Tests for the pipeline HTTP server"""
+import json
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from chatsgp.config import Config
+from chatsgp.server import PipelineService, make_server
+from chatsgp.utils.llm_backend import StubLLM
+
+
+@pytest.fixture
+def server():
+    service = PipelineService(config=Config(config_dict=Config()._default_config()), llm=StubLLM(),
+                              workers=2, max_pending=4)
+    httpd = make_server(service, port=0)
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+    service.close()
+
+
+def _post(httpd, endpoint, payload):
+    url = f'http://127.0.0.1:{httpd.server_address[1]}{endpoint}'
+    req = urllib.request.Request(url, data=json.dumps(payload).encode(), headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+class TestServer:
+    """Test suite for the pipeline server"""
+    
+    def test_run_question_and_cache(self, server):
+        """Test a question round-trip and that repeats hit the cache"""
+        status, body = _post(server, '/run_question', {'question': 'What happens if PV increases by 20%?'})
+        assert status == 200
+        assert body['result']['status'] == 'optimal'
+        assert body['ops']['ops'][0]['target'] == 'PV'
+        
+        _post(server, '/run_question', {'question': 'What happens if PV increases by 20%?'})
+        assert server.service.cache.hits == 1
+    
+    def test_sweep(self, server):
+        """Test a scale_series sweep returns one result per value"""
+        status, body = _post(server, '/sweep', {'target': 'PV', 'values': [-20, 0, 20]})
+        assert status == 200
+        objectives = [r['objective'] for r in body['results']]
+        assert len(objectives) == 3
+        assert objectives[0] > objectives[1] > objectives[2]
+    
+    def test_batch_and_backpressure(self, server):
+        """Test batches run, and batches that do not fit in the queue get 503"""
+        status, body = _post(server, '/batch', {'questions': ['imports increase by 10%', '']})
+        assert status == 200
+        assert [r['status'] for r in body['results']] == ['success', 'error']
+        
+        server.service._reserve(3)
+        try:
+            status, body = _post(server, '/batch', {'questions': ['imports increase by 10%'] * 2})
+            assert status == 503
+        finally:
+            for _ in range(3):
+                server.service._release()
+    
+    def test_oversized_requests(self, server):
+        """Test that a batch over the queue limit gets 413, and a long sweep takes one slot"""
+        status, body = _post(server, '/batch', {'questions': ['imports increase by 10%'] * 5})
+        assert status == 413
+        assert 'limit 4' in body['error']
+        
+        status, body = _post(server, '/sweep', {'target': 'PV', 'values': list(range(-50, 101, 25))})
+        assert status == 200
+        assert [r['scale_pct'] for r in body['results']] == list(range(-50, 101, 25))
+        assert all(r['status'] == 'optimal' for r in body['results'])
+    
+    def test_bad_request(self, server):
+        """Test that malformed requests get 400"""
+        status, _ = _post(server, '/sweep', {'target': 'Nope', 'values': [1]})
+        assert status == 400
+    
+    def test_pipeline_errors(self, server, monkeypatch):
+        """Test that invalid-question pipeline failures get 400 and internal failures 500"""
+        coder = server.service.orchestrator.coder
+        
+        def invalid(q):
+            raise ValueError("Invalid question: Question must mention a percentage")
+        monkeypatch.setattr(coder, 'propose_modifications', invalid)
+        status, body = _post(server, '/run_question', {'question': 'What happens if PV increases?'})
+        assert status == 400
+        assert body['error'].startswith('Pipeline failed: Invalid question')
+        
+        def broken(q):
+            raise RuntimeError("Optimization error: solver crashed")
+        monkeypatch.setattr(coder, 'propose_modifications', broken)
+        status, _ = _post(server, '/run_question', {'question': 'What happens if PV increases by 5%?'})
+        assert status == 500
+    
+    def test_config_reload(self, tmp_path):
+        """Test that a reloaded configuration changes results and bypasses stale cache entries"""
+        path = tmp_path / 'config.json'
+        config_dict = Config()._default_config()
+        path.write_text(json.dumps(config_dict))
+        service = PipelineService(config=Config(str(path)), llm=StubLLM(), workers=1)
+        try:
+            question = 'What happens if PV increases by 20%?'
+            before = service.run_question(question)['result']['objective']
+            config_dict['prices']['import'] = 0.35
+            path.write_text(json.dumps(config_dict))
+            assert service.reload_config()['reloaded']
+            after = service.run_question(question)['result']['objective']
+            assert after > before
+            assert service.cache.hits == 0
+        finally:
+            service.close()
+    
+    def test_sites_and_overrides(self):
+        """Test that concurrent requests for different sites and overrides don't cross-talk"""
+        default = Config()._default_config()
+        north = json.loads(json.dumps(default))
+        north['prices']['import'] = 0.40
+        service = PipelineService(config=Config(config_dict=default), llm=StubLLM(), workers=4,
+                                  sites={'north': north})
+        try:
+            question = 'What happens if PV increases by 20%?'
+            scopes = [{}, {'site': 'north'}, {'overrides': {'prices': {'import': 0.10}}}] * 4
+            with ThreadPoolExecutor(max_workers=6) as pool:
+                results = list(pool.map(lambda scope: service.run_question(question, **scope), scopes))
+            objectives = [r['result']['objective'] for r in results]
+            base, dear, cheap = objectives[:3]
+            assert cheap < base < dear
+            assert objectives == [base, dear, cheap] * 4
+            with pytest.raises(ValueError):
+                service.run_question(question, site='nowhere')
+        finally:
+            service.close()
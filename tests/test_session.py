@@ -0,0 +1,108 @@
+"""Tests for conversational scenario sessions"""
+import json
+import numpy as np
+import pytest
+from chatsgp.agents.coder_agent import CoderAgent
+from chatsgp.agents.interpreter_agent import InterpreterAgent
+from chatsgp.utils.llm_backend import StubLLM
+from chatsgp.agents.optimizer_agent import OptimizerAgent
+from chatsgp.agents.orchestrator import Orchestrator
+from chatsgp.agents.session import ScenarioSession
+from chatsgp.config import Config
+from chatsgp.optimization.rec_baseline import IncrementalModel, build_and_solve
+
+
+def _session(config=None):
+    optimizer = OptimizerAgent(config=config)
+    return ScenarioSession(Orchestrator(CoderAgent([]), optimizer, InterpreterAgent(llm=StubLLM())))
+
+
+def _objective(ops):
+    data, res = OptimizerAgent().run({'ops': ops})
+    return res['objective']
+
+
+class TestIncrementalModel:
+    """Test suite for IncrementalModel"""
+
+    def test_matches_full_solve(self):
+        """Test that in-place re-solves match building the model from scratch"""
+        data = OptimizerAgent()._default()
+        model = IncrementalModel(data)
+        for factor in (1.0, 1.3, 0.4):
+            pv = data['PV'] * factor
+            full = build_and_solve(dict(data, PV=pv), return_dispatch=True)
+            res = model.solve(pv, data['Load'])
+            assert res['objective'] == pytest.approx(full['objective'])
+            assert res['status'] == 'optimal' and len(res['grid_import']) == data['H']
+
+    def test_memoized(self):
+        """Test that repeated profiles are not re-solved"""
+        data = OptimizerAgent()._default()
+        model = IncrementalModel(data)
+        first = model.solve(data['PV'] * 1.2, data['Load'])
+        model.solve(data['PV'], data['Load'])
+        again = model.solve(data['PV'] * 1.2, data['Load'])
+        assert model.solves == 2
+        assert again == first
+
+
+class TestScenarioSession:
+    """Test suite for ScenarioSession"""
+
+    def test_follow_ups_build_on_each_other(self):
+        """Test that each question's operations apply on top of the earlier ones"""
+        session = _session()
+        first = session.ask('What happens if PV generation increases by 20%?')
+        second = session.ask('Now also raise PV by 10%')
+
+        assert second['ops']['ops'] == [{'op': 'scale_series', 'target': 'PV', 'scale_pct': 10.0}]
+        assert len(second['scenario_ops']) == 2
+        assert second['previous_objective'] == pytest.approx(first['result']['objective'])
+        assert second['result']['objective'] == pytest.approx(_objective(second['scenario_ops']))
+        assert second['baseline_objective'] == pytest.approx(_objective([]))
+        assert np.allclose(session.data['PV'], OptimizerAgent()._default()['PV'] * 1.2 * 1.1)
+
+    def test_no_change_reuses_solution(self):
+        """Test that questions without operations keep the current solution without solving"""
+        session = _session()
+        session.ask('What happens if imports increase by 10%?')
+        solves = session._model.solves
+        out = session.ask('What happens then?')
+        assert out['ops']['ops'] == []
+        assert session._model.solves == solves
+        assert out['result'] is session.result
+        assert len(session.turns) == 1
+
+    def test_undo_and_reset(self):
+        """Test that undo reverts one turn and reset drops every edit"""
+        session = _session()
+        first = session.ask('What happens if PV generation increases by 20%?')
+        session.ask('What happens if imports increase by 10%?')
+
+        assert session.undo()
+        assert session.result == first['result']
+        assert len(session.ops) == 1
+        session.reset()
+        assert session.ops == [] and session.result is None
+        assert not session.undo()
+
+    def test_invalid_question(self):
+        """Test that invalid questions leave the scenario unchanged"""
+        session = _session()
+        session.ask('What happens if PV generation increases by 20%?')
+        with pytest.raises(ValueError):
+            session.ask('')
+        assert len(session.turns) == 1
+
+    def test_config_pinned(self, tmp_path):
+        """Test that a configuration reload does not change a running session"""
+        path = tmp_path / 'config.json'
+        path.write_text(json.dumps({'prices': {'import': 0.25, 'export': 0.1}}))
+        config = Config(str(path))
+        session = _session(config)
+        before = session.ask('What happens if PV generation increases by 20%?')['baseline_objective']
+        path.write_text(json.dumps({'prices': {'import': 0.5, 'export': 0.1}}))
+        assert config.reload()
+        after = session.ask('What happens if imports increase by 10%?')['baseline_objective']
+        assert after == pytest.approx(before)
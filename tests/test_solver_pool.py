@@ -0,0 +1,98 @@
+"""Tests for the persistent solver worker pool"""
+import numpy as np
+import pytest
+from chatsgp.agents.optimizer_agent import OptimizerAgent
+from chatsgp.optimization.modifications import apply_modifications
+from chatsgp.optimization.rec_baseline import build_and_solve
+from chatsgp.optimization.shared_memory import ScenarioBlock, FLOWS
+from chatsgp.optimization.solver_pool import SolverPool
+
+
+def _scenarios(n):
+    base = OptimizerAgent()
+    out = []
+    for i in range(n):
+        data = base._default()
+        apply_modifications(data, [{'op': 'scale_series', 'target': 'PV', 'scale_pct': 5 * i}])
+        out.append(data)
+    return out
+
+
+@pytest.fixture(scope='module')
+def pool():
+    with SolverPool(workers=2, max_jobs_per_worker=3) as p:
+        yield p
+
+
+class TestSolverPool:
+    """Test suite for SolverPool"""
+    
+    def test_results_match_in_process(self, pool):
+        """Test that pooled solves match direct solves, in order"""
+        scenarios = _scenarios(6)
+        pooled = pool.map(scenarios)
+        direct = [build_and_solve(d) for d in _scenarios(6)]
+        
+        assert [r['status'] for r in pooled] == ['optimal'] * 6
+        assert [r['objective'] for r in pooled] == pytest.approx([r['objective'] for r in direct])
+        assert pool.queue_depth == 0
+    
+    def test_workers_recycled(self, pool):
+        """Test that workers are replaced after max_jobs_per_worker jobs"""
+        pool.map(_scenarios(8))
+        assert sum(w['restarts'] for w in pool.health()) >= 2
+        assert all(w['alive'] for w in pool.health())
+    
+    def test_dead_worker_is_replaced(self, pool):
+        """Test that a killed worker is restarted and the job still completes"""
+        for w in pool._workers:
+            w.process.kill()
+            w.process.join()
+        
+        res = pool.solve(_scenarios(1)[0])
+        
+        assert res['status'] == 'optimal'
+    
+    def test_optimizer_agent_uses_pool(self, pool):
+        """Test OptimizerAgent delegating solves to the pool"""
+        _, res = OptimizerAgent(solver_pool=pool).run({'ops': [{'op': 'scale_series', 'target': 'PV', 'scale_pct': 20}]})
+        _, direct = OptimizerAgent().run({'ops': [{'op': 'scale_series', 'target': 'PV', 'scale_pct': 20}]})
+        assert res['objective'] == pytest.approx(direct['objective'])
+    
+    def test_run_many_through_shared_memory(self, pool):
+        """Test batch solves over shared memory match per-scenario runs"""
+        bundles = [{'ops': [{'op': 'scale_series', 'target': 'PV', 'scale_pct': v}]} for v in (-20, 0, 20, 40)]
+        pooled = OptimizerAgent(solver_pool=pool).run_many(bundles, chunk_size=3)
+        local = OptimizerAgent().run_many(bundles)
+        direct = [OptimizerAgent().run(b)[1]['objective'] for b in bundles]
+        
+        assert pooled['status'] == ['optimal'] * 4
+        assert list(pooled['objective']) == pytest.approx(direct)
+        assert list(local['objective']) == pytest.approx(direct)
+        assert pooled['soc'].shape == (4, 24)
+        assert pool.queue_depth == 0
+
+
+class TestScenarioBlock:
+    """Test suite for the shared-memory ScenarioBlock"""
+    
+    def test_attach_shares_buffer(self):
+        """Test that writes through an attached block are visible to the owner"""
+        pv = np.arange(6.0).reshape(2, 3)
+        with ScenarioBlock.create(pv, pv + 1) as block:
+            other = ScenarioBlock.attach(block.handle)
+            assert np.array_equal(other.load, pv + 1)
+            other.flows[1, 0, :] = 7.0
+            other.objective[1] = 3.5
+            other.close()
+            out = block.to_results()
+        
+        assert out['objective'][1] == 3.5
+        assert out[FLOWS[0]][1].tolist() == [7.0, 7.0, 7.0]
+        assert np.isnan(out[FLOWS[0]][0]).all()
+        assert out['status'] == ['error', 'error']
+    
+    def test_shape_mismatch(self):
+        """Test that mismatched profiles are rejected"""
+        with pytest.raises(ValueError):
+            ScenarioBlock.create(np.zeros((2, 3)), np.zeros((2, 4)))
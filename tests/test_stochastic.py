@@ -0,0 +1,137 @@
+"""Tests for two-stage stochastic optimization and scenario reduction"""
+import numpy as np
+import pytest
+from chatsgp.agents.coder_agent import CoderAgent
+from chatsgp.agents.interpreter_agent import InterpreterAgent
+from chatsgp.utils.llm_backend import StubLLM
+from chatsgp.agents.optimizer_agent import OptimizerAgent
+from chatsgp.agents.orchestrator import Orchestrator
+from chatsgp.config import Config
+from chatsgp.optimization.rec_baseline import build_and_solve
+from chatsgp.optimization.stochastic import (asks_robustness, kmedoids, recourse_costs, reduce_scenarios,
+                                             robustness_analysis, sample_scenarios, solve_stochastic,
+                                             uncertainty_settings)
+
+
+@pytest.fixture
+def data():
+    return Config(config_dict={}).snapshot().model_data()
+
+
+class TestScenarios:
+    """Test suite for scenario sampling and k-medoids reduction"""
+
+    def test_sampling_is_seeded_and_non_negative(self, data):
+        """Test that samples are reproducible, non-negative and include cloudy days"""
+        pv, load = sample_scenarios(data['PV'], data['Load'], samples=300, cloudy_prob=0.3, seed=7)
+        again, _ = sample_scenarios(data['PV'], data['Load'], samples=300, cloudy_prob=0.3, seed=7)
+
+        assert pv.shape == load.shape == (300, data['H'])
+        assert np.array_equal(pv, again)
+        assert pv.min() >= 0 and load.min() >= 0
+        assert (pv.sum(axis=1) < 0.6 * data['PV'].sum()).mean() > 0.15
+
+    def test_kmedoids_recovers_clusters(self):
+        """Test that well-separated clusters each get one medoid"""
+        rng = np.random.default_rng(0)
+        centers = np.array([[0.0, 0.0], [10.0, 0.0], [0.0, 10.0]])
+        X = np.vstack([c + rng.normal(scale=0.3, size=(50, 2)) for c in centers])
+        medoids, labels = kmedoids(X, 3)
+
+        assert sorted(np.round(X[medoids] / 10).astype(int).tolist()) == [[0, 0], [0, 1], [1, 0]]
+        assert sorted(np.bincount(labels).tolist()) == [50, 50, 50]
+
+    def test_kmedoids_handles_duplicate_points(self):
+        """Test that identical points do not produce duplicate or invalid medoids"""
+        medoids, labels = kmedoids(np.zeros((10, 3)), 4)
+
+        assert labels.max() < len(medoids)
+
+    def test_reduction_keeps_probability_mass(self, data):
+        """Test that medoid probabilities are cluster weights summing to one"""
+        pv, load = sample_scenarios(data['PV'], data['Load'], samples=200)
+        pv_r, load_r, probs = reduce_scenarios(pv, load, 12)
+
+        assert pv_r.shape == load_r.shape == (12, data['H'])
+        assert probs.sum() == pytest.approx(1.0)
+        assert (probs > 0).all()
+        assert all(any(np.array_equal(row, p) for p in pv) for row in pv_r)
+
+
+class TestStochasticModel:
+    """Test suite for the two-stage model"""
+
+    def test_single_scenario_matches_deterministic(self, data):
+        """Test that one certain scenario gives the perfect-foresight objective"""
+        res = solve_stochastic(data, data['PV'][None], data['Load'][None], [1.0])
+
+        assert res['status'] == 'optimal'
+        assert res['objective'] == pytest.approx(build_and_solve(data)['objective'])
+        assert res['scenario_objectives'][0] == pytest.approx(res['objective'])
+
+    def test_shared_schedule_and_expected_cost(self, data):
+        """Test that the battery schedule is shared and the objective is the weighted scenario cost"""
+        pv, load = sample_scenarios(data['PV'], data['Load'], samples=6, seed=3)
+        probs = np.full(6, 1 / 6)
+        res = solve_stochastic(data, pv, load, probs, return_dispatch=True)
+
+        assert len(res['battery_charge']) == data['H']
+        assert np.array(res['grid_import']).shape == (6, data['H'])
+        assert res['objective'] == pytest.approx(float(probs @ res['scenario_objectives']), abs=1e-6)
+        # The closed-form recourse reproduces the LP's per-scenario cost
+        costs = recourse_costs(data, res['battery_charge'], res['battery_discharge'], pv, load)
+        lp_costs = (data['price_import'] * np.array(res['grid_import'])
+                    - data['price_export'] * np.array(res['grid_export'])).sum(axis=1)
+        assert costs == pytest.approx(lp_costs, abs=1e-6)
+
+    def test_stochastic_plan_is_no_worse_in_expectation(self, data):
+        """Test that the hedged plan costs no more on average than the forecast plan"""
+        res = robustness_analysis(data, settings=uncertainty_settings(samples=120, scenarios=120))
+        info = res['robustness']
+
+        assert res['status'] == 'optimal'
+        assert info['value_of_stochastic_solution'] >= -1e-6
+        assert info['deterministic']['worst'] >= info['deterministic']['p95'] >= info['deterministic']['expected']
+        assert res['objective'] == pytest.approx(info['stochastic']['expected'])
+
+    def test_gurobi_is_reported_unsupported(self, data):
+        """Test that the stochastic mode reports unsupported solvers as errors"""
+        assert solve_stochastic(data, data['PV'][None], data['Load'][None], [1.0], solver='gurobi')['status'] == 'error'
+
+
+class TestRobustnessQuestions:
+    """Test suite for routing robustness questions"""
+
+    def test_question_detection(self):
+        """Test robustness keywords"""
+        assert asks_robustness("How robust is this plan to cloudy days?")
+        assert asks_robustness("What if the forecast errors are large?")
+        assert not asks_robustness("What happens if PV generation increases by 20%?")
+        assert not asks_robustness("What if the variable load rises 10%?")
+        assert not asks_robustness("Is hedging exports by 10% worth it?")
+
+    def test_pooled_run_matches_in_process(self):
+        """Test that run_stochastic goes through the solver pool when one is attached"""
+        from chatsgp.optimization.solver_pool import SolverPool
+        config = Config(config_dict={'uncertainty': {'samples': 40, 'scenarios': 5}})
+        ops = {'ops': [{'op': 'scale_series', 'target': 'PV', 'scale_pct': 10}]}
+        _, local = OptimizerAgent(config=config).run_stochastic(ops)
+        with SolverPool(workers=1) as pool:
+            _, pooled = OptimizerAgent(config=config, solver_pool=pool).run_stochastic(ops)
+            assert sum(w['jobs_done'] for w in pool.health()) == 1
+
+        assert pooled['objective'] == pytest.approx(local['objective'])
+        assert pooled['robustness']['deterministic'] == pytest.approx(local['robustness']['deterministic'])
+
+    def test_orchestrator_answers_with_statistics(self):
+        """Test that robustness questions are solved stochastically and the answer reports the spread"""
+        config = Config(config_dict={'uncertainty': {'samples': 60, 'scenarios': 8}})
+        optimizer = OptimizerAgent(config=config)
+        orch = Orchestrator(CoderAgent([]), optimizer, InterpreterAgent(llm=StubLLM(), config=config))
+        out = orch.run_question("How robust is this plan to cloudy days?")
+
+        assert out['result']['scenarios']['samples'] == 60
+        assert len(out['result']['scenarios']['probabilities']) == 8
+        assert 'sampled PV and load scenarios' in out['answer']
+        plain = Orchestrator(CoderAgent([]), optimizer, InterpreterAgent(llm=StubLLM(), config=config), stochastic=False)
+        assert 'robustness' not in plain.run_question("How robust is this plan to cloudy days?")['result']
@@ -0,0 +1,108 @@
+"""Tests for pipeline tracing"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from chatsgp.agents.coder_agent import CoderAgent
+from chatsgp.agents.optimizer_agent import OptimizerAgent
+from chatsgp.agents.interpreter_agent import InterpreterAgent
+from chatsgp.utils.llm_backend import StubLLM
+from chatsgp.agents.orchestrator import Orchestrator
+from chatsgp.utils.tracing import NOOP_SPAN, span, start_trace, tracing_active, export_otel
+
+
+class TestSpans:
+    """Test suite for spans and tracers"""
+
+    def test_noop_without_trace(self):
+        """Test that spans outside a trace are the shared no-op"""
+        assert not tracing_active()
+        with span('solver', solver='pulp') as s:
+            s.set_attribute('status', 'optimal')
+        assert span('solver') is NOOP_SPAN
+
+    def test_nesting_and_timings(self):
+        """Test that nested spans record their parents and timings sum per name"""
+        with start_trace('root', kind='test') as tracer:
+            assert tracing_active()
+            with span('outer'):
+                with span('inner', n=1):
+                    pass
+                with span('inner', n=2):
+                    pass
+        assert not tracing_active()
+
+        by_name = {}
+        for s in tracer.spans:
+            by_name.setdefault(s.name, []).append(s)
+        root, outer = by_name['root'][0], by_name['outer'][0]
+        assert root.parent_id is None
+        assert outer.parent_id == root.span_id
+        assert [s.parent_id for s in by_name['inner']] == [outer.span_id] * 2
+        timings = tracer.timings_ms()
+        assert set(timings) == {'root', 'outer', 'inner'}
+        assert timings['inner'] == pytest.approx(sum(s.duration_ms for s in by_name['inner']))
+
+    def test_error_status(self):
+        """Test that an exception inside a span marks it as an error"""
+        with pytest.raises(ValueError):
+            with start_trace('root') as tracer:
+                with span('failing'):
+                    raise ValueError('boom')
+        spans = tracer.to_otel()['resourceSpans'][0]['scopeSpans'][0]['spans']
+        failing = next(s for s in spans if s['name'] == 'failing')
+        assert failing['status'] == {'code': 2, 'message': 'ValueError: boom'}
+
+    def test_threads_get_separate_traces(self):
+        """Test that concurrent traces on different threads don't share spans"""
+        def traced(i):
+            with start_trace('root') as tracer:
+                with span(f'stage{i}'):
+                    pass
+            return tracer
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            tracers = list(pool.map(traced, range(8)))
+        for i, tracer in enumerate(tracers):
+            assert sorted(s.name for s in tracer.spans) == ['root', f'stage{i}']
+
+    def test_otel_export(self, tmp_path):
+        """Test the OTLP/JSON structure and the JSON-lines file export"""
+        with start_trace('root', solver='pulp') as tracer:
+            with span('solve', H=24, pooled=False, ms=1.5):
+                pass
+        path = tmp_path / 'traces.jsonl'
+        export_otel(tracer, str(path))
+        export_otel(tracer, str(path))
+
+        lines = path.read_text().splitlines()
+        assert len(lines) == 2
+        doc = json.loads(lines[0])
+        spans = doc['resourceSpans'][0]['scopeSpans'][0]['spans']
+        assert [s['name'] for s in spans] == ['root', 'solve']
+        assert {s['traceId'] for s in spans} == {tracer.trace_id}
+        assert spans[1]['parentSpanId'] == spans[0]['spanId']
+        attrs = {a['key']: a['value'] for a in spans[1]['attributes']}
+        assert attrs == {'H': {'intValue': '24'}, 'pooled': {'boolValue': False}, 'ms': {'doubleValue': 1.5}}
+        assert int(spans[0]['endTimeUnixNano']) >= int(spans[1]['endTimeUnixNano'])
+
+
+class TestOrchestratorTracing:
+    """Test suite for traced pipeline runs"""
+
+    def test_timings_per_stage(self):
+        """Test that a traced run reports every pipeline stage"""
+        orchestrator = Orchestrator(CoderAgent([]), OptimizerAgent(), InterpreterAgent(llm=StubLLM()), trace=True)
+        out = orchestrator.run_question('What happens if PV generation increases by 20%?')
+
+        assert out['result']['status'] == 'optimal'
+        for stage in ('validate', 'coder', 'optimizer', 'solver', 'model_build', 'solve',
+                      'baseline', 'interpreter', 'run_question'):
+            assert stage in out['timings_ms']
+        spans = out['trace']['resourceSpans'][0]['scopeSpans'][0]['spans']
+        assert len({s['traceId'] for s in spans}) == 1
+
+    def test_untraced_by_default(self):
+        """Test that runs without tracing carry no timings"""
+        orchestrator = Orchestrator(CoderAgent([]), OptimizerAgent(), InterpreterAgent(llm=StubLLM()))
+        out = orchestrator.run_question('What happens if PV generation increases by 20%?')
+        assert 'timings_ms' not in out and 'trace' not in out
@@ -0,0 +1,96 @@
+"""Tests for question, operation and result validation"""
+import numpy as np
+import pytest
+from chatsgp.agents.optimizer_agent import OptimizerAgent
+from chatsgp.config import ConfigSnapshot, use_config
+from chatsgp.utils.validation import (
+    validate_operations, validate_operations_batch, validate_optimization_result, ops_schema
+)
+
+
+SHIFT = {'op': 'shift_load', 'percentage': 10, 'from_hour': 3, 'to_hour': 18}
+SCALE = {'op': 'scale_series', 'target': 'PV', 'scale_pct': 20}
+
+
+class TestValidateOperations:
+    """Test suite for operation validation"""
+
+    def test_valid(self):
+        """Test that well-formed operations pass"""
+        assert validate_operations([SCALE, SHIFT], hours=24) == (True, None)
+        assert validate_operations([], hours=24) == (True, None)
+
+    @pytest.mark.parametrize('ops, path', [
+        ('not a list', 'ops:'),
+        ([SCALE, 'x'], 'ops[1]:'),
+        ([{'op': 'rotate'}], 'ops[0].op:'),
+        ([{'op': 'scale_series', 'target': 'PV'}], "ops[0]: missing 'scale_pct'"),
+        ([{**SCALE, 'target': 'Wind'}], 'ops[0].target:'),
+        ([{**SCALE, 'scale_pct': '20'}], 'ops[0].scale_pct:'),
+        ([{**SCALE, 'scale_pct': float('inf')}], 'ops[0].scale_pct:'),
+        ([SCALE, {**SHIFT, 'to_hour': 24}], 'ops[1].to_hour:'),
+        ([{**SHIFT, 'from_hour': -1}], 'ops[0].from_hour:'),
+        ([{**SHIFT, 'from_hour': 3.0}], 'ops[0].from_hour:'),
+        ([{**SHIFT, 'percentage': True}], 'ops[0].percentage:'),
+    ])
+    def test_error_paths(self, ops, path):
+        """Test that errors name the offending value"""
+        ok, error = validate_operations(ops, hours=24)
+        assert not ok
+        assert error.startswith(path)
+
+    def test_horizon_aware(self):
+        """Test that hour bounds follow the horizon, including the configured one"""
+        late = [{**SHIFT, 'to_hour': 40}]
+        assert not validate_operations(late, hours=24)[0]
+        assert validate_operations(late, hours=48)[0]
+        with use_config(ConfigSnapshot({'optimization': {'hours': 48}, 'pv_profile': [0.0] * 48})):
+            assert validate_operations(late)[0]
+        assert 'between 0 and 47' in validate_operations([{**SHIFT, 'to_hour': 48}], hours=48)[1]
+
+    def test_schema_cached(self):
+        """Test that schemas are compiled once per horizon"""
+        assert ops_schema(24) is ops_schema(24)
+        assert ops_schema(48).hours == 48
+
+    def test_all_errors(self):
+        """Test that errors() reports every bad operation"""
+        errors = ops_schema(24).errors([{**SHIFT, 'to_hour': 30}, SCALE, {'op': 'x'}])
+        assert [e.split(':')[0] for e in errors] == ['ops[0].to_hour', 'ops[2].op']
+
+
+class TestValidateBatch:
+    """Test suite for batch validation"""
+
+    def test_matches_single_validation(self):
+        """Test that batch results equal one-by-one validation"""
+        rng = np.random.default_rng(0)
+        bundles = [[{**SCALE, 'scale_pct': int(rng.integers(-50, 50))},
+                    {**SHIFT, 'from_hour': int(rng.integers(0, 27))}] for _ in range(300)]
+        bundles += [{'ops': [SCALE]}, {'ops': 'bad'}, [{**SCALE, 'scale_pct': np.float64(5.0)}],
+                    [{**SCALE, 'target': ['PV']}], [{**SHIFT, 'percentage': float('nan')}], []]
+
+        valid, errors = validate_operations_batch(bundles, hours=24)
+        singles = [validate_operations(b['ops'] if isinstance(b, dict) else b, hours=24) for b in bundles]
+        assert valid.dtype == bool and len(valid) == len(bundles)
+        assert list(valid) == [ok for ok, _ in singles]
+        assert errors == [e for _, e in singles]
+        assert 0 < valid.sum() < len(bundles)
+
+    def test_run_many_rejects_before_solving(self):
+        """Test that run_many names the bad scenario instead of building models"""
+        with pytest.raises(ValueError, match=r'scenario 1: ops\[0\]\.to_hour'):
+            OptimizerAgent().run_many([{'ops': [SCALE]}, {'ops': [{**SHIFT, 'to_hour': 99}]}])
+
+
+class TestValidateResult:
+    """Test suite for optimization result validation"""
+
+    def test_results(self):
+        """Test valid and invalid result dictionaries"""
+        assert validate_optimization_result({'status': 'optimal', 'objective': 8.06}) == (True, None)
+        assert validate_optimization_result({'status': 'infeasible', 'objective': float('inf')})[0]
+        assert validate_optimization_result({'status': 'done', 'objective': 1.0})[1].startswith('result.status')
+        assert validate_optimization_result({'status': 'optimal'})[1] == "result: missing 'objective'"
+        assert not validate_optimization_result({'status': 'optimal', 'objective': float('nan')})[0]
+        assert not validate_optimization_result([])[0]